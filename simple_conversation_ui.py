@@ -4,12 +4,13 @@ A streamlined interface for complete customer service conversations.
 """
 
 import gradio as gr
-import openai
 import json
 import os
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
+from src.llm_provider import get_provider
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -19,7 +20,9 @@ class ConversationManager:
     
     def __init__(self, openai_api_key: str):
         """Initialize the conversation manager with OpenAI API key."""
-        self.openai_client = openai.OpenAI(api_key=openai_api_key)
+        if openai_api_key:
+            os.environ.setdefault("OPENAI_API_KEY", openai_api_key)
+        self.llm = get_provider()
         self.conversation_history = []
         self.current_state = "greeting"
         self.appointment_data = {}
@@ -91,19 +94,18 @@ Always be professional, helpful, and follow the conversation flow naturally. If
             # Add current message
             messages.append({"role": "user", "content": message})
             
-            # Call OpenAIstream = self.openai_client.chat.completions.create(
-            stream = self.openai_client.chat.completions.create(
+            # Call the configured LLM provider
+            stream = self.llm.create(
                 model="gpt-4o",
                 messages=messages,
                 temperature=0.7,
-                max_tokens=1000,
-                stream=True
+                max_tokens=1000
             )
 
             full_text = ""
             for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.get("content"):
-                    token = chunk.choices[0].delta["content"]
+                if chunk.choices and chunk.choices[0].delta.content:
+                    token = chunk.choices[0].delta.content
                     full_text += token
                     yield token
                     
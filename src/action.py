@@ -1,8 +1,10 @@
 from enum import Enum
 from collections import deque
-import json
 
-from .apis import API_FUNCTIONS
+from .apis import call_api, offload, sessions
+from . import json_stream
+from .template import compile_prompt
+from .history import ChatHistory, message_tokens
 
 class ActionType(str, Enum):
     CALLBACK = "callback"
@@ -16,9 +18,10 @@ class Action:
         customer_id: str,
         shared: dict[str,], 
         config: dict[str,],
-        global_history: deque[dict[str, str]],
-        topic_history: dict[str, deque[dict[str, str]]],
-        summaries: deque[str, str]
+        global_history: ChatHistory,
+        topic_history: dict[str, ChatHistory],
+        summaries: deque[str, str, list],
+        node_id: int | None = None
     ):
         self.customer_id = customer_id
         self.shared = shared
@@ -27,78 +30,82 @@ class Action:
         self.global_history = global_history
         self.topic_history = topic_history
         self.summaries = summaries
+        self.node_id = node_id
         self.next_id = None
 
-    def process(self):
+    async def process(self):
+        session = sessions.get(self.customer_id)
         match self.type:
 
             case ActionType.CALLBACK:
                 func_name: str = self.config["name"]
                 args = { arg: self.shared[arg] for arg in self.config["args"] }
                 return_name: str = self.config["return"]
+                result = await call_api(func_name, session, args)
                 if return_name:
-                    self.shared[return_name] = API_FUNCTIONS[func_name](self.customer_id, args)
-                else:
-                    API_FUNCTIONS[func_name](self.customer_id, args)
+                    self.shared[return_name] = result
+                await offload(sessions.save, session)
 
                 return
 
             case ActionType.PROCESS:
                 ref_summary: bool = self.config["ref_summary"]
                 if ref_summary:
-                    summaries: deque[(str, str)] = self.summaries
+                    summaries: deque[(str, str, list)] = self.summaries
                 else:
-                    summaries: deque[(str, str)] = []
+                    summaries: deque[(str, str, list)] = []
+                # Messages a summary already covers are not sent twice.
+                covered = {id(message) for _, _, messages in summaries for message in messages}
 
                 ref_history: bool = self.config["ref_history"]
                 if ref_history:
-                    history: deque[dict[str, str]] = self.global_history
+                    history, prompt_tokens = self.global_history.window(self.config.get("history_budget"), covered)
                 else:
-                    history: deque[dict[str, str]] = []
+                    history, prompt_tokens = [], 0
 
-                args = { arg: self.shared.get(arg, None) for arg in self.config["args"] }
-                prompt: str = self.config["prompt"]
-                for arg, value in args.items():
-                    prompt = prompt.replace(f"{{{arg}}}", str(value))
+                prompt = compile_prompt(self.config["prompt"], tuple(self.config["args"])).render(self.shared)
 
-                messages = [{"role": "user", "content": f"{name}'s summary:\n{summary}"} for name, summary in summaries] + [his for his in history]
-                messages.append({"role": "system", "content": prompt})
-                assist = API_FUNCTIONS["output_cmd"](self.customer_id, messages)
-                answer = API_FUNCTIONS["input_cmd"](self.customer_id)
+                summary_messages = [{"role": "user", "content": f"{name}'s summary:\n{summary}"} for name, summary, _ in summaries]
+                messages = summary_messages + history + [{"role": "system", "content": prompt}]
+                prompt_tokens += sum(message_tokens(message) for message in (*summary_messages, messages[-1]))
+                assist = await call_api("output_cmd", session, messages, prompt_tokens)
+                answer = await call_api("input_cmd", session)
 
                 return_name = self.config["return"]
                 self.shared[return_name] = answer
 
-                self.global_history.extend([
+                exchange = [
                     {"role": "assistant", "content": assist},
                     {"role": "user", "content": answer}
-                ])
+                ]
+                self.global_history.extend(exchange)
+                if self.node_id in self.topic_history:
+                    self.topic_history[self.node_id].extend(exchange)
                 
                 return
             
             case ActionType.ANALYZE:
                 ref_summary: bool = self.config["ref_summary"]
                 if ref_summary:
-                    summaries: deque[(str, str)] = self.summaries
+                    summaries: deque[(str, str, list)] = self.summaries
                 else:
-                    summaries: deque[(str, str)] = []
+                    summaries: deque[(str, str, list)] = []
+                # Messages a summary already covers are not sent twice.
+                covered = {id(message) for _, _, messages in summaries for message in messages}
 
                 ref_history: bool = self.config["ref_history"]
                 if ref_history:
-                    history: deque[dict[str, str]] = self.global_history
+                    history, prompt_tokens = self.global_history.window(self.config.get("history_budget"), covered)
                 else:
-                    history: deque[dict[str, str]] = []
-
-                args = { arg: self.shared.get(arg, None) for arg in self.config["args"] }
-                prompt: str = self.config["prompt"]
-                for arg, value in args.items():
-                    prompt = prompt.replace(f"{{{arg}}}", str(value))
-
-                messages: list[dict[str, str]] = [{"role": "user", "content": f"{name}'s summary:\n{summary}"} for name, summary in summaries] + [his for his in history]
-                messages.append({"role": "system", "content": prompt})
-                data_str: str = API_FUNCTIONS["inner_process"](self.customer_id, messages)
-                data_str = data_str.replace("```json", "").replace("```", "")
-                data = json.loads(data_str)
+                    history, prompt_tokens = [], 0
+
+                prompt = compile_prompt(self.config["prompt"], tuple(self.config["args"])).render(self.shared)
+
+                summary_messages = [{"role": "user", "content": f"{name}'s summary:\n{summary}"} for name, summary, _ in summaries]
+                messages: list[dict[str, str]] = summary_messages + history + [{"role": "system", "content": prompt}]
+                prompt_tokens += sum(message_tokens(message) for message in (*summary_messages, messages[-1]))
+                data_str: str = await call_api("inner_process", session, messages, prompt_tokens)
+                data = json_stream.loads(data_str)
 
                 print(data)
 
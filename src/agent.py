@@ -1,66 +1,83 @@
-import threading
-from datetime import datetime
-import time
-import openai
+import asyncio
 from typing import Callable
 
 from .workflow import Workflow
-from .apis import input_messages, output_chunks, input_required, output_finished, CloseConversation
+from .bridge import SessionBridge
+from .apis import sessions
+from .llm_provider import get_provider
+from .tracing import NULL_TRACER, Tracer, set_tracer
 
 class Agent:
     def __init__(
         self,
         config_path: str,
         customer_id: str,
-        disconnect: Callable
+        disconnect: Callable,
+        tracer: Tracer = NULL_TRACER
     ):
         self.customer_id = customer_id
         self.workflow = Workflow(config_path, customer_id)
         self.disconnect = disconnect
+        self.tracer = tracer
+        self.bridge = SessionBridge()
+        self.session = sessions.get(customer_id)
+        self.session.bridge = self.bridge
+        self._task: asyncio.Task | None = None
 
-        threading.Thread(target=self.workflow.process, daemon=True).start()
+    def _start(self):
+        # The workflow runs as a task on the agent's loop, started with the first message.
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_workflow())
+
+    async def _run_workflow(self):
+        set_tracer(self.tracer)
+        try:
+            await self.workflow.process()
+        finally:
+            self.bridge.close()
+
+    def close(self):
+        """Stop the workflow task and drop the session once the call is torn down."""
+        self.bridge.close()
+        if self._task is not None:
+            self._task.cancel()
+        self.workflow.close()
+        sessions.delete(self.customer_id)
 
     @property
     def input_required(self):
-        return self.customer_id in input_required and input_required[self.customer_id]
+        return self.bridge.input_required
 
     async def process(self, message: str):
-        while self.customer_id not in input_required or not input_required[self.customer_id]:
-            time.sleep(0.1)
+        self._start()
+        self.session.touch()
+        span = self.tracer.start_span("workflow", scope=True)
+        if not await self.bridge.send_input(message):
+            span.end()
+            stream = self.handle_close_conversation()
+            async for chunk in stream:
+                yield chunk
 
-        input_messages[self.customer_id] = (message, datetime.now())
+            return
 
-        while self.customer_id not in output_chunks:
-            if not self.workflow.running:
-                stream = self.handle_close_conversation()
-                async for chunk in stream:
-                    yield chunk
+        answered = False
+        async for chunk in self.bridge.output():
+            answered = True
+            yield chunk
+        span.end()
 
-                return
-            time.sleep(0.1)
-        while True:
-            try:
-                value = output_chunks[self.customer_id].get(timeout=1)[0]
-                yield value
-            except CloseConversation:
-                raise
-            except Exception as e:
-                print(e)
-                if self.customer_id in output_finished and output_finished[self.customer_id]:
-                    break
-                else:
-                    continue
-    
-        del output_chunks[self.customer_id]
-        del output_finished[self.customer_id]
+        if not answered and self.bridge.closed:
+            stream = self.handle_close_conversation()
+            async for chunk in stream:
+                yield chunk
 
     async def handle_close_conversation(self):
-        response = openai.chat.completions.create(
+        sessions.delete(self.customer_id)
+        response = get_provider().acreate(
             model="gpt-4o",
-            messages=[his for his in self.workflow.global_history] + [{"role": "system", "content": "Based on chat history, make correspond good bye text."}],
-            stream=True
+            messages=[his for his in self.workflow.global_history] + [{"role": "system", "content": "Based on chat history, make correspond good bye text."}]
         )
-        for chunk in response:
+        async for chunk in response:
             yield chunk
 
-        await self.disconnect()
\ No newline at end of file
+        await self.disconnect()
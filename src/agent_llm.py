@@ -16,16 +16,22 @@ import openai
 from typing import Callable
 
 from .agent import Agent
+from .tracing import NULL_TRACER, Tracer
 
 class AgentLLM(llm.LLM):
-    def __init__(self, customer_id: str, config_path: str, disconnect: Callable) -> None:
+    def __init__(self, customer_id: str, config_path: str, disconnect: Callable, tracer: Tracer = NULL_TRACER) -> None:
         super().__init__()
         self.agent = Agent(
             config_path,
             customer_id,
-            disconnect
+            disconnect,
+            tracer
         )
 
+    async def aclose(self) -> None:
+        self.agent.close()
+        await super().aclose()
+
     def chat(
         self,
         *,
@@ -77,6 +83,7 @@ class LLMStream(llm.LLMStream):
                     if chat_chunk is not None:
                         retryable = False
                         self._event_ch.send_nowait(chat_chunk)
+                        self._agent.tracer.mark("first_tts_chunk")
 
                 if chunk.usage is not None:
                     retryable = False
@@ -95,6 +102,8 @@ class LLMStream(llm.LLMStream):
         
         except openai.APITimeoutError:
             raise APITimeoutError(retryable=retryable) from None
+        finally:
+            self._agent.tracer.mark("workflow_end")
                     
     def _parse_choice(
         self, id: str, choice: Choice, thinking: asyncio.Event
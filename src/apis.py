@@ -1,70 +1,69 @@
-import queue
 from typing import Callable, Any
-import openai
+from concurrent.futures import ThreadPoolExecutor
+import os
 import time
-from datetime import datetime, timedelta
+import asyncio
+import inspect
 import threading
 
-class Service:
-    time: str | None = None
-    area: str | None = None
-    type: str | None = None
-    building: str | None = None
-    rating: int | None = None
+from .llm_provider import get_provider
+from .tracing import get_tracer
+from .session import SessionState, create_session_store
 
-service = Service()
+def _new_session() -> dict[str, Any]:
+    return {
+        "service": {
+            "time": None,
+            "area": None,
+            "type": None,
+            "building": None,
+            "rating": None
+        }
+    }
 
-input_messages: dict[str, (str, datetime)] = {}
-input_required: dict[str, bool] = {}
-output_chunks: dict[str, queue.Queue[(Any, datetime)]] = {}
-output_finished: dict[str, bool] = {}
+sessions = create_session_store(_new_session)
 
 class CloseConversation(Exception):
     """Raised when the user wants to quit the conversation."""
     pass
 
-def get_business_information(customer_id: str, args: dict[str, Any]):
+def get_business_information(session: SessionState, args: dict[str, Any]):
     return {
         "business_name": "Uno",
     }
 
-def get_user_request(customer_id: str, args: dict[str, Any]) -> str:
-    input_required[customer_id] = True
-    while customer_id not in input_messages:
-        time.sleep(0.1)
-    prompt = input_messages[customer_id][0]
-    del input_required[customer_id]
-    del input_messages[customer_id]
-    if prompt.lower() == "quit":
+async def get_user_request(session: SessionState, args: dict[str, Any]) -> str:
+    prompt = await session.bridge.wait_input()
+    if prompt is None or prompt.lower() == "quit":
         raise CloseConversation("User ended the conversation.")
     return prompt
 
-def get_service_type(customer_id: str, args: dict[str, Any]) -> list[str]:
+def get_service_type(session: SessionState, args: dict[str, Any]) -> list[str]:
     return [
         "Plumbing",
         "Drain"
     ]
 
-def get_service_area(customer_id: str, args: dict[str, Any]) -> list[str]:
+def get_service_area(session: SessionState, args: dict[str, Any]) -> list[str]:
     return [
         "6071 Barker Dr, Waterford, 48329 MI",
         "236 S LOS ANGELES ST APT 321, LOS ANGELES, CA 90012"
     ]
 
-def get_service_building(customer_id: str, args: dict[str, Any]) -> list[str]:
+def get_service_building(session: SessionState, args: dict[str, Any]) -> list[str]:
     return [
         "residental",
         "commercial"
     ]
 
-def get_service_times(customer_id: str, args: dict[str, Any]) -> list[str]:
+def get_service_times(session: SessionState, args: dict[str, Any]) -> list[str]:
     return [
         "Tuesday, 9 AM",
         "Wednesday, 10 AM",
         "Thursday, 8 AM"
     ]
 
-def get_node_topics(customer_id: str, args: dict[str, Any]) -> dict[int, dict[str, str]]:
+def get_node_topics(session: SessionState, args: dict[str, Any]) -> dict[int, dict[str, str]]:
     return {
         0: {
             "name": "area_confirm",
@@ -96,71 +95,72 @@ def get_node_topics(customer_id: str, args: dict[str, Any]) -> dict[int, dict[st
         }
     }
 
-def output_cmd(customer_id: str, messages: list[dict[str, str]]) -> str:
-    response = openai.chat.completions.create(
+async def output_cmd(session: SessionState, messages: list[dict[str, str]], prompt_tokens_estimate: int | None = None) -> str:
+    span = get_tracer().start_span("llm.request", call="output_cmd", prompt_tokens_estimate=prompt_tokens_estimate)
+    response = get_provider().acreate(
         model="gpt-4o",
-        messages=messages,
-        stream=True
+        messages=messages
     )
+    bridge = session.bridge
     full_response = ""
-    for chunk in response:
-        if customer_id not in output_chunks:
-            output_chunks[customer_id] = queue.Queue()
-        output_chunks[customer_id].put((chunk, datetime.now()))
+    async for chunk in response:
+        bridge.put_output(chunk)
         if chunk.choices[0].delta.content:
+            if not full_response:
+                span.add_event("first_token")
             full_response += chunk.choices[0].delta.content
-    output_finished[customer_id] = True
+    bridge.finish_output()
+    span.end()
     return full_response
 
-def inner_process(customer_id: str, messages: list[dict[str, str]]) -> str:
-    response = openai.chat.completions.create(
+async def inner_process(session: SessionState, messages: list[dict[str, str]], prompt_tokens_estimate: int | None = None) -> str:
+    span = get_tracer().start_span("llm.request", call="inner_process", prompt_tokens_estimate=prompt_tokens_estimate)
+    response = get_provider().acreate(
         model="gpt-4o",
-        messages=messages,
-        stream=True
+        messages=messages
     )
     full_response = ""
-    for chunk in response:
+    async for chunk in response:
         if chunk.choices[0].delta.content:
+            if not full_response:
+                span.add_event("first_token")
             full_response += chunk.choices[0].delta.content
+    span.end()
     return full_response
 
-def input_cmd(customer_id: str) -> str:
-    input_required[customer_id] = True
-    while customer_id not in input_messages:
-        time.sleep(0.1)
-    prompt = input_messages[customer_id][0]
-    del input_required[customer_id]
-    del input_messages[customer_id]
-    if prompt.lower() == "quit":
+async def input_cmd(session: SessionState) -> str:
+    prompt = await session.bridge.wait_input()
+    if prompt is None or prompt.lower() == "quit":
         raise CloseConversation("User ended the conversation.")
     return prompt
 
-def save_scheduled_time(customer_id: str, args: dict[str, Any]):
+def save_scheduled_time(session: SessionState, args: dict[str, Any]):
     scheduled_time = args["scheduled_time"]["scheduled_time"]
     schedule_failed = args["scheduled_time"]["schedule_failed"]
     if not schedule_failed:
-        service.time = scheduled_time
+        session["service"]["time"] = scheduled_time
         print(f"time confirmed: {scheduled_time}")
     else:
         print(f"client canceled schedule")
 
-def save_request_data(customer_id: str, args: dict[str, Any]):
+def save_request_data(session: SessionState, args: dict[str, Any]):
     data = args["response_analytics"]
-    service.area = data["service_area"] if not data["service_area_failed"] else None
-    service.type = data["service_type"] if not data["service_type_failed"] else None
-    service.building = data["service_building"] if not data["service_building_failed"] else None
+    service = session["service"]
+    service["area"] = data["service_area"] if not data["service_area_failed"] else None
+    service["type"] = data["service_type"] if not data["service_type_failed"] else None
+    service["building"] = data["service_building"] if not data["service_building_failed"] else None
 
-def check_status(customer_id: str, args: dict[str, Any]):
+def check_status(session: SessionState, args: dict[str, Any]):
     return {
-        "full_fit": service.time is not None,
-        "service_time_failed": service.time is None
+        "full_fit": session["service"]["time"] is not None,
+        "service_time_failed": session["service"]["time"] is None
     }
 
-def save_rating(customer_id: str, args: dict[str, Any]):
-    service.rating = args["finalize_analysis"]["rating"]
+def save_rating(session: SessionState, args: dict[str, Any]):
+    session["service"]["rating"] = args["finalize_analysis"]["rating"]
     raise CloseConversation("finished conversation")
 
-API_FUNCTIONS: dict[str, Callable[[str, dict[str, Any]], Any]] = {
+API_FUNCTIONS: dict[str, Callable[..., Any]] = {
     "get_user_request": get_user_request,
     "get_service_type": get_service_type,
     "get_service_area": get_service_area,
@@ -177,50 +177,29 @@ API_FUNCTIONS: dict[str, Callable[[str, dict[str, Any]], Any]] = {
     "get_business_information": get_business_information
 }
 
-EXPIRY = timedelta(hours=1)
-
-def _clean_dict(d: dict, expiry: timedelta):
-    """Remove expired items from a dict of (value, timestamp)."""
-    now = datetime.now()
-    keys_to_delete = [k for k, (_, ts) in d.items() if now - ts >= expiry]
-    for k in keys_to_delete:
-        del d[k]
-
-def _clean_output_chunks(chunks: dict[str, queue.Queue[tuple[Any, datetime]]]):
-    """Clean queues of (value, timestamp) inside a dict."""
-    now = datetime.now()
-    keys_to_delete = []
-
-    for k, q in list(chunks.items()):  # copy items to avoid size-change error
-        items = []
-        # Drain the queue safely
-        while not q.empty():
-            try:
-                items.append(q.get_nowait())
-            except queue.Empty:
-                break
-
-        # Keep only fresh ones
-        fresh_items = [(v, ts) for v, ts in items if now - ts < EXPIRY]
-
-        if fresh_items:
-            # Refill the queue with fresh items
-            new_q: queue.Queue[tuple[Any, datetime]] = queue.Queue()
-            for item in fresh_items:
-                new_q.put(item)
-            chunks[k] = new_q
-        else:
-            keys_to_delete.append(k)
-
-    # Delete keys with no fresh items
-    for k in keys_to_delete:
-        del chunks[k]
+# Sync callbacks may block (I/O, sqlite); they share a small pool instead of
+# running on the event loop or in a thread per call.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CALLBACK_WORKERS", "4")),
+    thread_name_prefix="api-callback"
+)
+
+async def offload(func: Callable, *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+async def call_api(name: str, session: SessionState, *args: Any) -> Any:
+    """Run an API function from a workflow coroutine, awaiting async ones directly."""
+    func = API_FUNCTIONS[name]
+    if inspect.iscoroutinefunction(func):
+        return await func(session, *args)
+    return await offload(func, session, *args)
 
 def _background_work():
     while True:
-        _clean_dict(input_messages, EXPIRY)
-        _clean_output_chunks(output_chunks)
-        time.sleep(60)  # run every 1 minute
+        sessions.evict_expired()
+        # wake when the oldest session may expire, at least every minute
+        wait = sessions.next_expiry()
+        time.sleep(60 if wait is None else min(60, max(1, wait)))
 
 # Start background worker thread
 threading.Thread(target=_background_work, daemon=True).start()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any
+
+_END = object()
+_CLOSED = object()
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+class SessionBridge:
+    """Hands messages between the workflow task and the agent.
+
+    Both sides run as coroutines on the same event loop: the workflow awaits
+    `wait_input` between turns, so an idle call costs a suspended task rather
+    than a parked thread. `close` may also be called from other threads (e.g.
+    session eviction) and is then handed to the loop.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inputs: asyncio.Queue[str | None] = asyncio.Queue()
+        self._input_event = asyncio.Event()
+        self._outputs: asyncio.Queue = asyncio.Queue()
+        self.input_required = False
+        self.closed = False
+
+    def _bind(self):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+    # workflow side
+
+    async def wait_input(self) -> str | None:
+        """Wait until the agent sends a message.
+
+        Returns None once the bridge is closed.
+        """
+        self._bind()
+        self.input_required = True
+        self._input_event.set()
+        return await self._inputs.get()
+
+    def put_output(self, chunk: Any):
+        self._outputs.put_nowait(chunk)
+
+    def finish_output(self):
+        self._outputs.put_nowait(_END)
+
+    def close(self):
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and _running_loop() is not loop:
+            loop.call_soon_threadsafe(self._close)
+        else:
+            self._close()
+
+    def _close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._inputs.put_nowait(None)
+        self._input_event.set()
+        self._outputs.put_nowait(_CLOSED)
+
+    # agent side
+
+    async def send_input(self, message: str) -> bool:
+        """Wait until the workflow asks for input, then deliver `message`.
+
+        Returns False if the workflow finished instead of asking.
+        """
+        self._bind()
+        await self._input_event.wait()
+        if self.closed:
+            return False
+        self._input_event.clear()
+        self.input_required = False
+        self._inputs.put_nowait(message)
+        return True
+
+    async def output(self):
+        self._bind()
+        while True:
+            item = await self._outputs.get()
+            if item is _END:
+                return
+            if item is _CLOSED:
+                self._outputs.put_nowait(_CLOSED)
+                return
+            yield item
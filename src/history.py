@@ -0,0 +1,81 @@
+import re
+from collections import deque
+from itertools import islice
+from typing import Collection, Iterable, Iterator
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Per-message framing the chat format adds on top of the content.
+MESSAGE_OVERHEAD = 4
+
+def count_tokens(text: str) -> int:
+    """Estimated token count: words and punctuation marks, close to BPE for English."""
+    return len(TOKEN.findall(text))
+
+def message_tokens(message: dict[str, str]) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+class ChatHistory:
+    """Chat messages with their token cost, counted once on append.
+
+    Holds at most `maxlen` messages and, with `max_tokens`, drops the oldest
+    ones while the total is over it. `window(budget)` picks the newest messages
+    that fit a node's `history_budget` without recounting anything.
+    """
+
+    def __init__(self, maxlen: int | None = None, max_tokens: int | None = None):
+        self.maxlen = maxlen
+        self.max_tokens = max_tokens
+        self._messages: deque[tuple[dict[str, str], int]] = deque()
+        self.tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        return (message for message, _ in self._messages)
+
+    def __getitem__(self, index: int) -> dict[str, str]:
+        return self._messages[index][0]
+
+    def append(self, message: dict[str, str]):
+        tokens = message_tokens(message)
+        self._messages.append((message, tokens))
+        self.tokens += tokens
+        while len(self._messages) > 1 and (
+            (self.maxlen is not None and len(self._messages) > self.maxlen)
+            or (self.max_tokens is not None and self.tokens > self.max_tokens)
+        ):
+            self.tokens -= self._messages.popleft()[1]
+
+    def extend(self, messages: Iterable[dict[str, str]]):
+        for message in messages:
+            self.append(message)
+
+    def clear(self):
+        self._messages.clear()
+        self.tokens = 0
+
+    def drop(self, messages: Iterable[dict[str, str]]):
+        """Remove `messages` from the head, leaving anything appended since then."""
+        dropped = {id(message) for message in messages}
+        while self._messages and id(self._messages[0][0]) in dropped:
+            self.tokens -= self._messages.popleft()[1]
+
+    def window(self, budget: int | None = None, exclude: Collection[int] = ()) -> tuple[list[dict[str, str]], int]:
+        """The newest messages within `budget` tokens, and their total.
+
+        Messages whose id is in `exclude` are skipped. The latest remaining
+        message is always included, even when it alone is over budget.
+        """
+        entries = [entry for entry in self._messages if id(entry[0]) not in exclude] if exclude else self._messages
+        if budget is None:
+            return [message for message, _ in entries], sum(tokens for _, tokens in entries)
+        start = len(entries)
+        total = 0
+        for _, tokens in reversed(entries):
+            if total + tokens > budget and start < len(entries):
+                break
+            total += tokens
+            start -= 1
+        return [message for message, _ in islice(entries, start, None)], total
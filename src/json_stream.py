@@ -0,0 +1,2 @@
+# Shared with the v2 engine, which owns the implementation.
+from v2.src.json_stream import FENCES, JsonStream, JsonStreamError, loads
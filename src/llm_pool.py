@@ -0,0 +1,120 @@
+import os
+import time
+import asyncio
+import threading
+import httpx
+from dataclasses import dataclass, asdict
+from openai import OpenAI, AsyncOpenAI
+
+from .llm_provider import LLMProvider
+
+@dataclass
+class PoolStats:
+    max_connections: int
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    saturated_requests: int = 0
+    errors: int = 0
+    warmed_up_at: float | None = None
+
+    @property
+    def saturation(self) -> float:
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+    def to_dict(self) -> dict[str, ]:
+        return {**asdict(self), "saturation": self.saturation}
+
+class LLMClientPool(LLMProvider):
+    """Process-wide OpenAI clients sharing one set of connection limits.
+
+    Workflows and the agent use the async client; the sync one serves scripts
+    such as simple_conversation_ui. Stats are updated under a lock because
+    both clients may stream at once.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False
+    ):
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        timeout = httpx.Timeout(60.0, connect=5.0)
+        self.client = OpenAI(http_client=httpx.Client(limits=limits, http2=http2, timeout=timeout))
+        self.async_client = AsyncOpenAI(http_client=httpx.AsyncClient(limits=limits, http2=http2, timeout=timeout))
+        self.stats = PoolStats(max_connections=max_connections)
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            self.stats.requests += 1
+            if self.stats.in_flight >= self.stats.max_connections:
+                self.stats.saturated_requests += 1
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+
+    def _release(self, error: bool = False):
+        with self._lock:
+            self.stats.in_flight -= 1
+            if error:
+                self.stats.errors += 1
+
+    def create(self, **kwargs):
+        """Stream a chat completion with the sync client."""
+        self._acquire()
+        try:
+            response = self.client.chat.completions.create(stream=True, **kwargs)
+        except BaseException:
+            self._release(error=True)
+            raise
+        try:
+            for chunk in response:
+                yield chunk
+        finally:
+            response.close()
+            self._release()
+
+    async def acreate(self, **kwargs):
+        """Stream a chat completion with the async client."""
+        self._acquire()
+        try:
+            response = await self.async_client.chat.completions.create(stream=True, **kwargs)
+        except BaseException:
+            self._release(error=True)
+            raise
+        try:
+            async for chunk in response:
+                yield chunk
+        finally:
+            await response.close()
+            self._release()
+
+    async def warm_up(self, connections: int = 1):
+        """Open keep-alive connections on the async client, which serves every call's turns."""
+        results = await asyncio.gather(
+            *(self.async_client.models.list() for _ in range(connections)),
+            return_exceptions=True
+        )
+        if not all(isinstance(result, Exception) for result in results):
+            self.stats.warmed_up_at = time.time()
+
+_pool: LLMClientPool | None = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> LLMClientPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LLMClientPool(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),
+                http2=os.getenv("LLM_HTTP2", "").lower() in ("1", "true", "yes")
+            )
+    return _pool
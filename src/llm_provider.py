@@ -0,0 +1,127 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+class LLMProvider:
+    """What the workflow needs from an LLM backend.
+
+    `create` streams chunks shaped like OpenAI's `ChatCompletionChunk` for the
+    workflow thread; `acreate` streams the same chunks on the event loop.
+    """
+
+    def create(self, **kwargs) -> Iterator[Any]:
+        raise NotImplementedError
+
+    def acreate(self, **kwargs) -> AsyncIterator[Any]:
+        raise NotImplementedError
+
+    async def warm_up(self, connections: int = 1):
+        pass
+
+TOKEN = re.compile(r"\s*\S+\s*|\s+")
+
+def _chunk(content: str | None, finish_reason: str | None = None) -> SimpleNamespace:
+    delta = SimpleNamespace(role="assistant", content=content, tool_calls=None)
+    return SimpleNamespace(
+        id="stub",
+        choices=[SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)],
+        usage=None
+    )
+
+class StubProvider(LLMProvider):
+    """Offline provider that streams scripted or recorded responses.
+
+    The script is a JSON file of the form
+    `{"responses": [{"match": "...", "response": "..."} | {"match": "...", "chunks": [...]}], "default": "..."}`.
+    The first entry whose `match` occurs in the request's messages wins; `chunks`
+    replays a recorded stream as-is, `response` is split into word-sized chunks.
+    Every chunk after the first waits `token_latency` seconds plus up to `jitter`
+    either way.
+    """
+
+    def __init__(
+        self,
+        script: dict[str, Any] | None = None,
+        token_latency: float = 0.02,
+        jitter: float = 0.0,
+        first_token_latency: float = 0.3,
+        seed: int | None = None
+    ):
+        script = script or {}
+        self.responses: list[tuple[str, list[str]]] = [
+            (entry.get("match", ""), list(entry["chunks"]) if "chunks" in entry else TOKEN.findall(entry["response"]))
+            for entry in script.get("responses", [])
+        ]
+        self.default: str = script.get("default", "Okay.")
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.first_token_latency = first_token_latency
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    @classmethod
+    def from_file(cls, path: str | None, **kwargs) -> "StubProvider":
+        script = None
+        if path:
+            with open(path, "r", encoding="utf-8") as file:
+                script = json.load(file)
+        return cls(script, **kwargs)
+
+    def delay(self) -> float:
+        return max(0.0, self.token_latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def respond(self, messages: Iterable[dict[str, str]]) -> list[str]:
+        self.requests += 1
+        text = "\n".join(message["content"] for message in messages)
+        for match, chunks in self.responses:
+            if match in text:
+                return chunks
+        return TOKEN.findall(self.default)
+
+    def create(self, **kwargs) -> Iterator[SimpleNamespace]:
+        chunks = self.respond(kwargs["messages"])
+        time.sleep(self.first_token_latency)
+        for index, text in enumerate(chunks):
+            if index:
+                time.sleep(self.delay())
+            yield _chunk(text)
+        yield _chunk(None, "stop")
+
+    async def acreate(self, **kwargs) -> AsyncIterator[SimpleNamespace]:
+        chunks = self.respond(kwargs["messages"])
+        await asyncio.sleep(self.first_token_latency)
+        for index, text in enumerate(chunks):
+            if index:
+                await asyncio.sleep(self.delay())
+            yield _chunk(text)
+        yield _chunk(None, "stop")
+
+_provider: LLMProvider | None = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> LLMProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            name = os.getenv("LLM_PROVIDER", "openai")
+            if name == "stub":
+                seed = os.getenv("LLM_STUB_SEED")
+                _provider = StubProvider.from_file(
+                    os.getenv("LLM_STUB_SCRIPT"),
+                    token_latency=float(os.getenv("LLM_STUB_TOKEN_LATENCY", "0.02")),
+                    jitter=float(os.getenv("LLM_STUB_JITTER", "0")),
+                    first_token_latency=float(os.getenv("LLM_STUB_FIRST_TOKEN_LATENCY", "0.3")),
+                    seed=int(seed) if seed else None
+                )
+            elif name == "openai":
+                from .llm_pool import get_pool
+                _provider = get_pool()
+            else:
+                raise ValueError(f"Unknown LLM_PROVIDER '{name}'")
+    return _provider
@@ -1,7 +1,15 @@
 import yaml
+from functools import lru_cache
 from collections import deque
 
 from .action import Action
+from .history import ChatHistory
+
+@lru_cache(maxsize=None)
+def load_config(config_path: str) -> dict[str,]:
+    """Parse a node file once per process; actions only read their config."""
+    with open(config_path) as f:
+        return yaml.safe_load(f)
 
 class Node:
     def __init__(
@@ -10,12 +18,11 @@ class Node:
         customer_id: str,
         config_path: str,
         args: dict[str,],
-        global_history: deque[dict[str, str]],
-        topic_history: dict[str, deque[dict[str, str]]],
+        global_history: ChatHistory,
+        topic_history: dict[str, ChatHistory],
         summaries: deque[str, str]
     ):
-        with open(config_path) as f:
-            config: dict[str,] = yaml.safe_load(f)
+        config = load_config(config_path)
 
         self.customer_id = customer_id
         self.shared: dict[str,] = args
@@ -28,12 +35,13 @@ class Node:
             action,
             global_history,
             topic_history,
-            summaries
+            summaries,
+            node_id=id
         ) for action in config["actions"]]
 
-    def process(self):
+    async def process(self):
         for action in self.actions:
-            action.process()
+            await action.process()
             if action.next_id is not None:
                 self.next_id = action.next_id
         return self.next_id
\ No newline at end of file
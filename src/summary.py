@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Iterable, Mapping
+
+from .node import load_config
+from .history import ChatHistory
+from .llm_provider import get_provider
+
+logger = logging.getLogger("voice.summary")
+
+SUMMARY_PROMPT = (
+    "Summarize the part of a customer service call about '{topic}' below. "
+    "Keep every fact the assistant may still need: names, contact details, addresses, "
+    "services, answers to questions, times and decisions. "
+    "Use at most {max_words} words of plain text."
+)
+
+def summary_topics(node_configs: Iterable[Mapping[str, Any]]) -> set[int]:
+    """Ids of the nodes that can lead to an action with `ref_summary`.
+
+    Only their summaries may ever be read; summarizing any other node is wasted.
+    """
+    readers: list[int] = []
+    predecessors: dict[int, set[int]] = {}
+    for entry in node_configs:
+        try:
+            config = load_config(entry["path"])
+        except OSError:
+            continue
+        actions = (config or {}).get("actions") or ()
+        if any(action.get("ref_summary") for action in actions):
+            readers.append(entry["id"])
+        for action in actions:
+            if action.get("type") != "go_next":
+                continue
+            targets = [target["id"] for cases in (action.get("go_to") or {}).values() for target in cases.values()]
+            targets.append((action.get("default") or {}).get("id"))
+            for target in targets:
+                predecessors.setdefault(target, set()).add(entry["id"])
+
+    topics: set[int] = set()
+    queue = readers
+    while queue:
+        for node_id in predecessors.get(queue.pop(), ()):
+            if node_id not in topics:
+                topics.add(node_id)
+                queue.append(node_id)
+    return topics
+
+class Summarizer:
+    """Writes per-topic summaries into the workflow's `summaries` in the background.
+
+    When a node finishes, the exchanges recorded in its topic history are
+    summarized together with the topic's previous summary. The result replaces
+    that topic's entry in `summaries`, as `(topic, summary, messages)` with every
+    message the summary covers, and the summarized messages are dropped from the
+    topic history. Actions with `ref_summary` send these summaries instead of
+    the covered messages of the global history.
+    """
+
+    def __init__(self, summaries: deque, model: str = "gpt-4o-mini", max_words: int = 80):
+        self.summaries = summaries
+        self.model = model
+        self.max_words = max_words
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | None, summaries: deque) -> "Summarizer | None":
+        if not config or not config.get("enabled", True):
+            return None
+        return cls(summaries, config.get("model", "gpt-4o-mini"), config.get("max_words", 80))
+
+    def schedule(self, topic: str, history: ChatHistory) -> asyncio.Task | None:
+        if not len(history):
+            return None
+        task = asyncio.create_task(self._run(topic, history, list(history)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def cancel(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def _run(self, topic: str, history: ChatHistory, messages: list[dict[str, str]]):
+        previous = next((entry for entry in self.summaries if entry[0] == topic), None)
+        try:
+            summary = await self.summarize(topic, previous[1] if previous else None, messages)
+        except Exception:
+            logger.warning("summarization failed", exc_info=True)
+            return
+        if not summary:
+            return
+        history.drop(messages)
+        for entry in [entry for entry in self.summaries if entry[0] == topic]:
+            self.summaries.remove(entry)
+        self.summaries.append((topic, summary, (previous[2] if previous else []) + messages))
+
+    async def summarize(self, topic: str, previous: str | None, messages: list[dict[str, str]]) -> str:
+        transcript = "\n".join(f'{message["role"]}: {message["content"]}' for message in messages)
+        request = [{"role": "system", "content": SUMMARY_PROMPT.format(topic=topic, max_words=self.max_words)}]
+        if previous:
+            request.append({"role": "user", "content": f"Earlier summary:\n{previous}"})
+        request.append({"role": "user", "content": f"Conversation:\n{transcript}"})
+
+        parts: list[str] = []
+        async for chunk in get_provider().acreate(model=self.model, messages=request):
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        return "".join(parts).strip()
@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+from itertools import count
+from typing import Any, Mapping
+
+class Args(dict):
+    """Session args that remember when each key was last assigned.
+
+    `serialize` caches `str(value)` per key and only recomputes it after the key
+    is assigned again, so large values such as the service list are converted
+    once per change instead of once per prompt. Mutating a value in place does
+    not invalidate the cache; assign it again instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clock = count(1)
+        self.versions: dict[str, int] = {key: next(self._clock) for key in self}
+        self._strings: dict[str, tuple[int, str]] = {}
+
+    def __setitem__(self, key: str, value: Any):
+        super().__setitem__(key, value)
+        self.versions[key] = next(self._clock)
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self.versions.pop(key, None)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self.versions.pop(key, None)
+        return super().pop(key, *default)
+
+    def serialize(self, key: str) -> str:
+        version = self.versions[key]
+        cached = self._strings.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, str(self[key]))
+            self._strings[key] = cached
+        return cached[1]
+
+class CompiledPrompt:
+    """An action prompt pre-split around its `{arg}` placeholders."""
+
+    def __init__(self, text: str, names: tuple[str, ...]):
+        self.text = text
+        self.names = names
+        if names:
+            pattern = re.compile("|".join(re.escape(f"{{{name}}}") for name in names))
+            pieces = pattern.split(text)
+            slots = [match.group()[1:-1] for match in pattern.finditer(text)]
+        else:
+            pieces, slots = [text], []
+        self._parts = tuple(zip(pieces, slots))
+        self._tail = pieces[-1]
+
+    def render(self, args: Mapping[str, Any]) -> str:
+        serialize = args.serialize if isinstance(args, Args) else None
+        pieces = []
+        for literal, name in self._parts:
+            pieces.append(literal)
+            if name not in args:
+                pieces.append(str(None))
+            elif serialize is not None:
+                pieces.append(serialize(name))
+            else:
+                pieces.append(str(args[name]))
+        pieces.append(self._tail)
+        return "".join(pieces)
+
+@lru_cache(maxsize=256)
+def compile_prompt(text: str, names: tuple[str, ...]) -> CompiledPrompt:
+    return CompiledPrompt(text, names)
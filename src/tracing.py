@@ -0,0 +1,14 @@
+# Shared with the v2 engine, which owns the implementation; one module also
+# means one current tracer for both engines.
+from v2.src.tracing import (
+    NULL_SPAN,
+    NULL_TRACER,
+    LogExporter,
+    OTelExporter,
+    Span,
+    Tracer,
+    TurnTrace,
+    create_tracer,
+    get_tracer,
+    set_tracer,
+)
@@ -2,6 +2,9 @@ import yaml
 from collections import deque
 
 from .node import Node
+from .template import Args
+from .history import ChatHistory
+from .summary import Summarizer, summary_topics
 
 class Workflow:
     def __init__(self, workflow_file: str, customer_id: str):
@@ -11,15 +14,17 @@ class Workflow:
         self.customer_id = customer_id
 
         self.init_node: int = config["init_node"]
-        self.config: dict[str,] = config["init_config"]
+        self.config: Args = Args(config["init_config"])
         self.node_configs = { node_config["id"]: node_config for node_config in config["nodes"] }
 
-        self.global_history: deque[dict[str, str]] = deque(maxlen=config["global_history_num"])
-        self.topic_history: dict[str, deque[dict[str, str]]] = { node_config["id"]: deque(maxlen=config["topic_history_num"]) for node_config in config["nodes"] }
-        self.summaries: deque[str, str] = deque(maxlen=config["summary_num"])
+        self.global_history = ChatHistory(config["global_history_num"], config.get("global_history_tokens"))
+        self.topic_history: dict[str, ChatHistory] = { node_config["id"]: ChatHistory(config["topic_history_num"], config.get("topic_history_tokens")) for node_config in config["nodes"] }
+        self.summaries: deque[str, str, list] = deque(maxlen=config["summary_num"])
+        self.summarizer = Summarizer.from_config(config.get("summarization"), self.summaries)
+        self.summary_topics = summary_topics(config["nodes"]) if self.summarizer is not None else set()
         self.running = False
 
-    def process(self):
+    async def process(self):
         current_node = Node(
             self.init_node,
             self.customer_id,
@@ -33,7 +38,9 @@ class Workflow:
 
         while self.running:
             try:
-                next_id = current_node.process()
+                next_id = await current_node.process()
+                if current_node.id in self.summary_topics:
+                    self.summarizer.schedule(current_node.note, self.topic_history[current_node.id])
                 print(next_id)
                 if next_id == -1:
                     self.running = False
@@ -50,4 +57,9 @@ class Workflow:
                 )
             except Exception as e:
                 print(e)
-                self.running = False
\ No newline at end of file
+                self.running = False
+
+    def close(self):
+        self.running = False
+        if self.summarizer is not None:
+            self.summarizer.cancel()
@@ -1,4 +1,3 @@
-import time
 import uuid
 from dotenv import load_dotenv
 
@@ -16,10 +15,6 @@ async def chat():
     print("Type 'exit' to quit.\n")
 
     while True:
-        if not agent.input_required:
-            time.sleep(0.1)
-            continue
-
         user_input = input("You: ")
         if user_input.lower() in ("exit", "quit"):
             break
@@ -0,0 +1,193 @@
+"""
+Unit tests for barge-in cancellation of a v2 workflow turn
+"""
+
+import asyncio
+import contextlib
+from v2.src.llm_provider import StubProvider
+from v2.src.registry import WorkflowRegistry
+from v2.src.workflow import Workflow
+
+CONFIG = """
+init_node: intent
+init_step: init
+chat_history_maxlen: 10
+global_system_prompt: test
+"""
+
+INTENT = """
+nodes:
+  init:
+    type: analyze
+    client:
+      prompt: classify
+      schema:
+        type: object
+        properties:
+          intent:
+            type: string
+            enum: [reply, other]
+      return: intent_data
+    go_to:
+      data: intent_data
+      cases:
+        - name: intent
+          value: reply
+          to: intent
+          step: reply
+      default:
+        to: intent
+        step: reply
+  reply:
+    type: process
+    client:
+      prompt: answer
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+"""
+
+SCRIPT = {
+    "responses": [
+        {"match": "classify", "chunks": ['{"intent": ', '"reply"}']},
+        {"match": "answer", "response": "Sure, I can help with that right away."}
+    ]
+}
+
+
+class RecordingProvider(StubProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streams = []
+
+    async def create(self, **kwargs):
+        stream = await super().create(**kwargs)
+        self.streams.append(stream)
+        return stream
+
+
+async def disconnect():
+    pass
+
+
+async def interrupt(workflow, message, after_chunks):
+    received = []
+
+    async def consume():
+        async for chunk in workflow.process(message):
+            if chunk.choices and chunk.choices[0].delta.content:
+                received.append(chunk.choices[0].delta.content)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    while len(received) < after_chunks:
+        await asyncio.sleep(0.005)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return received
+
+
+def make_workflow(tmp_path, config=CONFIG, script=SCRIPT, **kwargs):
+    (tmp_path / "config.yaml").write_text(config)
+    (tmp_path / "intent.yaml").write_text(INTENT)
+    provider = RecordingProvider(script, first_token_latency=0, **kwargs)
+    return Workflow(disconnect, WorkflowRegistry(str(tmp_path)), client=provider), provider
+
+
+class TestCancellation:
+    """Test cases for cancelling Workflow.process mid-turn."""
+
+    def test_process_interrupted(self, tmp_path):
+        """Test that an interrupted reply closes the stream, keeps partial text and rolls back routing."""
+        workflow, provider = make_workflow(tmp_path, token_latency=0.05)
+
+        received = asyncio.run(interrupt(workflow, "hi", after_chunks=2))
+
+        assert provider.streams[-1].closed
+        assert list(workflow.chat_history) == [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "".join(received)}
+        ]
+        assert workflow.args["next"] == {"finished": False, "to": "intent", "step": "init"}
+        assert workflow.metrics.get("intent/reply").errors == 1
+        assert workflow.metrics.get("intent/reply").routes == {}
+
+    def test_analyze_interrupted(self, tmp_path):
+        """Test that cancelling during ANALYZE aborts the request without touching history."""
+        workflow, provider = make_workflow(tmp_path, token_latency=0)
+        provider.first_token_latency = 1
+
+        asyncio.run(interrupt(workflow, "hi", after_chunks=0))
+
+        assert provider.requests == 1
+        assert provider.streams[0].closed
+        assert list(workflow.chat_history) == [{"role": "user", "content": "hi"}]
+        assert "intent_data" not in workflow.args
+        assert workflow.args["next"]["to"] == "intent"
+
+    def test_next_turn_after_interruption(self, tmp_path):
+        """Test that the turn after an interruption runs normally from the start node."""
+        workflow, provider = make_workflow(tmp_path, token_latency=0.05)
+        asyncio.run(interrupt(workflow, "hi", after_chunks=1))
+        provider.token_latency = 0
+
+        async def run():
+            return [chunk async for chunk in workflow.process("again")]
+
+        asyncio.run(run())
+
+        assert workflow.chat_history[-1] == {"role": "assistant", "content": "Sure, I can help with that right away."}
+        assert workflow.args["next"]["finished"]
+
+    def test_interrupted_with_text_still_buffered(self, tmp_path):
+        """Test that text held back by the TTS chunker is not recorded as said."""
+        config = CONFIG + "tts_chunking:\n  max_wait: 5\n"
+        script = {"responses": [SCRIPT["responses"][0], {"match": "answer", "response": "Sure thing. Let me check the schedule now."}]}
+        workflow, provider = make_workflow(tmp_path, config, script, token_latency=0.05)
+        received = []
+
+        async def run():
+            async def consume():
+                async for chunk in workflow.process("hi"):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received.append(chunk.choices[0].delta.content)
+
+            task = asyncio.create_task(consume())
+            while not received:
+                await asyncio.sleep(0.005)
+            # "Let me" arrives meanwhile but waits in the chunker for the sentence end.
+            await asyncio.sleep(0.12)
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        assert received == ["Sure thing. "]
+        assert provider.streams[-1].closed
+        assert workflow.chat_history[-1] == {"role": "assistant", "content": "Sure thing. "}
+
+
+class TestWorkflowClose:
+    """Test cases for Workflow.close teardown."""
+
+    def test_close_releases_session_state(self, tmp_path):
+        """Test that closing drops history, speculative requests and the stored session."""
+        from v2.src.apis import sessions
+        workflow, provider = make_workflow(tmp_path, token_latency=0)
+
+        async def run():
+            return [chunk async for chunk in workflow.process("hi")]
+
+        asyncio.run(run())
+        sessions.get(workflow.args["customer_id"])
+        workflow.close()
+
+        assert len(workflow.chat_history) == 0
+        assert workflow.args["customer_id"] not in sessions
+        assert len(workflow.speculator) == 0
@@ -0,0 +1,91 @@
+"""
+Unit tests for sentence-chunked streaming to TTS
+"""
+
+import asyncio
+from types import SimpleNamespace
+from v2.src.chunker import SentenceChunker, split_point, text_chunk
+
+
+async def upstream(items, delay=0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield text_chunk("c1", item) if isinstance(item, str) else item
+
+
+async def collect(chunker, source):
+    return [
+        chunk.choices[0].delta.content if chunk.choices else "<usage>"
+        async for chunk in chunker.stream(source)
+    ]
+
+
+class TestSplitPoint:
+    """Test cases for split_point function."""
+
+    def test_sentence_boundaries(self):
+        """Test that the last sentence end followed by whitespace is chosen."""
+        assert split_point("Hi there. How are", 40) == len("Hi there. ")
+        assert split_point("One! Two? Three", 40) == len("One! Two? ")
+        assert split_point("Costs $3.50 today", 40) == 0
+
+    def test_clause_needs_min_chars(self):
+        """Test that clause punctuation only splits after enough text."""
+        assert split_point("Sure, let me", 10) == 0
+        assert split_point("I'd be happy to help you, let me", 10) == len("I'd be happy to help you, ")
+
+
+class TestSentenceChunker:
+    """Test cases for SentenceChunker class."""
+
+    def test_groups_tokens_into_sentences(self):
+        """Test that deltas are regrouped at boundaries and the tail is flushed."""
+        chunker = SentenceChunker(max_wait=5, min_clause_chars=40)
+        tokens = ["Hel", "lo ", "there", ". ", "How ", "can ", "I ", "help", "?"]
+
+        assert asyncio.run(collect(chunker, upstream(tokens))) == ["Hello there. ", "How can I help?"]
+
+    def test_non_content_chunks_flush_and_pass_through(self):
+        """Test that usage chunks flush pending text and are forwarded."""
+        usage = SimpleNamespace(id="c1", choices=[], usage=SimpleNamespace(total_tokens=3))
+        chunker = SentenceChunker(max_wait=5)
+
+        assert asyncio.run(collect(chunker, upstream(["Okay ", "then", usage]))) == ["Okay then", "<usage>"]
+
+    def test_max_wait_flushes_complete_words(self):
+        """Test that a slow stream is flushed at word boundaries after max_wait."""
+        chunker = SentenceChunker(max_wait=0.05)
+        tokens = ["well ", "um ", "so"]
+
+        assert asyncio.run(collect(chunker, upstream(tokens, delay=0.08))) == ["well ", "um ", "so"]
+
+    def test_max_wait_keeps_partial_words(self):
+        """Test that a timeout without a space in the buffer waits instead of splitting a word."""
+        chunker = SentenceChunker(max_wait=0.05)
+        tokens = ["Supercalifragilistic", "expialidocious ", "indeed"]
+
+        assert asyncio.run(collect(chunker, upstream(tokens, delay=0.08))) == [
+            "Supercalifragilisticexpialidocious ",
+            "indeed"
+        ]
+
+    def test_upstream_errors_propagate(self):
+        """Test that an upstream failure is raised to the consumer."""
+        async def failing():
+            yield text_chunk("c1", "partial ")
+            raise RuntimeError("boom")
+
+        async def run():
+            try:
+                await collect(SentenceChunker(max_wait=5), failing())
+            except RuntimeError as e:
+                return str(e)
+
+        assert asyncio.run(run()) == "boom"
+
+    def test_from_config(self):
+        """Test that chunking can be disabled from the workflow config."""
+        assert SentenceChunker.from_config(None) is None
+        assert SentenceChunker.from_config({"enabled": False}) is None
+        assert SentenceChunker.from_config({"max_wait": 0.2}).max_wait == 0.2
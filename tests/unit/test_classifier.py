@@ -0,0 +1,192 @@
+"""
+Unit tests for the local intent classifier fast path
+"""
+
+import os
+import json
+import asyncio
+import pytest
+from v2.src.classifier import FastPathStats, IntentClassifier, IntentModel, Prediction, Rule, build_classifier
+from v2.src.llm_provider import StubProvider
+from v2.src.registry import WorkflowError, WorkflowRegistry
+from v2.src.workflow import Workflow
+
+CONFIG = """
+init_node: intent
+init_step: init
+chat_history_maxlen: 10
+global_system_prompt: test
+"""
+
+INTENT = """
+nodes:
+  init:
+    type: analyze
+    client:
+      prompt: classify
+      schema:
+        type: object
+        properties:
+          intent:
+            type: string
+            enum: [greeting, other]
+      return: intent_data
+      fast_path:
+        field: intent
+        rules:
+          - label: greeting
+            first_turn: true
+    go_to:
+      data: intent_data
+      cases: []
+      default:
+        to: intent
+        step: reply
+  reply:
+    type: process
+    client:
+      prompt: answer
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+"""
+
+SCRIPT = {
+    "responses": [
+        {"match": "classify", "response": '{"intent": "other"}'},
+        {"match": "answer", "response": "Sure, I can help with that right away."}
+    ]
+}
+
+EXAMPLES = [
+    {"assistant": "Are you the owner?", "user": "yes I own the house", "label": "property"},
+    {"assistant": "Are you the owner?", "user": "no I rent it", "label": "property"},
+    {"assistant": "Are you the owner?", "user": "my landlord owns it", "label": "property"},
+    {"assistant": "Does Tuesday at 9 work?", "user": "Tuesday works", "label": "dispatch"},
+    {"assistant": "Does Tuesday at 9 work?", "user": "do you have a later time", "label": "dispatch"},
+    {"assistant": "Does Tuesday at 9 work?", "user": "can you come tomorrow", "label": "dispatch"}
+]
+
+
+async def disconnect():
+    pass
+
+
+def shipped_classifier():
+    workflow_dir = os.path.join(os.path.dirname(__file__), "..", "..", "v2", "workflow")
+    return WorkflowRegistry(workflow_dir).node("intent", "init")["client"]["compiled_fast_path"]
+
+
+class TestIntentClassifier:
+    """Test cases for IntentModel and IntentClassifier."""
+
+    def test_model_uses_the_question(self):
+        """Test that the model learns labels from both the reply and the question it answers."""
+        model = IntentModel.train(EXAMPLES)
+
+        assert model.predict("yes it is mine", "Are you the owner?").label == "property"
+        assert model.predict("yes that works", "Does Friday at 1 work?").label == "dispatch"
+
+    def test_rules_come_first(self):
+        """Test that a matching rule answers with full confidence before the model."""
+        classifier = IntentClassifier(
+            "intent",
+            [Rule("greeting", first_turn=True)],
+            IntentModel.train(EXAMPLES),
+            stats=FastPathStats()
+        )
+
+        assert classifier.predict("I rent it") == Prediction("greeting", 1.0, "rule")
+        assert classifier.predict("I rent it", "Are you the owner?").source == "model"
+
+    def test_stats(self):
+        """Test hit, fallback and agreement counting."""
+        stats = FastPathStats()
+        classifier = IntentClassifier("intent", [Rule("greeting", first_turn=True)], threshold=0.9, stats=stats)
+
+        prediction, confident = classifier.classify("hello")
+        classifier.compare(prediction, {"intent": "greeting"}, confident=True)
+        assert classifier.classify("hello", "How can I help?") == (None, False)
+        classifier.compare(Prediction("other", 0.5, "model"), {"intent": "greeting"})
+
+        assert confident
+        assert stats.to_dict() == {
+            "calls": 2, "rule_hits": 1, "model_hits": 0, "fallbacks": 1, "compared": 1, "agreed": 0,
+            "checked": 1, "checked_agreed": 1, "hits": 1, "hit_rate": 0.5, "agreement_rate": 0.0, "precision": 1.0
+        }
+
+    def test_shipped_rules(self):
+        """Test that the shipped rules only fire on unambiguous text."""
+        classifier = shipped_classifier()
+        question = "How can I help you today?"
+
+        def rule(user):
+            return next((rule.label for rule in classifier.rules if rule.matches(user, question)), None)
+
+        assert rule("It's at 428 Seawind Street in Lakeway") == "service_address"
+        assert rule("12 north oak dr.") == "service_address"
+        assert rule("my email is millie.dowe@example.com") == "greeting"
+        assert rule("Hi, my AC stopped working") is None
+
+    @pytest.mark.parametrize("user", [
+        "I need 1 thing on the way",
+        "he is 10 minutes down the road",
+        "It is 3 years old drive unit",
+        "the heater is 15 yrs old way past due",
+        "we are about 5 miles up the road",
+        "it has been 6 months since the lane closed",
+        "I paid 200 dollars for the court",
+        "the house has 2 floors and a long drive",
+        "call me at 5 pm on my way home"
+    ])
+    def test_shipped_address_rule_near_misses(self, user):
+        """Test that numbers and street words in ordinary sentences never get a rule answer."""
+        classifier = shipped_classifier()
+        prediction = classifier.predict(user, "How can I help you today?")
+
+        assert prediction is None or prediction.source != "rule"
+
+    def test_labels_must_be_in_schema(self, tmp_path):
+        """Test that examples with labels the node can not return are rejected."""
+        path = tmp_path / "examples.jsonl"
+        path.write_text("\n".join(json.dumps(example) for example in EXAMPLES))
+
+        with pytest.raises(ValueError, match="dispatch, property"):
+            build_classifier({"field": "intent", "examples": str(path)}, ["greeting", "other"])
+
+
+class TestFastPathWorkflow:
+    """Test cases for fast-path ANALYZE nodes in a workflow."""
+
+    def make_workflow(self, tmp_path, intent=INTENT):
+        (tmp_path / "config.yaml").write_text(CONFIG)
+        (tmp_path / "intent.yaml").write_text(intent)
+        provider = StubProvider(SCRIPT, first_token_latency=0, token_latency=0)
+        return Workflow(disconnect, WorkflowRegistry(str(tmp_path)), client=provider), provider
+
+    def test_confident_turn_skips_llm(self, tmp_path):
+        """Test that the first turn is classified locally and later turns go to the LLM."""
+        workflow, provider = self.make_workflow(tmp_path)
+
+        async def run(message):
+            return [chunk async for chunk in workflow.process(message)]
+
+        asyncio.run(run("Hi, my AC stopped working."))
+        assert workflow.args["intent_data"] == {"intent": "greeting"}
+        assert provider.requests == 1
+
+        asyncio.run(run("Tell me a joke"))
+        assert workflow.args["intent_data"] == {"intent": "other"}
+        assert provider.requests == 3
+        assert workflow.metrics.get("intent/init").fast_path_hits == 1
+
+    def test_fast_path_only_on_single_field_schemas(self, tmp_path):
+        """Test that the registry rejects a fast path that could not fill the whole schema."""
+        intent = INTENT.replace("enum: [greeting, other]", "enum: [greeting, other]\n          reason:\n            type: string")
+
+        with pytest.raises(WorkflowError, match="intent/init"):
+            self.make_workflow(tmp_path, intent)
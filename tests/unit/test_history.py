@@ -0,0 +1,66 @@
+"""
+Unit tests for token-budgeted chat history
+"""
+
+from v2.src.history import ChatHistory, count_tokens, message_tokens
+from v2.src.messages import build_messages, split_prompt
+
+
+def message(role, content):
+    return {"role": role, "content": content}
+
+
+class TestChatHistory:
+    """Test cases for ChatHistory class."""
+
+    def test_tokens_counted_on_append(self):
+        """Test that the running total follows appends and trims."""
+        history = ChatHistory(maxlen=2)
+        history.append(message("user", "Hi, my AC stopped working."))
+        history.append(message("assistant", "Sorry to hear that!"))
+        history.append(message("user", "Can you come today?"))
+
+        assert count_tokens("Hi, my AC stopped working.") == 7
+        assert len(history) == 2
+        assert history[0]["content"] == "Sorry to hear that!"
+        assert history.tokens == sum(message_tokens(item) for item in history)
+
+    def test_max_tokens_drops_oldest(self):
+        """Test that the history stays under its token cap but keeps the newest message."""
+        history = ChatHistory(max_tokens=20)
+        history.extend(message("user", "one two three four five six") for _ in range(3))
+
+        assert len(history) == 2
+        assert history.tokens == 20
+
+        history.append(message("user", " ".join(["word"] * 50)))
+        assert len(history) == 1
+
+    def test_window_fits_budget(self):
+        """Test that a window holds the newest messages within the budget."""
+        history = ChatHistory()
+        history.extend(message("user", f"message number {index}") for index in range(5))
+
+        window, tokens = history.window(14)
+        assert [item["content"] for item in window] == ["message number 3", "message number 4"]
+        assert tokens == 14
+        assert history.window()[1] == history.tokens
+        assert len(history.window(1)[0]) == 1
+
+
+class TestBuildMessages:
+    """Test cases for build_messages with a history budget."""
+
+    def test_estimate_and_budget(self):
+        """Test that only the budgeted history is sent and the estimate covers every message."""
+        static, template = split_prompt("Classify the intent.\nCustomer: $name")
+        config = {"prompt_static": static, "prompt_template": template, "history_budget": 10}
+        history = ChatHistory()
+        history.extend([message("user", "a b c d e f g h"), message("user", "hello there")])
+
+        messages, tokens = build_messages("You are Uno.", config, history, {"name": "Ann"})
+
+        assert [item["content"] for item in messages] == [
+            "You are Uno.", "Classify the intent.\n", "hello there", "Customer: Ann"
+        ]
+        assert tokens == sum(message_tokens(item) for item in messages)
@@ -0,0 +1,45 @@
+"""
+Unit tests for the streaming JSON parser
+"""
+
+import pytest
+from v2.src.json_stream import JsonStream, JsonStreamError, loads
+
+
+class TestJsonStream:
+    """Test cases for JsonStream class."""
+
+    def test_fields_complete_early(self):
+        """Test that a field is reported as soon as its value closes."""
+        stream = JsonStream()
+
+        assert stream.feed('```json\n{"intent": "gree') == []
+        assert stream.feed('ting", "detail": {"a": [1, "}"]') == ["intent"]
+        assert stream.fields == {"intent": "greeting"}
+        assert stream.feed('}, "ok": true') == ["detail"]
+        assert stream.feed('}\n```') == ["ok"]
+        assert stream.close() == {"intent": "greeting", "detail": {"a": [1, "}"]}, "ok": True}
+
+    def test_single_character_deltas(self):
+        """Test feeding one character at a time."""
+        text = '{"a": "x\\"y", "b": -1.5e3, "c": null}'
+        stream = JsonStream()
+        completed = []
+        for char in text:
+            completed += stream.feed(char)
+
+        assert completed == ["a", "b", "c"]
+        assert stream.close() == {"a": 'x"y', "b": -1500.0, "c": None}
+
+    @pytest.mark.parametrize("text", [
+        'Sure! {"a": 1}',
+        '{"a": 1,}',
+        '{"a" 1}',
+        '{"a": tru e}',
+        '{"a": 1} trailing',
+        '{"a": 1',
+    ])
+    def test_invalid_output(self, text):
+        """Test that anything but one JSON object is rejected."""
+        with pytest.raises(JsonStreamError):
+            loads(text)
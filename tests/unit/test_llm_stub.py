@@ -0,0 +1,89 @@
+"""
+Unit tests for the offline LLM stub providers
+"""
+
+import json
+import asyncio
+from src.llm_provider import StubProvider as SyncStubProvider
+from v2.src.llm_provider import StubProvider
+from v2.src.schema import compile_schema
+
+
+SCRIPT = {
+    "responses": [
+        {"match": "classify", "chunks": ['{"intent": ', '"service"}']},
+        {"match": "greet", "response": "Hello, how can I help?"}
+    ],
+    "default": "Sorry?"
+}
+
+
+async def collect(provider, **kwargs):
+    stream = await provider.create(model="gpt-4o", stream=True, **kwargs)
+    return [chunk async for chunk in stream]
+
+
+def text_of(chunks):
+    return "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+
+
+class TestStubProvider:
+    """Test cases for the v2 StubProvider class."""
+
+    def test_scripted_response(self):
+        """Test that the first matching entry is streamed word by word."""
+        provider = StubProvider(SCRIPT, token_latency=0, first_token_latency=0)
+        chunks = asyncio.run(collect(provider, messages=[{"role": "system", "content": "greet the user"}]))
+
+        assert [chunk.choices[0].delta.content for chunk in chunks[:-1]] == ["Hello, ", "how ", "can ", "I ", "help?"]
+        assert chunks[-1].choices[0].finish_reason == "stop"
+        assert provider.requests == 1
+
+    def test_recorded_chunks_and_usage(self):
+        """Test that recorded chunks replay unchanged, followed by usage when requested."""
+        provider = StubProvider(SCRIPT, token_latency=0, first_token_latency=0)
+        chunks = asyncio.run(collect(
+            provider,
+            messages=[{"role": "system", "content": "classify this"}],
+            stream_options={"include_usage": True}
+        ))
+
+        assert text_of(chunks) == '{"intent": "service"}'
+        assert chunks[-1].choices == []
+        assert chunks[-1].usage.completion_tokens == 2
+
+    def test_schema_fallback(self):
+        """Test that unmatched ANALYZE requests get an object valid for their schema."""
+        schema = compile_schema("stub/test", {
+            "type": "object",
+            "properties": {
+                "intent": {"type": "string", "enum": ["scheduling", "no_topic"]},
+                "urgent": {"type": "boolean"}
+            }
+        })
+        provider = StubProvider(SCRIPT, token_latency=0, first_token_latency=0)
+        chunks = asyncio.run(collect(
+            provider,
+            messages=[{"role": "system", "content": "other"}],
+            response_format=schema.response_format
+        ))
+
+        assert schema.validate(json.loads(text_of(chunks))) == {
+            "intent": "scheduling",
+            "urgent": False
+        }
+
+    def test_jitter_is_bounded(self):
+        """Test that per-token delays stay within latency +/- jitter."""
+        provider = StubProvider(token_latency=0.02, jitter=0.01, seed=1)
+        delays = [provider.delay() for _ in range(100)]
+
+        assert all(0.01 <= delay <= 0.03 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_sync_stub(self):
+        """Test that the v1 stub streams the same chunks from a worker thread."""
+        provider = SyncStubProvider(SCRIPT, token_latency=0, first_token_latency=0)
+        chunks = list(provider.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}]))
+
+        assert text_of(chunks) == "Sorry?"
@@ -0,0 +1,62 @@
+"""
+Unit tests for per-node latency and token metrics
+"""
+
+from v2.src.metrics import Histogram, NodeMetrics, NodeRecord
+
+
+class TestHistogram:
+    """Test cases for Histogram class."""
+
+    def test_percentiles_use_bucket_bounds(self):
+        """Test that percentiles resolve to bucket upper bounds, capped at the max."""
+        histogram = Histogram((10, 100, 1000))
+        for value in (1, 2, 3, 50, 60, 70, 80, 90, 95, 400):
+            histogram.observe(value)
+
+        assert histogram.count == 10
+        assert histogram.percentile(30) == 10
+        assert histogram.percentile(50) == 100
+        assert histogram.percentile(99) == 400
+        assert histogram.to_dict()["buckets"] == {"le_10": 3, "le_100": 6, "le_1000": 1, "inf": 0}
+
+    def test_empty(self):
+        """Test that an empty histogram reports no percentiles."""
+        histogram = Histogram()
+
+        assert histogram.percentile(50) is None
+        assert histogram.to_dict()["mean"] is None
+
+
+class TestNodeMetrics:
+    """Test cases for NodeMetrics class."""
+
+    def test_session_records_roll_up_to_process(self):
+        """Test that session metrics aggregate per node and forward to the parent."""
+        process = NodeMetrics()
+        first, second = NodeMetrics(parent=process), NodeMetrics(parent=process)
+
+        first.record(NodeRecord("intent/init", "analyze", 120.0, 80.0, 1000, 10, 800, next="greeting/init"))
+        first.record(NodeRecord("intent/init", "analyze", 80.0, 40.0, 1000, 10, 0, next="intent/no_topic"))
+        second.record(NodeRecord("greeting/greeting", "process", 300.0, 90.0, 500, 40, 0, finished=True))
+        second.record(NodeRecord("greeting/fetch_contact_information", "callback", 1.0, error="KeyError()"))
+
+        stats = first.get("intent/init")
+        assert stats.calls == 2
+        assert stats.prompt_cache_rate == 0.4
+        assert stats.routes == {"greeting/init": 1, "intent/no_topic": 1}
+        assert second.get("intent/init") is None
+
+        assert set(process.nodes) == {"intent/init", "greeting/greeting", "greeting/fetch_contact_information"}
+        assert process.get("greeting/fetch_contact_information").errors == 1
+        assert process.top("wall_ms_total", 2) == [("greeting/greeting", 300.0), ("intent/init", 200.0)]
+        assert process.top("prompt_tokens", 1) == [("intent/init", 2000)]
+
+    def test_recent_records_are_bounded(self):
+        """Test that only the latest records are kept for inspection."""
+        metrics = NodeMetrics(recent=2)
+        for index in range(3):
+            metrics.record(NodeRecord(f"node/{index}", "process", float(index)))
+
+        assert [record["node_id"] for record in metrics.to_dict(recent=True)["recent"]] == ["node/1", "node/2"]
+        assert metrics.get("node/0").calls == 1
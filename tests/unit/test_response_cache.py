@@ -0,0 +1,211 @@
+"""
+Unit tests for the ANALYZE response cache
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from v2.src import response_cache
+from v2.src.llm_provider import StubProvider
+from v2.src.registry import WorkflowError, WorkflowRegistry
+from v2.src.response_cache import ResponseCache, cache_key
+from v2.src.workflow import Workflow
+
+CONFIG = """
+init_node: intent
+init_step: init
+chat_history_maxlen: 10
+global_system_prompt: test
+"""
+
+INTENT = """
+nodes:
+  init:
+    type: analyze
+    client:
+      prompt: classify
+      schema:
+        type: object
+        properties:
+          intent:
+            type: string
+      return: intent_data
+      cache:
+        user_messages: 1
+        min_words: 3
+    go_to:
+      data: intent_data
+      cases: []
+      default:
+        to: intent
+        step: reply
+  reply:
+    type: process
+    client:
+      prompt: answer
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+"""
+
+
+SCRIPT = {
+    "responses": [
+        {"match": "classify", "response": '{"intent": "reply"}'},
+        {"match": "answer", "response": "Sure, I can help with that right away."}
+    ]
+}
+
+
+async def disconnect():
+    pass
+
+
+def messages(*users):
+    return [{"role": "system", "content": "classify"}] + [{"role": "user", "content": user} for user in users]
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache and cache_key."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry goes first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are dropped on lookup."""
+        cache = ResponseCache()
+        cache.set("a", {"intent": "other"}, ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats.expired == 1
+
+    def test_hits_are_copies(self):
+        """Test that mutating a returned value does not change the cached one."""
+        cache = ResponseCache()
+        cache.set("a", {"intent": "other"})
+        cache.get("a")["intent"] = "changed"
+
+        assert cache.get("a") == {"intent": "other"}
+
+    def test_sqlite_tier(self, tmp_path):
+        """Test that entries written to SQLite are found by a fresh instance."""
+        path = str(tmp_path / "cache.db")
+        ResponseCache(path=path).set("a", {"intent": "other"})
+        cache = ResponseCache(path=path)
+
+        assert cache.get("a") == {"intent": "other"}
+        assert cache.stats.disk_hits == 1
+        assert len(cache) == 1
+
+    def test_async_sqlite_tier_runs_off_the_loop(self, tmp_path):
+        """Test that aget/aset read and write SQLite from a worker thread, not the event loop."""
+        path = str(tmp_path / "cache.db")
+        threads = []
+
+        class Recording(ResponseCache):
+            def _get_disk(self, key):
+                threads.append(threading.get_ident())
+                return super()._get_disk(key)
+
+            def _set_disk(self, key, expires_at, text):
+                threads.append(threading.get_ident())
+                super()._set_disk(key, expires_at, text)
+
+        async def run():
+            await Recording(path=path).aset("a", {"intent": "other"})
+            cache = Recording(path=path)
+            return cache, await cache.aget("a"), await cache.aget("a"), await cache.aget("b"), threading.get_ident()
+
+        cache, first, second, missing, loop_thread = asyncio.run(run())
+
+        assert first == second == {"intent": "other"}
+        assert missing is None
+        # set, disk hit, disk miss; the second lookup is served from memory
+        assert len(threads) == 3 and loop_thread not in threads
+        assert cache.stats.hits == 2 and cache.stats.disk_hits == 1 and cache.stats.misses == 1
+
+    def test_key_normalization(self):
+        """Test that casing and punctuation do not change the key, but the node and prompt do."""
+        config = {"user_messages": 1}
+        key = cache_key("intent/init", messages("My AC stopped working!"), config)
+
+        assert key == cache_key("intent/init", messages("my ac  stopped working"), config)
+        assert key != cache_key("service/classify_service", messages("my ac stopped working"), config)
+        assert key != cache_key("intent/init", messages("my heater stopped working"), config)
+
+    def test_key_skips_short_messages(self):
+        """Test that replies under min_words are not cached and older turns only count when asked."""
+        assert cache_key("intent/init", messages("yes"), {"min_words": 2}) is None
+        assert cache_key("intent/init", messages("a", "my ac broke"), {"user_messages": 1}) == \
+            cache_key("intent/init", messages("b", "my ac broke"), {"user_messages": 1})
+        assert cache_key("intent/init", messages("a", "my ac broke"), {"user_messages": 2}) != \
+            cache_key("intent/init", messages("b", "my ac broke"), {"user_messages": 2})
+
+
+class TestCachedWorkflow:
+    """Test cases for cached ANALYZE nodes in a workflow."""
+
+    def make_workflow(self, tmp_path):
+        (tmp_path / "config.yaml").write_text(CONFIG)
+        (tmp_path / "intent.yaml").write_text(INTENT)
+        provider = StubProvider(SCRIPT, first_token_latency=0, token_latency=0)
+        return Workflow(disconnect, WorkflowRegistry(str(tmp_path)), client=provider), provider
+
+    def test_repeated_input_skips_llm(self, tmp_path, monkeypatch):
+        """Test that a second call with the same opening request reuses the classification."""
+        monkeypatch.setattr(response_cache, "_response_cache", ResponseCache())
+
+        async def run(workflow, message):
+            return [chunk async for chunk in workflow.process(message)]
+
+        first, provider = self.make_workflow(tmp_path)
+        asyncio.run(run(first, "Hi, my AC stopped working."))
+        second, second_provider = self.make_workflow(tmp_path)
+        asyncio.run(run(second, "hi my ac stopped working"))
+
+        assert provider.requests == 2
+        assert second_provider.requests == 1
+        assert second.args["intent_data"] == first.args["intent_data"]
+        assert second.metrics.get("intent/init").response_cache_hits == 1
+
+    def test_sqlite_cache_shared_across_workers(self, tmp_path, monkeypatch):
+        """Test that a classification stored by one worker's cache is read back by another's."""
+        path = str(tmp_path / "cache.db")
+
+        async def run(workflow, message):
+            return [chunk async for chunk in workflow.process(message)]
+
+        monkeypatch.setattr(response_cache, "_response_cache", ResponseCache(path=path))
+        first, _ = self.make_workflow(tmp_path)
+        asyncio.run(run(first, "Hi, my AC stopped working."))
+        cache = ResponseCache(path=path)
+        monkeypatch.setattr(response_cache, "_response_cache", cache)
+        second, provider = self.make_workflow(tmp_path)
+        asyncio.run(run(second, "hi my ac stopped working"))
+
+        assert provider.requests == 1
+        assert cache.stats.disk_hits == 1
+        assert second.args["intent_data"] == first.args["intent_data"]
+
+    def test_cache_only_on_analyze(self, tmp_path):
+        """Test that cache on a non-analyze node is rejected at load time."""
+        (tmp_path / "config.yaml").write_text(CONFIG)
+        (tmp_path / "intent.yaml").write_text(INTENT.replace("prompt: answer", "prompt: answer\n      cache: true"))
+
+        with pytest.raises(WorkflowError, match="intent/reply"):
+            WorkflowRegistry(str(tmp_path))
@@ -0,0 +1,102 @@
+"""
+Unit tests for the v2 ServiceCatalog
+"""
+
+import os
+import json
+import pytest
+from v2.src import service_index
+from v2.src.catalog import ServiceCatalog
+from v2.src.service_index import RetrievalStats, ServiceIndex
+
+SERVICES_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "v2", "data", "services.json")
+
+
+def make_service(trade, serviceable_type, service_type, overbookable=True):
+    return {
+        "trade": trade,
+        "serviceable_type": serviceable_type,
+        "service_type": service_type,
+        "is_overbookable": overbookable,
+        "qualification_questions": []
+    }
+
+
+class TestServiceCatalog:
+    """Test cases for ServiceCatalog class."""
+
+    def test_listing_is_deduplicated(self):
+        """Test the cached listing against the shipped services file."""
+        catalog = ServiceCatalog(SERVICES_PATH)
+        with open(SERVICES_PATH) as f:
+            services = json.load(f)
+        keys = {(s["trade"], s["serviceable_type"], s["service_type"]) for s in services}
+
+        assert len(catalog.listing) == len(keys)
+        assert catalog.prompt.count("\n") == len(keys) - 1
+
+    def test_find_matches_first_entry(self, tmp_path):
+        """Test indexed lookup keeps linear scan semantics."""
+        path = tmp_path / "services.json"
+        path.write_text(json.dumps([
+            make_service("hvac", "Air Conditioning", "Repair", True),
+            make_service("hvac", "Air Conditioning", "Repair", False)
+        ]))
+        catalog = ServiceCatalog(str(path))
+
+        found = catalog.find({"trade": "hvac", "serviceable_type": "Air Conditioning", "service_type": "Repair"})
+        assert found["is_overbookable"] == True
+        assert catalog.find({"trade": "plumbing"}) is None
+
+    def test_reload_on_change(self, tmp_path):
+        """Test that a modified file is picked up."""
+        path = tmp_path / "services.json"
+        path.write_text(json.dumps([make_service("hvac", "Furnace", "Repair")]))
+        catalog = ServiceCatalog(str(path), check_interval=0)
+
+        path.write_text(json.dumps([make_service("plumbing", "Drain", "Repair")]))
+        os.utime(path, (os.stat(path).st_mtime + 10,) * 2)
+
+        assert catalog.listing[0]["trade"] == "plumbing"
+
+
+class TestServiceSearch:
+    """Test cases for top-k service retrieval."""
+
+    def test_top_matches(self):
+        """Test that caller wording finds the right services in the shipped catalog."""
+        catalog = ServiceCatalog(SERVICES_PATH)
+
+        assert json.loads(catalog.search(["Hi, my AC stopped working."], 3).split("\n")[0]) == \
+            {"trade": "hvac", "serviceable_type": "Air Conditioning", "service_type": "Repair"}
+        assert "Tankless WH" in catalog.search(["I need a quote for a new tankless water heater"], 1)
+        assert "Toilet" in catalog.search(["I need help", "the toilet keeps running"], 1)
+
+    def test_unrelated_query_falls_back(self):
+        """Test that the full listing is returned when nothing resembles the query."""
+        catalog = ServiceCatalog(SERVICES_PATH)
+
+        assert catalog.search(["yes that is right"], 3) == catalog.prompt
+
+    def test_paraphrase_without_shared_words_falls_back(self):
+        """Test that a weak best match sends the full listing instead of unrelated candidates."""
+        catalog = ServiceCatalog(SERVICES_PATH)
+
+        services = catalog.search(["the lights went out in half the house"], 12)
+
+        assert services == catalog.prompt
+        assert "Partial loss of power" in services
+
+    def test_without_numpy(self, monkeypatch):
+        """Test that the pure-Python fallback scores and ranks like the matrix product."""
+        texts = ["hvac Furnace Repair", "plumbing Toilet Repair", "electrical Panel Estimate"]
+        query = ["my furnace is broken"]
+        fast = ServiceIndex(texts, stats=RetrievalStats())
+        monkeypatch.setattr(service_index, "np", None)
+        fallback = ServiceIndex(texts, stats=RetrievalStats())
+        vector = fallback.query_vector(query)
+
+        assert fallback.matrix is None
+        assert fallback.scores(vector) == pytest.approx(fast.scores(vector), abs=1e-6)
+        assert fallback.search(query, 3) == fast.search(query, 3)
+        assert fallback.search(query, 3)[0] == 0
@@ -0,0 +1,105 @@
+"""
+Unit tests for the v1 SessionBridge
+"""
+
+import os
+import uuid
+import asyncio
+import threading
+import src.llm_provider as llm_provider
+from src.agent import Agent
+from src.bridge import SessionBridge
+from src.llm_provider import StubProvider
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+
+SCRIPT = {
+    "responses": [{
+        "match": "Business service features",
+        "response": '{"full_fit": true, "service_type": "Plumbing", "service_area": "Waterford", '
+                    '"service_building": "residental", "service_type_failed": false, '
+                    '"service_area_failed": false, "service_building_failed": false}'
+    }],
+    "default": "When would you like us to come?"
+}
+
+
+async def run_workflow(bridge, turns):
+    for _ in range(turns):
+        message = await bridge.wait_input()
+        for word in message.split():
+            bridge.put_output(word)
+        bridge.finish_output()
+    bridge.close()
+
+
+async def disconnect():
+    pass
+
+
+class TestSessionBridge:
+    """Test cases for SessionBridge class."""
+
+    def test_round_trip(self):
+        """Test input delivery and streamed output across turns."""
+        bridge = SessionBridge()
+
+        async def chat():
+            workflow = asyncio.create_task(run_workflow(bridge, 2))
+            outputs = []
+            for message in ("hello there", "bye"):
+                assert await bridge.send_input(message)
+                outputs.append([chunk async for chunk in bridge.output()])
+            await workflow
+            return outputs
+
+        assert asyncio.run(chat()) == [["hello", "there"], ["bye"]]
+
+    def test_closed_workflow(self):
+        """Test that a finished workflow releases the waiting agent."""
+        bridge = SessionBridge()
+
+        async def chat():
+            asyncio.create_task(run_workflow(bridge, 0))
+            return await bridge.send_input("hello")
+
+        assert asyncio.run(chat()) == False
+        assert bridge.closed
+
+    def test_close_from_another_thread(self):
+        """Test that eviction from a background thread wakes the waiting workflow."""
+        bridge = SessionBridge()
+
+        async def workflow():
+            waiting = asyncio.create_task(bridge.wait_input())
+            await asyncio.sleep(0)
+            threading.Thread(target=bridge.close).start()
+            return await waiting
+
+        assert asyncio.run(workflow()) is None
+
+
+class TestAgent:
+    """Test cases for running v1 workflows as coroutines."""
+
+    def test_calls_do_not_start_threads(self, monkeypatch):
+        """Test that concurrent calls run on the event loop without a thread each."""
+        monkeypatch.chdir(ROOT)
+        monkeypatch.setattr(llm_provider, "_provider", StubProvider(SCRIPT, token_latency=0, first_token_latency=0))
+        threads = threading.active_count()
+
+        async def call(agent):
+            return [chunk async for chunk in agent.process("hi")]
+
+        async def run():
+            agents = [Agent("./workflows/test.yaml", str(uuid.uuid4()), disconnect) for _ in range(50)]
+            replies = await asyncio.gather(*(call(agent) for agent in agents))
+            assert all(agent.input_required for agent in agents)
+            for agent in agents:
+                agent.close()
+            return replies
+
+        replies = asyncio.run(run())
+
+        assert all(reply for reply in replies)
+        assert threading.active_count() - threads <= int(os.getenv("CALLBACK_WORKERS", "4"))
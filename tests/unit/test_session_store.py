@@ -0,0 +1,105 @@
+"""
+Unit tests for the v2 session stores
+"""
+
+import os
+import time
+import asyncio
+from v2.src.apis import evict_sessions
+from v2.src.llm_provider import StubProvider
+from v2.src.registry import WorkflowRegistry
+from v2.src.session import SessionStore, SQLiteSessionStore
+from v2.src.workflow import Workflow
+
+
+async def disconnect():
+    pass
+
+
+def new_session():
+    return {"customer_status": {"greeting": False}}
+
+
+class TestSessionStore:
+    """Test cases for SessionStore classes."""
+
+    def test_sessions_are_isolated(self):
+        """Test that two calls never share state."""
+        store = SessionStore(new_session)
+        first = store.get("a")
+        first["customer_status"]["greeting"] = True
+
+        assert store.get("b")["customer_status"]["greeting"] == False
+        assert store.get("a") is first
+
+    def test_ttl_eviction(self):
+        """Test that idle sessions are evicted."""
+        store = SessionStore(new_session, ttl=0)
+        store.get("a")
+
+        assert store.evict_expired() == 1
+        assert "a" not in store
+
+    def test_sqlite_survives_restart(self, tmp_path):
+        """Test that saved sessions are reloaded by a new store."""
+        path = str(tmp_path / "sessions.db")
+        store = SQLiteSessionStore(path, new_session)
+        state = store.get("a")
+        state["customer_status"]["greeting"] = True
+        store.save(state)
+
+        restarted = SQLiteSessionStore(path, new_session)
+        assert restarted.get("a")["customer_status"]["greeting"] == True
+
+        restarted.delete("a")
+        assert SQLiteSessionStore(path, new_session).get("a")["customer_status"]["greeting"] == False
+
+    def test_expiry_skips_active_sessions(self):
+        """Test that only sessions idle past the ttl are evicted and counted."""
+        store = SessionStore(new_session, ttl=0.05)
+        store.get("idle")
+        active = store.get("active")
+        store.get("deleted")
+        time.sleep(0.1)
+        active.touch()
+        store.delete("deleted")
+
+        assert store.evict_expired() == 1
+        assert "idle" not in store
+        assert store.get("active") is active
+        assert store.evicted == 1
+        assert 0 < store.next_expiry() <= 0.05
+
+    def test_sweeper_evicts_in_background(self):
+        """Test that the worker's sweeper task evicts idle sessions on its own."""
+        store = SessionStore(new_session, ttl=0)
+        store.get("a")
+
+        async def run():
+            sweeper = asyncio.create_task(evict_sessions(store))
+            await asyncio.sleep(0)
+            sweeper.cancel()
+
+        asyncio.run(run())
+        assert "a" not in store
+        assert store.evicted == 1
+
+    def test_workflow_resumes_session_by_id(self, tmp_path):
+        """Test that a workflow created with a known session id reattaches to the persisted session."""
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), new_session)
+        state = store.get("room-1")
+        state["customer_status"]["greeting"] = True
+        store.save(state)
+
+        restarted = SQLiteSessionStore(str(tmp_path / "sessions.db"), new_session)
+        registry = WorkflowRegistry(os.path.join(os.path.dirname(__file__), "..", "..", "v2", "workflow"))
+        workflow = Workflow(disconnect, registry, client=StubProvider({"responses": []}), session_id="room-1")
+
+        assert workflow.args["customer_id"] == "room-1"
+        assert restarted.get(workflow.args["customer_id"])["customer_status"]["greeting"] == True
+        assert Workflow(disconnect, registry, client=StubProvider({"responses": []})).args["customer_id"] != "room-1"
+
+    def test_only_persistent_stores_block(self):
+        """Test that only stores doing I/O on save are offloaded from the event loop."""
+        assert not SessionStore.blocking
+        assert SQLiteSessionStore.blocking
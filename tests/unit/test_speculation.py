@@ -0,0 +1,263 @@
+"""
+Unit tests for v2 speculative node requests
+"""
+
+import asyncio
+from v2.src.client import Client
+from v2.src.history import ChatHistory
+from v2.src.llm_provider import StubProvider
+from v2.src.node import Node
+from v2.src.registry import WorkflowRegistry
+from v2.src.speculation import Prefetch, SpeculationStats, Speculator
+from v2.src.types import NodeType
+from v2.src.workflow import Workflow
+
+SCRIPT = {"responses": [{"match": "answer", "response": "one two three"}]}
+
+ANALYZE_SCRIPT = {
+    "responses": [
+        {"match": "classify", "chunks": ['{"intent": ', '"reply"', ', "reason": ', '"they asked"', '}']}
+    ]
+}
+
+CONFIG = """
+init_node: intent
+init_step: reply
+chat_history_maxlen: 10
+global_system_prompt: test
+speculative_execution: true
+"""
+
+INTENT = """
+nodes:
+  reply:
+    type: process
+    client:
+      prompt: answer for ${name}
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: reply
+  init:
+    type: analyze
+    client:
+      prompt: classify
+      schema:
+        type: object
+        properties:
+          intent:
+            type: string
+            enum: [reply, other]
+          reason:
+            type: string
+      return: intent_data
+    go_to:
+      data: intent_data
+      cases:
+        - name: intent
+          value: reply
+          to: intent
+          step: reply
+      default:
+        to: intent
+        step: reply
+"""
+
+
+class CountingProvider(StubProvider):
+    """Counts the chunks handed to the caller so far."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.yielded = 0
+
+    async def create(self, **kwargs):
+        stream = await super().create(**kwargs)
+        provider = self
+
+        class Counting:
+            async def __aiter__(self):
+                async for chunk in stream:
+                    provider.yielded += 1
+                    yield chunk
+
+            async def close(self):
+                await stream.close()
+
+        return Counting()
+
+
+async def disconnect():
+    pass
+
+
+def make_registry(tmp_path):
+    (tmp_path / "config.yaml").write_text(CONFIG)
+    (tmp_path / "intent.yaml").write_text(INTENT)
+    return WorkflowRegistry(str(tmp_path))
+
+
+def make_client(registry, provider, args):
+    return Client(
+        type=NodeType.PROCESS,
+        config=registry.node("intent", "reply")["client"],
+        args=args,
+        chat_history=ChatHistory(10),
+        client=provider,
+        node_id="intent/reply"
+    )
+
+
+def content(chunks):
+    return "".join(chunk.choices[0].delta.content for chunk in chunks if chunk.choices and chunk.choices[0].delta.content)
+
+
+async def finish(prefetch: Prefetch):
+    async for _ in prefetch.stream():
+        pass
+
+
+def run_analyze(tmp_path, speculate=True):
+    registry = make_registry(tmp_path)
+    config = dict(registry.node("intent", "init"), speculate=speculate)
+    provider = CountingProvider(ANALYZE_SCRIPT, first_token_latency=0, token_latency=0)
+    started = []
+
+    def prepare(target, depends_on):
+        started.append((target["to"], target["step"], provider.yielded))
+        client = make_client(registry, provider, {"global_system_prompt": "test", "name": "Ann"})
+        return "intent/reply", client.messages(), client.request
+
+    speculator = Speculator(prepare, stats=SpeculationStats())
+    args = {"global_system_prompt": "test"}
+
+    async def run():
+        async for _ in Node(config, args, ChatHistory(10), provider).process(None, speculator):
+            pass
+        pending = len(speculator)
+        speculator.cancel_all()
+        return pending
+
+    return started, asyncio.run(run())
+
+
+class TestSpeculation:
+    """Test cases for Speculator and Prefetch."""
+
+    def test_claimed_hit_replays_without_a_new_request(self, tmp_path):
+        """Test that a claimed prefetch with matching messages is replayed and counted as a hit."""
+        provider = StubProvider(SCRIPT, first_token_latency=0, token_latency=0)
+        speculator = Speculator(stats=SpeculationStats())
+        client = make_client(make_registry(tmp_path), provider, {"global_system_prompt": "test", "name": "Ann"})
+
+        async def run():
+            speculator.start("intent/reply", client.messages(), client.request)
+            prefetch = speculator.claim("intent/reply")
+            return prefetch, [chunk async for chunk in client.stream(prefetch, speculator)]
+
+        prefetch, chunks = asyncio.run(run())
+        assert prefetch is not None and client.prefetched
+        assert content(chunks) == "one two three"
+        assert provider.requests == 1
+        assert speculator.stats.hits == 1
+        assert speculator.stats.wasted_completion_tokens == 0
+        assert len(speculator) == 0
+
+    def test_stale_prefetch_is_dropped_after_args_change(self, tmp_path):
+        """Test that a prefetch built from outdated args is rejected and the node is requested again."""
+        provider = StubProvider(SCRIPT, first_token_latency=0, token_latency=0)
+        speculator = Speculator(stats=SpeculationStats())
+        args = {"global_system_prompt": "test", "name": "Ann"}
+        client = make_client(make_registry(tmp_path), provider, args)
+
+        async def run():
+            speculator.start("intent/reply", client.messages(), client.request)
+            prefetch = speculator.claim("intent/reply")
+            await finish(prefetch)
+            args["name"] = "Bob"
+            chunks = [chunk async for chunk in client.stream(prefetch, speculator)]
+            return prefetch, chunks
+
+        prefetch, chunks = asyncio.run(run())
+        assert not client.prefetched
+        assert "Ann" in str(prefetch.messages) and "Bob" not in str(prefetch.messages)
+        assert content(chunks) == "one two three"
+        assert provider.requests == 2
+        assert speculator.stats.hits == 0
+        assert speculator.stats.stale == 1
+        assert speculator.stats.wasted_completion_tokens == prefetch.completion_tokens == 3
+
+    def test_claim_cancels_the_other_branches(self, tmp_path):
+        """Test that claiming one node cancels every other in-flight prefetch."""
+        provider = StubProvider(SCRIPT, first_token_latency=1, token_latency=0)
+        speculator = Speculator(stats=SpeculationStats())
+        client = make_client(make_registry(tmp_path), provider, {"global_system_prompt": "test", "name": "Ann"})
+
+        async def run():
+            speculator.start("intent/reply", client.messages(), client.request)
+            speculator.start("intent/other", client.messages(), client.request)
+            pending = dict(speculator._pending)
+            claimed = speculator.claim("intent/other")
+            await asyncio.sleep(0)
+            claimed.cancel()
+            return pending, claimed
+
+        pending, claimed = asyncio.run(run())
+        assert claimed is pending["intent/other"]
+        assert pending["intent/reply"]._task.cancelled()
+        assert len(speculator) == 0
+        assert speculator.stats.started == 2
+        assert speculator.stats.cancelled == 1
+
+    def test_cancel_all_counts_wasted_tokens(self, tmp_path):
+        """Test that tokens already streamed into cancelled prefetches are counted as waste."""
+        provider = StubProvider(SCRIPT, first_token_latency=0, token_latency=0)
+        speculator = Speculator(stats=SpeculationStats())
+        client = make_client(make_registry(tmp_path), provider, {"global_system_prompt": "test", "name": "Ann"})
+
+        async def run():
+            speculator.start("intent/reply", client.messages(), client.request)
+            speculator.start("intent/other", client.messages(), client.request)
+            await asyncio.gather(*(finish(prefetch) for prefetch in speculator._pending.values()))
+            speculator.cancel_all()
+
+        asyncio.run(run())
+        assert len(speculator) == 0
+        assert speculator.stats.cancelled == 2
+        assert speculator.stats.wasted_completion_tokens == 6
+
+    def test_workflow_close_cancels_pending_prefetches(self, tmp_path):
+        """Test that tearing a call down cancels the speculative requests it started."""
+        registry = make_registry(tmp_path)
+        provider = StubProvider(SCRIPT, first_token_latency=1, token_latency=0)
+        workflow = Workflow(disconnect, registry, client=provider)
+        client = make_client(registry, provider, {"global_system_prompt": "test", "name": "Ann"})
+
+        async def run():
+            workflow.speculator.start("intent/reply", client.messages(), client.request)
+            prefetch = workflow.speculator._pending["intent/reply"]
+            workflow.close()
+            await asyncio.sleep(0)
+            return prefetch
+
+        prefetch = asyncio.run(run())
+        assert prefetch._task.cancelled()
+        assert len(workflow.speculator) == 0
+
+    def test_target_starts_once_go_to_fields_are_streamed(self, tmp_path):
+        """Test that an ANALYZE node starts its target right after the routing fields, not before."""
+        started, pending = run_analyze(tmp_path)
+
+        # Started as soon as the chunk closing "intent" arrived, before "reason".
+        assert started == [("intent", "reply", 2)]
+        assert pending == 1
+
+    def test_node_opt_out_disables_early_routing(self, tmp_path):
+        """Test that `speculate: false` on the node also stops early routing."""
+        started, pending = run_analyze(tmp_path, speculate=False)
+
+        assert started == []
+        assert pending == 0
@@ -0,0 +1,138 @@
+"""
+Unit tests for background conversation summarization
+"""
+
+import yaml
+import asyncio
+from collections import deque
+import src.llm_provider as llm_provider
+from src.history import ChatHistory as SyncChatHistory, message_tokens as sync_message_tokens
+from src.llm_provider import StubProvider as SyncStubProvider
+from src.summary import Summarizer as SyncSummarizer, summary_topics
+from v2.src.history import ChatHistory, message_tokens
+from v2.src.llm_provider import StubProvider
+from v2.src.summary import Summarizer, SummaryStats
+
+SCRIPT = {
+    "responses": [
+        {"match": "about 'greeting'", "response": "Customer is Ann Lee, phone 555-0100."},
+        {"match": "about 'service'", "response": "AC repair, unit is not cooling."}
+    ]
+}
+
+
+def conversation():
+    history = ChatHistory()
+    for topic in ("greeting", "greeting", "service", "service"):
+        history.append({"role": "user", "content": f"{topic} question"}, topic)
+        history.append({"role": "assistant", "content": f"{topic} answer"}, topic)
+    return history
+
+
+class TestSummarizer:
+    """Test cases for the v2 Summarizer class."""
+
+    def test_folds_older_turns_per_topic(self):
+        """Test that older messages are replaced by one summary per topic."""
+        history = conversation()
+        stats = SummaryStats()
+        summarizer = Summarizer(StubProvider(SCRIPT, token_latency=0, first_token_latency=0), keep_recent=2, min_batch=4, stats=stats)
+
+        async def run():
+            await summarizer.schedule(history)
+
+        asyncio.run(run())
+
+        assert len(history) == 2
+        assert history.summaries == {
+            "greeting": "Customer is Ann Lee, phone 555-0100.",
+            "service": "AC repair, unit is not cooling."
+        }
+        assert "- greeting: Customer is Ann Lee" in history.summary_message["content"]
+        assert history.tokens == sum(message_tokens(message) for message in history)
+        assert stats.runs == 1 and stats.folded_messages == 6 and stats.folded_tokens > 0
+
+    def test_waits_for_enough_messages(self):
+        """Test that nothing is scheduled below the batch size."""
+        summarizer = Summarizer(StubProvider(SCRIPT), keep_recent=8, min_batch=6)
+
+        assert summarizer.schedule(conversation()) is None
+
+    def test_messages_added_meanwhile_are_kept(self):
+        """Test that turns appended while summarizing stay in the history."""
+        history = conversation()
+        summarizer = Summarizer(StubProvider(SCRIPT, token_latency=0, first_token_latency=0.01), keep_recent=2, min_batch=4)
+
+        async def run():
+            task = summarizer.schedule(history)
+            history.append({"role": "user", "content": "new question"}, "service")
+            await task
+
+        asyncio.run(run())
+
+        assert [message["content"] for message in history] == ["service question", "service answer", "new question"]
+
+    def test_failed_summary_keeps_history(self):
+        """Test that an empty summary folds nothing."""
+        history = conversation()
+        summarizer = Summarizer(StubProvider({"default": ""}, token_latency=0, first_token_latency=0), keep_recent=2, min_batch=4)
+
+        async def run():
+            await summarizer.schedule(history)
+
+        asyncio.run(run())
+
+        assert len(history) == 8
+        assert history.summary_message is None
+
+
+class TestSyncSummarizer:
+    """Test cases for the v1 Summarizer class."""
+
+    def test_replaces_topic_summary(self, monkeypatch):
+        """Test that a node's exchanges become its entry in the summaries deque."""
+        monkeypatch.setattr(llm_provider, "_provider", SyncStubProvider({"default": "Area confirmed."}, token_latency=0, first_token_latency=0))
+        earlier = [{"role": "user", "content": "Waterford"}]
+        summaries = deque([("Confirm Service Area", "old", earlier), ("Other", "kept", [])], maxlen=4)
+        exchange = [{"role": "assistant", "content": "Is it Waterford?"}, {"role": "user", "content": "yes"}]
+        history = SyncChatHistory(3)
+        history.extend(exchange)
+        summarizer = SyncSummarizer(summaries)
+
+        async def run():
+            await summarizer.schedule("Confirm Service Area", history)
+
+        asyncio.run(run())
+
+        assert list(summaries) == [("Other", "kept", []), ("Confirm Service Area", "Area confirmed.", earlier + exchange)]
+        assert len(history) == 0
+
+    def test_covered_messages_leave_the_window(self):
+        """Test that global history already covered by a summary is not sent again."""
+        history = SyncChatHistory(5)
+        covered = [{"role": "assistant", "content": "Is it Waterford?"}, {"role": "user", "content": "yes"}]
+        history.extend(covered + [{"role": "assistant", "content": "What is broken?"}])
+
+        messages, tokens = history.window(None, {id(message) for message in covered})
+
+        assert messages == [{"role": "assistant", "content": "What is broken?"}]
+        assert tokens == history.tokens - sum(sync_message_tokens(message) for message in covered)
+
+    def test_only_nodes_leading_to_a_reader_are_summarized(self, tmp_path):
+        """Test that topics no `ref_summary` action can read are skipped."""
+        def node(name, ref_summary, targets):
+            path = tmp_path / f"{name}.yaml"
+            path.write_text(yaml.safe_dump({"note": name, "actions": [
+                {"type": "process", "ref_summary": ref_summary, "ref_history": True, "args": [], "return": name, "prompt": name},
+                {"type": "go_next", "arg": name, "go_to": {"choice": {f"to_{t}": {"id": t} for t in targets}}, "default": {"id": -1}}
+            ]}))
+            return str(path)
+
+        nodes = [
+            {"id": 0, "path": node("start", False, [1, 2])},
+            {"id": 1, "path": node("area", False, [3])},
+            {"id": 2, "path": node("cancel", False, [])},
+            {"id": 3, "path": node("final", True, [])}
+        ]
+
+        assert summary_topics(nodes) == {0, 1}
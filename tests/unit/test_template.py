@@ -0,0 +1,44 @@
+"""
+Unit tests for precompiled prompt templates
+"""
+
+from string import Template
+from v2.src.template import Args, CompiledTemplate
+
+
+class CountingValue:
+    """Value that counts how often it is serialized."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "services"
+
+
+class TestCompiledTemplate:
+    """Test cases for CompiledTemplate and Args."""
+
+    def test_matches_safe_substitute(self):
+        """Test rendering is identical to Template.safe_substitute."""
+        text = "Message: $message\nList: ${services}\nCost: $$5, $unknown, $ end"
+        args = {"message": "hi", "services": [1, 2]}
+
+        assert CompiledTemplate(text).render(args) == Template(text).safe_substitute(args)
+        assert CompiledTemplate(text).names == ("message", "services", "unknown")
+
+    def test_serialization_is_cached_per_assignment(self):
+        """Test values are re-serialized only after being assigned again."""
+        template = CompiledTemplate("$services / $message")
+        value = CountingValue()
+        args = Args({"services": value, "message": "a"})
+
+        template.render(args)
+        args["message"] = "b"
+        assert template.render(args) == "services / b"
+        assert value.calls == 1
+
+        args["services"] = value
+        template.render(args)
+        assert value.calls == 2
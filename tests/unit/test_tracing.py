@@ -0,0 +1,81 @@
+"""
+Unit tests for per-turn voice latency tracing
+"""
+
+from v2.src.tracing import NULL_SPAN, NULL_TRACER, Tracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+class TestTracer:
+    """Test cases for Tracer class."""
+
+    def test_turn_exported_after_audio_and_workflow_end(self):
+        """Test that a turn is exported only once both finish marks are recorded."""
+        exporter = ListExporter()
+        tracer = Tracer(exporter, room="r1")
+
+        tracer.start_turn()
+        tracer.mark("end_of_speech")
+        workflow = tracer.start_span("workflow", scope=True)
+        request = tracer.start_span("llm.request", node_id="intent/init")
+        request.add_event("first_token")
+        request.end()
+        tracer.mark("first_tts_chunk")
+        tracer.mark("first_audio")
+        assert exporter.traces == []
+
+        workflow.end()
+        tracer.mark("workflow_end")
+        assert len(exporter.traces) == 1
+        assert tracer.current is None
+
+        trace = exporter.traces[0]
+        assert request.parent_id == workflow.span_id
+        assert workflow.parent_id == trace.root.span_id
+
+        summary = trace.summary()
+        assert summary["room"] == "r1"
+        assert summary["turn"] == 1
+        assert summary["llm_requests"] == 1
+        assert list(summary["milestones_ms"]) == [
+            "end_of_speech", "workflow_start", "first_llm_request",
+            "first_token", "first_tts_chunk", "first_audio", "workflow_end"
+        ]
+        assert summary["ttfa_ms"] >= 0
+
+    def test_next_turn_flushes_open_turn(self):
+        """Test that starting a turn exports the previous unfinished one."""
+        exporter = ListExporter()
+        tracer = Tracer(exporter)
+
+        tracer.start_turn()
+        tracer.mark("end_of_speech")
+        tracer.start_turn()
+
+        assert len(exporter.traces) == 1
+        assert exporter.traces[0].summary()["ttfa_ms"] is None
+        assert tracer.current.root.attributes["turn"] == 2
+
+    def test_marks_without_turn_are_ignored(self):
+        """Test that marks outside a turn do not open one."""
+        exporter = ListExporter()
+        tracer = Tracer(exporter)
+
+        tracer.mark("first_audio")
+
+        assert tracer.current is None
+        assert exporter.traces == []
+
+    def test_null_tracer(self):
+        """Test that the default tracer records nothing."""
+        assert NULL_TRACER.start_span("llm.request") is NULL_SPAN
+        assert NULL_TRACER.start_turn() is None
+        NULL_TRACER.mark("end_of_speech")
+        assert NULL_TRACER.current is None
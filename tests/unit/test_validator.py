@@ -0,0 +1,252 @@
+"""
+Unit tests for the static workflow validator
+"""
+
+import os
+import pytest
+from v2.src.registry import WorkflowError, WorkflowRegistry
+from v2.src.validator import api_functions, main, validate_v1, validate_v2
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+
+CONFIG = """
+init_node: intent
+init_step: init
+chat_history_maxlen: 10
+global_system_prompt: test
+"""
+
+INTENT = """
+nodes:
+  init:
+    type: analyze
+    client:
+      prompt: classify $message
+      schema:
+        type: object
+        properties:
+          intent:
+            type: string
+            enum: [reply, check]
+      return: intent_data
+    go_to:
+      data: intent_data
+      cases:
+        - name: intent
+          value: check
+          to: intent
+          step: check
+      default:
+        to: intent
+        step: refine
+  refine:
+    type: analyze
+    client:
+      prompt: refine
+      return: refined
+    go_to:
+      data:
+      cases: []
+      default:
+        to: intent
+        step: reply
+  check:
+    type: callback
+    client:
+      name: get_services
+      args: [user_messages]
+      return: services
+    go_to:
+      data:
+      cases: []
+      default:
+        to: intent
+        step: reply
+  reply:
+    type: process
+    client:
+      prompt: answer with $services
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+  orphan:
+    type: process
+    client:
+      prompt: never asked
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+"""
+
+V1_WORKFLOW = """
+nodes:
+  - id: 1
+    path: ./workflows/nodes/1_ask.yaml
+  - id: 2
+    path: ./workflows/nodes/2_final.yaml
+init_node: 1
+global_history_num: 5
+topic_history_num: 3
+summary_num: 4
+init_config:
+  customer_id: 1
+"""
+
+V1_ASK = """
+note: Ask
+actions:
+  - type: analyze
+    ref_summary: false
+    ref_history: false
+    args: [customer_id]
+    return: analysis
+    prompt: Analyze {customer_id}
+  - type: process
+    ref_summary: false
+    ref_history: true
+    args: []
+    return: answer
+    prompt: Ask something
+  - type: analyze
+    ref_summary: false
+    ref_history: true
+    args: [answer]
+    return: result
+    prompt: Check {answer} against {missing}
+  - type: go_next
+    arg: result
+    go_to:
+      done:
+        true:
+          id: 2
+    default:
+      id: 3
+"""
+
+V1_FINAL = """
+note: Final
+actions:
+  - type: callback
+    name: save_rating
+    args: [result]
+    return:
+"""
+
+
+def write_v2(tmp_path, intent=INTENT):
+    (tmp_path / "config.yaml").write_text(CONFIG)
+    (tmp_path / "intent.yaml").write_text(intent)
+    return str(tmp_path)
+
+
+def write_v1(tmp_path):
+    nodes = tmp_path / "workflows" / "nodes"
+    nodes.mkdir(parents=True)
+    (tmp_path / "workflows" / "test.yaml").write_text(V1_WORKFLOW)
+    (nodes / "1_ask.yaml").write_text(V1_ASK)
+    (nodes / "2_final.yaml").write_text(V1_FINAL)
+    return str(tmp_path / "workflows" / "test.yaml")
+
+
+class TestValidateV2:
+    """Test cases for v2 workflow directories."""
+
+    def test_worst_case_and_reachability(self, tmp_path):
+        """Test LLM calls per turn along the costliest path and unreachable nodes."""
+        report = validate_v2(write_v2(tmp_path))
+
+        assert report.ok
+        assert report.worst_case["intent/init"] == (3, ["intent/init", "intent/refine", "intent/reply"])
+        assert report.unreachable == ["intent/orphan"]
+
+    def test_broken_references(self, tmp_path):
+        """Test missing targets, callbacks, args and routing fields."""
+        intent = INTENT.replace("step: refine\n", "step: refin\n") \
+            .replace("name: get_services", "name: get_servces") \
+            .replace("args: [user_messages]", "args: [user_message]") \
+            .replace("- name: intent\n          value: check", "- name: intnet\n          value: check")
+        report = validate_v2(write_v2(tmp_path, intent))
+
+        assert {(issue.node, issue.message) for issue in report.errors} == {
+            ("intent/init", "go_to target 'intent/refin' does not exist"),
+            ("intent/init", "case field 'intnet' is not in the schema"),
+            ("intent/check", "callback 'get_servces' is not in API_FUNCTIONS"),
+            ("intent/check", "arg 'user_message' is never set")
+        }
+
+    def test_loops_without_reply(self, tmp_path):
+        """Test that a cycle with no PROCESS node is flagged and makes the turn unbounded."""
+        intent = INTENT.replace("        to: intent\n        step: reply\n  check:", "        to: intent\n        step: init\n  check:")
+        report = validate_v2(write_v2(tmp_path, intent))
+
+        assert [issue.message for issue in report.issues if "loop" in issue.message] == \
+            ["can loop within a turn without replying: intent/init, intent/refine"]
+        assert report.worst_case["intent/init"][0] is None
+
+    def test_registry_rejects_missing_target(self, tmp_path):
+        """Test that a typo in a target fails at load instead of at runtime."""
+        with pytest.raises(WorkflowError, match="intent/refin"):
+            WorkflowRegistry(write_v2(tmp_path, INTENT.replace("step: refine\n", "step: refin\n")))
+
+    def test_shipped_workflow(self, monkeypatch):
+        """Test that the shipped v2 workflow has no errors."""
+        monkeypatch.chdir(os.path.join(ROOT, "v2"))
+        report = validate_v2("./workflow")
+
+        assert report.ok, [str(issue) for issue in report.errors]
+        assert "get_services" in api_functions("./src/apis.py")
+
+
+class TestValidateV1:
+    """Test cases for v1 workflow files."""
+
+    def test_segments_and_targets(self, tmp_path):
+        """Test that replies split turns and broken targets and placeholders are reported."""
+        report = validate_v1(write_v1(tmp_path), apis_path=os.path.join(ROOT, "src", "apis.py"))
+
+        assert report.worst_case == {"1": (2, ["1"]), "1:1": (1, ["1:1", "2"])}
+        assert [str(issue) for issue in report.issues] == [
+            "warning: 1: prompt placeholder '{missing}' is not in the action's args",
+            "error: 1: go_next target 3 does not exist or has no actions"
+        ]
+
+    def test_missing_callbacks(self, tmp_path):
+        """Test that a missing callback is an error where a call can reach it and a warning elsewhere."""
+        workflow = write_v1(tmp_path)
+        nodes = tmp_path / "workflows" / "nodes"
+        (nodes / "2_final.yaml").write_text(V1_FINAL.replace("save_rating", "rate_call"))
+        (nodes / "4_orphan.yaml").write_text(V1_FINAL.replace("save_rating", "orphan_fee"))
+        with open(workflow, "w") as f:
+            f.write(V1_WORKFLOW.replace("init_node:", "  - id: 4\n    path: ./workflows/nodes/4_orphan.yaml\ninit_node:"))
+
+        report = validate_v1(workflow, apis_path=os.path.join(ROOT, "src", "apis.py"))
+        issues = [str(issue) for issue in report.issues]
+
+        assert "error: 2: callback 'rate_call' is not in API_FUNCTIONS" in issues
+        assert "warning: 4: callback 'orphan_fee' is not in API_FUNCTIONS" in issues
+
+    def test_shipped_workflow(self):
+        """Test that the shipped v1 workflow has no errors."""
+        report = validate_v1(os.path.join(ROOT, "workflows", "test.yaml"))
+
+        assert report.ok, [str(issue) for issue in report.errors]
+
+    def test_cli_exit_code(self, tmp_path, capsys):
+        """Test that the CLI fails on errors and prints the report."""
+        workflow = write_v1(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "apis.py").write_text('API_FUNCTIONS = {"save_rating": None}\n')
+
+        v2_dir = tmp_path / "v2"
+        v2_dir.mkdir()
+
+        assert main(["--v2", write_v2(v2_dir), "--v1", workflow]) == 1
+        assert "go_next target 3" in capsys.readouterr().out
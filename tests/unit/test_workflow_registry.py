@@ -0,0 +1,91 @@
+"""
+Unit tests for the v2 WorkflowRegistry
+"""
+
+import os
+import time
+import pytest
+from v2.src.registry import WorkflowRegistry, WorkflowError
+from v2.src.schema import SchemaError
+
+WORKFLOW_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "v2", "workflow")
+
+CONFIG = """
+init_node: intent
+init_step: init
+chat_history_maxlen: 10
+global_system_prompt: test
+"""
+
+INTENT = """
+nodes:
+  init:
+    type: process
+    client:
+      prompt: hello
+    go_to:
+      data:
+      cases: []
+      default:
+        finished: true
+        to: intent
+        step: init
+"""
+
+
+def write_workflow(path, intent=INTENT):
+    (path / "config.yaml").write_text(CONFIG)
+    (path / "intent.yaml").write_text(intent)
+
+
+class TestWorkflowRegistry:
+    """Test cases for WorkflowRegistry class."""
+
+    def test_load_repository_workflows(self):
+        """Test that every shipped v2 workflow compiles."""
+        registry = WorkflowRegistry(WORKFLOW_DIR)
+
+        assert "intent" in registry.agents
+        assert "config" not in registry.agents
+        assert registry.node("intent", "init")["id"] == "intent/init"
+
+    def test_graph_is_immutable(self, tmp_path):
+        """Test that the compiled graph can not be mutated by a session."""
+        write_workflow(tmp_path)
+        registry = WorkflowRegistry(str(tmp_path))
+
+        with pytest.raises(TypeError):
+            registry.node("intent", "init")["type"] = "callback"
+
+    def test_invalid_node_type(self, tmp_path):
+        """Test that unknown node types fail at load time."""
+        write_workflow(tmp_path, INTENT.replace("type: process", "type: unknown"))
+
+        with pytest.raises(WorkflowError):
+            WorkflowRegistry(str(tmp_path))
+
+    def test_hot_reload(self, tmp_path):
+        """Test mtime based hot reload."""
+        write_workflow(tmp_path)
+        registry = WorkflowRegistry(str(tmp_path), hot_reload=True)
+        assert registry.node("intent", "init")["client"]["prompt"] == "hello"
+
+        path = tmp_path / "intent.yaml"
+        path.write_text(INTENT.replace("prompt: hello", "prompt: changed"))
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+
+        assert registry.node("intent", "init")["client"]["prompt"] == "changed"
+
+    def test_analyze_schema_compiled(self):
+        """Test that declared ANALYZE schemas become strict response formats."""
+        registry = WorkflowRegistry(WORKFLOW_DIR)
+        compiled = registry.node("intent", "init")["client"]["compiled_schema"]
+
+        assert compiled.response_format["type"] == "json_schema"
+        assert compiled.response_format["json_schema"]["strict"] == True
+        assert compiled.validate({"intent": "dispatch"}) == {"intent": "dispatch"}
+        with pytest.raises(SchemaError):
+            compiled.validate({"intent": "weather"})
+        with pytest.raises(SchemaError):
+            compiled.validate({})
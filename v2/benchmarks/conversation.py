@@ -0,0 +1,230 @@
+"""End-to-end conversation benchmark for the v2 workflow.
+
+Replays a scripted conversation through `Workflow.process` for N concurrent
+sessions against the offline `StubProvider`, and writes per-level and per-turn
+results as JSON. Run from `v2/`:
+
+    python -m benchmarks.conversation --sessions 1,10,50,100 --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import contextlib
+import subprocess
+from datetime import datetime, timezone
+from dataclasses import dataclass, asdict
+from typing import Any
+
+from src.workflow import Workflow
+from src.registry import get_registry
+from src.catalog import get_catalog
+from src.metrics import get_node_metrics
+from src.llm_provider import LLMProvider, StubProvider
+
+class CountingProvider(LLMProvider):
+    """Counts the LLM requests one session makes."""
+
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return await self.provider.create(**kwargs)
+
+@dataclass
+class TurnResult:
+    session: int
+    turn: int
+    ttfc: float | None
+    latency: float
+    hops: int
+    llm_calls: int
+    chunks: int
+    error: str | None = None
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values) + 0.5) - 1))]
+
+def summarize(values: list[float]) -> dict[str, float | None]:
+    return {
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None
+    }
+
+async def run_session(index: int, turns: list[str], provider: LLMProvider, timeout: float) -> list[TurnResult]:
+    async def disconnect():
+        pass
+
+    counter = CountingProvider(provider)
+    workflow = Workflow(disconnect, client=counter)
+
+    results = []
+    for number, message in enumerate(turns):
+        hops, calls = workflow.hops, counter.calls
+        first: float | None = None
+        chunks = 0
+        error = None
+
+        async def consume():
+            nonlocal first, chunks
+            async for chunk in workflow.process(message):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first is None:
+                        first = time.perf_counter()
+                    chunks += 1
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(consume(), timeout)
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = repr(e)
+
+        results.append(TurnResult(
+            session=index,
+            turn=number,
+            ttfc=first - started if first is not None else None,
+            latency=time.perf_counter() - started,
+            hops=workflow.hops - hops,
+            llm_calls=counter.calls - calls,
+            chunks=chunks,
+            error=error
+        ))
+        if error:
+            break
+    return results
+
+async def run_level(sessions: int, conversation: dict[str, Any], options: argparse.Namespace) -> dict[str, Any]:
+    provider = StubProvider(
+        conversation["llm"],
+        token_latency=options.token_latency,
+        jitter=options.jitter,
+        first_token_latency=options.first_token_latency,
+        seed=options.seed
+    )
+    turns = conversation["turns"]
+    node_metrics = get_node_metrics()
+    node_metrics.reset()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        outcomes = await asyncio.gather(*(
+            run_session(index, turns, provider, options.turn_timeout) for index in range(sessions)
+        ))
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+
+    results = [result for outcome in outcomes for result in outcome]
+    completed = [result for result in results if result.error is None]
+    per_turn = []
+    for number in range(len(turns)):
+        rows = [result for result in completed if result.turn == number]
+        per_turn.append({
+            "turn": number,
+            "message": turns[number],
+            "ttfc_p50": percentile([row.ttfc for row in rows if row.ttfc is not None], 50),
+            "latency_p50": percentile([row.latency for row in rows], 50),
+            "hops": max((row.hops for row in rows), default=None),
+            "llm_calls": max((row.llm_calls for row in rows), default=None)
+        })
+
+    return {
+        "sessions": sessions,
+        "turns": len(results),
+        "errors": [asdict(result) for result in results if result.error is not None],
+        "wall_seconds": wall,
+        "turns_per_second": len(completed) / wall if wall else None,
+        "cpu_seconds": cpu,
+        "cpu_ms_per_turn": cpu * 1000 / len(results) if results else None,
+        "cpu_utilization": cpu / wall if wall else None,
+        "ttfc": summarize([result.ttfc for result in completed if result.ttfc is not None]),
+        "turn_latency": summarize([result.latency for result in completed]),
+        "hops_per_turn": summarize([result.hops for result in completed]),
+        "llm_calls_per_turn": summarize([result.llm_calls for result in completed]),
+        "per_turn": per_turn,
+        "slowest_nodes": [
+            {"node_id": node_id, "wall_ms_total": total, "calls": node_metrics.get(node_id).calls}
+            for node_id, total in node_metrics.top("wall_ms_total", 10)
+        ]
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main(options: argparse.Namespace):
+    with open(options.conversation, "r", encoding="utf-8") as file:
+        conversation = json.load(file)
+    # Load the workflow and service catalog up front so the first level doesn't pay for it.
+    get_registry()
+    get_catalog()
+
+    levels = []
+    for sessions in options.sessions:
+        level = await run_level(sessions, conversation, options)
+        levels.append(level)
+        print(
+            f"sessions={sessions:<5} turns/s={level['turns_per_second']:.1f} "
+            f"ttfc p50={level['ttfc']['p50'] or 0:.3f}s p95={level['ttfc']['p95'] or 0:.3f}s "
+            f"latency p95={level['turn_latency']['p95'] or 0:.3f}s "
+            f"cpu/turn={level['cpu_ms_per_turn'] or 0:.2f}ms errors={len(level['errors'])}",
+            file=sys.stderr
+        )
+
+    within_budget = [
+        level["sessions"] for level in levels
+        if not level["errors"] and (level["ttfc"]["p95"] or 0) * 1000 <= options.ttfc_budget_ms
+    ]
+    report = {
+        "benchmark": "conversation",
+        "conversation": conversation.get("name", os.path.basename(options.conversation)),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "llm": {
+            "token_latency": options.token_latency,
+            "jitter": options.jitter,
+            "first_token_latency": options.first_token_latency,
+            "seed": options.seed
+        },
+        "ttfc_budget_ms": options.ttfc_budget_ms,
+        "ceiling_sessions": max(within_budget, default=None),
+        "levels": levels
+    }
+    with open(options.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"ceiling={report['ceiling_sessions']} results written to {options.output}", file=sys.stderr)
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversation", default=os.path.join(os.path.dirname(__file__), "conversations", "booking.json"))
+    parser.add_argument("--sessions", type=lambda text: [int(item) for item in text.split(",")], default=[1, 10, 50, 100])
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--first-token-latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turn-timeout", type=float, default=60.0)
+    parser.add_argument("--ttfc-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
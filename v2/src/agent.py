@@ -1,29 +1,38 @@
-import yaml
-from collections import deque
-from openai import AsyncOpenAI
+from typing import Any, Mapping
 
-from .node import Node, NodeType
+from .node import Node
+from .speculation import Prefetch, Speculator
+from .llm_provider import LLMProvider
+from .history import ChatHistory
+from .metrics import NodeMetrics
+from .chunker import SentenceChunker
 
 class Agent:
     def __init__(
         self,
-        config_path: str,
+        config: Mapping[str, Any],
         args: dict[str, ],
-        chat_history: deque[dict[str, str]],
-        client: AsyncOpenAI
+        chat_history: ChatHistory,
+        client: LLMProvider,
+        metrics: NodeMetrics | None = None,
+        chunker: SentenceChunker | None = None
     ):
-        with open(config_path) as f:
-            config: dict[str, ] = yaml.safe_load(f)
+        self.config = config
+        self.args = args
+        self.chat_history = chat_history
+        self.client = client
+        self.metrics = metrics
+        self.chunker = chunker
 
-        self.nodes = {key: Node(
-            node_config,
-            args,
-            chat_history,
-            client
-        ) for key, node_config in config["nodes"].items()}
-
-    async def process(self, step: str):
-        node = self.nodes[step]
-        response = node.process()
+    async def process(self, step: str, prefetch: Prefetch | None = None, speculator: Speculator | None = None):
+        node = Node(
+            self.config["nodes"][step],
+            self.args,
+            self.chat_history,
+            self.client,
+            self.metrics,
+            self.chunker
+        )
+        response = node.process(prefetch, speculator)
         async for chunk in response:
-            yield chunk
\ No newline at end of file
+            yield chunk
@@ -1,7 +1,12 @@
-import json
+import os
+import copy
+import asyncio
 from typing import Callable, Any
 
-customer_info = {
+from .session import SessionState, SessionStore, create_session_store
+from .catalog import get_catalog
+
+DEFAULT_CUSTOMER_INFO = {
     "full_name": "Millie Dowe",
     "phone_number": "5301504321",
     "email_address": "Millie.dowe@example.com",
@@ -21,7 +26,7 @@ customer_info = {
         "dispatch_fee": 0
     }
 }
-customer_status = {
+DEFAULT_CUSTOMER_STATUS = {
     "greeting": False,
     "service_address": False,
     "service_information": False,
@@ -29,25 +34,33 @@ customer_status = {
     "dispatch": False
 }
 
-with open('./data/services.json') as f:
-    services: list[Any] = json.load(f)
+def _new_session() -> dict[str, Any]:
+    return {
+        "customer_info": copy.deepcopy(DEFAULT_CUSTOMER_INFO),
+        "customer_status": copy.deepcopy(DEFAULT_CUSTOMER_STATUS)
+    }
+
+sessions = create_session_store(_new_session)
 
-def get_contact_information(customer_id: str, args: Any):
+def get_contact_information(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     return {
         "full_name": customer_info.get("full_name", None),
         "phone_number": customer_info.get("phone_number", None),
         "email_address": customer_info.get("email_address", None)
     }
 
-def get_service_addresses(customer_id: str, args: Any):
+def get_service_addresses(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     return {
         "addresses": [service["address"] for service in customer_info.get("addresses", [])]
     }
 
-def set_contact_information(customer_id: str, args: Any):
-    print(f"contact customer information is set. customer id: {customer_id}")
+def set_contact_information(session: SessionState, args: Any):
+    print(f"contact customer information is set. customer id: {session.customer_id}")
 
-def update_contact_information(customer_id: str, args: Any):
+def update_contact_information(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     info_data = args["update_contact_information"]
     if not info_data["updatable"]:
         return {
@@ -70,30 +83,35 @@ def update_contact_information(customer_id: str, args: Any):
             "status": "some_missed"
         }
     else:
-        set_contact_information(customer_id, args)
+        set_contact_information(session, args)
         return {
             "status": "full"
         }
 
-def update_customer_status(customer_id: str, args: Any):
+def update_customer_status(session: SessionState, args: Any):
+    customer_status = session["customer_status"]
     customer_status["greeting"] = True
 
-def get_customer_status(customer_id: str, args: Any):
-    return customer_status
+def get_customer_status(session: SessionState, args: Any):
+    return session["customer_status"]
 
-def finish_greeting_agent(customer_id: str, args: Any):
+def finish_greeting_agent(session: SessionState, args: Any):
+    customer_status = session["customer_status"]
     customer_status["service_address"] = True
     print("Greeting Agent finished")
 
-def finish_service_agent(customer_id: str, args: Any):
+def finish_service_agent(session: SessionState, args: Any):
+    customer_status = session["customer_status"]
     customer_status["service_information"] = True
     print("Service Agent finished")
 
-def finish_property_agent(customer_id: str, args: Any):
+def finish_property_agent(session: SessionState, args: Any):
+    customer_status = session["customer_status"]
     customer_status["property"] = True
     print("Property Agent finished")
 
-def validate_service_address(customer_id: str, args: Any):
+def validate_service_address(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     address_data = args["update_service_address"]
     if not address_data["service_address"]:
         return {
@@ -115,43 +133,33 @@ def validate_service_address(customer_id: str, args: Any):
         "validated": True
     }
 
-def get_services(customer_id: str, args: Any):
-    seen = set()
-    service_list = []
-    for service in services:
-        item = {
-            "trade": service["trade"],
-            "serviceable_type": service["serviceable_type"],
-            "service_type": service["service_type"],
+SERVICES_TOP_K = int(os.getenv("SERVICES_TOP_K", "12"))
+
+def get_services(session: SessionState, args: Any):
+    if args.get("user_messages"):
+        return get_catalog().search(args["user_messages"], SERVICES_TOP_K)
+    return get_catalog().prompt
+
+def check_service(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
+    service = get_catalog().find(args["service"])
+    if service is not None:
+        customer_info["service"] = {
+            "support": "support" if service["is_overbookable"] else "some_support",
+            "qualification_questions": [{
+                "question": question,
+                "answered": False,
+                "answer": "",
+            } for question in service["qualification_questions"]]
         }
-        # convert dict to tuple for hashability
-        key = (item["trade"], item["serviceable_type"], item["service_type"])
-        if key not in seen:
-            seen.add(key)
-            service_list.append(item)
-    return service_list
-
-def check_service(customer_id: str, args: Any):
-    _service = args["service"]
-    for service in services:
-        if _service["trade"] == service["trade"] and \
-            _service["serviceable_type"] == service["serviceable_type"] and \
-            _service["service_type"] == service["service_type"]:
-            customer_info["service"] = {
-                "support": "support" if service["is_overbookable"] else "some_support",
-                "qualification_questions": [{
-                    "question": question,
-                    "answered": False,
-                    "answer": "",
-                } for question in service["qualification_questions"]]
-            }
-            return customer_info["service"]
+        return customer_info["service"]
     customer_info["service"] = {
         "support": "not_support",
         "qualification_questions": []
     }
 
-def get_qualification_question(customer_id: str, args: Any):
+def get_qualification_question(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     for question in customer_info["service"]["qualification_questions"]:
         if not question["answered"]:
             return question
@@ -159,7 +167,8 @@ def get_qualification_question(customer_id: str, args: Any):
         "answered": None
     }
 
-def save_qualification_answer(customer_id: str, args: Any):
+def save_qualification_answer(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     question_text = args["qualification_question"]["question"]
     answer_text = args["message"]
 
@@ -168,21 +177,23 @@ def save_qualification_answer(customer_id: str, args: Any):
             question["answered"] = True
             question["answer"] = answer_text
 
-def get_available_times(customer_id: str, args: Any):
+def get_available_times(session: SessionState, args: Any):
     return [
         "Tuesday, 9 AM",
         "Wednesday, 8 AM",
         "Thursday, 9 AM"
     ]
 
-def save_available_time(customer_id: str, args: Any):
+def save_available_time(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     customer_info["dispatch"]["available_time"] = args["available_time"]["available_time"]
     customer_info["dispatch"]["is_urgent"] = args["available_time"]["is_urgent"]
 
-def save_dispatch_fee(customer_id: str, args: Any):
+def save_dispatch_fee(session: SessionState, args: Any):
+    customer_info = session["customer_info"]
     customer_info["dispatch"]["dispatch_fee"] = args["dispatch_fee"]["dispatch_fee"]
 
-API_FUNCTIONS: dict[str, Callable[[str, Any], Any]] = {
+API_FUNCTIONS: dict[str, Callable[[SessionState, Any], Any]] = {
     "get_contact_information":      get_contact_information,
     "get_service_addresses":        get_service_addresses,
     "set_contact_information":      set_contact_information,
@@ -200,4 +211,13 @@ API_FUNCTIONS: dict[str, Callable[[str, Any], Any]] = {
     "get_available_times":          get_available_times,
     "save_available_time":          save_available_time,
     "save_dispatch_fee":            save_dispatch_fee
-}
\ No newline at end of file
+}
+
+
+async def evict_sessions(store: SessionStore = sessions):
+    """Drop idle sessions for the life of the worker process."""
+    while True:
+        store.evict_expired()
+        # wake when the oldest session may expire, at least every minute
+        wait = store.next_expiry()
+        await asyncio.sleep(60 if wait is None else min(60, max(1, wait)))
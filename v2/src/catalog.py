@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Sequence
+
+from .service_index import ServiceIndex
+
+ServiceKey = tuple[str, str, str]
+
+def service_key(service: dict[str, Any]) -> ServiceKey:
+    return (service.get("trade"), service.get("serviceable_type"), service.get("service_type"))
+
+class ServiceCatalog:
+    """Services from `services.json`, indexed once per file version.
+
+    Lookups by (trade, serviceable_type, service_type) are a dict access, and the
+    deduplicated listing, its prompt text and a retrieval index over it are built
+    at load time. The file's
+    mtime is checked at most every `check_interval` seconds and the catalog is
+    rebuilt and swapped in when it changed.
+    """
+
+    def __init__(self, path: str = "./data/services.json", check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self.load()
+
+    def load(self):
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path) as f:
+            services: list[dict[str, Any]] = json.load(f)
+
+        index: dict[ServiceKey, dict[str, Any]] = {}
+        for service in services:
+            index.setdefault(service_key(service), service)
+        listing = tuple({
+            "trade": key[0],
+            "serviceable_type": key[1],
+            "service_type": key[2]
+        } for key in index)
+        lines = tuple(json.dumps(item) for item in listing)
+        search_index = ServiceIndex([" ".join(key) for key in index])
+
+        with self._lock:
+            self._services = tuple(services)
+            self._index = index
+            self._listing = listing
+            self._lines = lines
+            self._prompt = "\n".join(lines)
+            self._search_index = search_index
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+
+    def reload_if_changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    @property
+    def services(self) -> tuple[dict[str, Any], ...]:
+        self.reload_if_changed()
+        return self._services
+
+    @property
+    def listing(self) -> tuple[dict[str, str], ...]:
+        self.reload_if_changed()
+        return self._listing
+
+    @property
+    def prompt(self) -> str:
+        self.reload_if_changed()
+        return self._prompt
+
+    def search(self, texts: Sequence[str], top_k: int = 12) -> str:
+        """Prompt text of the `top_k` services closest to `texts`, or all of them.
+
+        Falls back to the full listing when no service resembles the query.
+        """
+        self.reload_if_changed()
+        ranked = self._search_index.search(texts, top_k)
+        if ranked is None:
+            return self._prompt
+        return "\n".join(self._lines[i] for i in ranked)
+
+    def find(self, service: dict[str, Any]) -> dict[str, Any] | None:
+        self.reload_if_changed()
+        return self._index.get(service_key(service))
+
+_catalog: ServiceCatalog | None = None
+
+def get_catalog() -> ServiceCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = ServiceCatalog(os.getenv("SERVICES_PATH", "./data/services.json"))
+    return _catalog
@@ -0,0 +1,120 @@
+import re
+import asyncio
+import contextlib
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Mapping
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+CLAUSE_END = re.compile(r"[,;:—–]\s+")
+
+_END = object()
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def text_chunk(chunk_id: str | None, text: str) -> SimpleNamespace:
+    """A chat completion chunk carrying `text`, shaped like OpenAI's `ChatCompletionChunk`."""
+    delta = SimpleNamespace(role="assistant", content=text, tool_calls=None)
+    return SimpleNamespace(
+        id=chunk_id,
+        choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)],
+        usage=None
+    )
+
+def split_point(text: str, min_clause_chars: int) -> int:
+    """Index just past the last speakable boundary in `text`, or 0 if there is none yet.
+
+    Sentence ends always qualify; clause punctuation only once at least
+    `min_clause_chars` precede it, so TTS isn't fed tiny fragments.
+    """
+    end = 0
+    for match in SENTENCE_END.finditer(text):
+        end = match.end()
+    if end:
+        return end
+    for match in CLAUSE_END.finditer(text, min_clause_chars):
+        end = match.end()
+    return end
+
+class SentenceChunker:
+    """Regroups streamed content deltas into clauses or sentences for TTS.
+
+    Text is held until a boundary from `split_point` arrives, or until it has
+    waited `max_wait` seconds, in which case everything up to the last complete
+    word is sent. Chunks without content (usage, finish markers) flush the buffer
+    and pass through unchanged. Upstream is read by a separate task so the
+    timer fires even while the LLM is silent.
+    """
+
+    def __init__(self, max_wait: float = 0.3, min_clause_chars: int = 40):
+        self.max_wait = max_wait
+        self.min_clause_chars = min_clause_chars
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | None) -> "SentenceChunker | None":
+        if not config or not config.get("enabled", True):
+            return None
+        return cls(config.get("max_wait", 0.3), config.get("min_clause_chars", 40))
+
+    async def stream(self, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for chunk in chunks:
+                    queue.put_nowait(chunk)
+            except Exception as e:
+                queue.put_nowait(_Failure(e))
+            finally:
+                queue.put_nowait(_END)
+
+        task = asyncio.create_task(pump())
+        text = ""
+        chunk_id = None
+        deadline: float | None = None
+        try:
+            while True:
+                try:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    # A word still being spelled out waits for its space (or
+                    # the end of the stream); the timer restarts on new text.
+                    cut = text.rfind(" ") + 1
+                    if cut:
+                        yield text_chunk(chunk_id, text[:cut])
+                        text = text[cut:]
+                    deadline = loop.time() + self.max_wait if text and cut else None
+                    continue
+
+                if item is _END:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+
+                content = item.choices[0].delta.content if item.choices else None
+                if not content:
+                    if text:
+                        yield text_chunk(chunk_id, text)
+                        text, deadline = "", None
+                    yield item
+                    continue
+
+                chunk_id = item.id
+                if deadline is None:
+                    deadline = loop.time() + self.max_wait
+                text += content
+                cut = split_point(text, self.min_clause_chars)
+                if cut:
+                    yield text_chunk(chunk_id, text[:cut])
+                    text = text[cut:]
+                    deadline = loop.time() + self.max_wait if text else None
+
+            if text:
+                yield text_chunk(chunk_id, text)
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
@@ -0,0 +1,260 @@
+import re
+import json
+import math
+import random
+from dataclasses import dataclass, asdict
+from typing import Any, Iterable, Mapping, Sequence
+
+WORD = re.compile(r"[a-z0-9@.']+")
+
+class ClassifierError(ValueError):
+    """Raised when a node's `fast_path` config can not be built."""
+    pass
+
+@dataclass
+class FastPathStats:
+    calls: int = 0
+    rule_hits: int = 0
+    model_hits: int = 0
+    fallbacks: int = 0
+    # LLM results compared with the local prediction: every fallback, plus
+    # the sampled fast-path hits that were re-checked in the background.
+    compared: int = 0
+    agreed: int = 0
+    checked: int = 0
+    checked_agreed: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.rule_hits + self.model_hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls else 0.0
+
+    @property
+    def agreement_rate(self) -> float:
+        return self.agreed / self.compared if self.compared else 0.0
+
+    @property
+    def precision(self) -> float:
+        """Agreement of confident (answered locally) predictions with the LLM."""
+        return self.checked_agreed / self.checked if self.checked else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "agreement_rate": self.agreement_rate,
+            "precision": self.precision
+        }
+
+fast_path_stats = FastPathStats()
+
+@dataclass(frozen=True)
+class Prediction:
+    label: str
+    confidence: float
+    source: str
+
+def features(user: str, assistant: str | None = None) -> list[str]:
+    """Unigrams and bigrams of the user message, plus the words of the question it answers."""
+    words = [word.strip(".'") for word in WORD.findall(user.lower())]
+    words = [word for word in words if word]
+    feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if assistant is None:
+        feats.append("<first>")
+    else:
+        feats.extend(f"a:{word.strip('.')}" for word in set(WORD.findall(assistant.lower())))
+    return feats
+
+class IntentModel:
+    """TF-IDF features with a multinomial logistic regression, in plain Python.
+
+    Small enough to train at load time from a few hundred labelled turns and to
+    score a message in well under a millisecond.
+    """
+
+    def __init__(self, labels: Sequence[str], idf: dict[str, float], weights: dict[str, list[float]], bias: list[float]):
+        self.labels = tuple(labels)
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def train(
+        cls,
+        examples: Sequence[Mapping[str, str]],
+        epochs: int = 40,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 0
+    ) -> "IntentModel":
+        labels = sorted({example["label"] for example in examples})
+        docs = [(features(example["user"], example.get("assistant")), labels.index(example["label"])) for example in examples]
+        df: dict[str, int] = {}
+        for feats, _ in docs:
+            for feat in set(feats):
+                df[feat] = df.get(feat, 0) + 1
+        idf = {feat: math.log((1 + len(docs)) / (1 + count)) + 1 for feat, count in df.items()}
+
+        model = cls(labels, idf, {}, [0.0] * len(labels))
+        vectors = [(model.vectorize(feats), label) for feats, label in docs]
+        order = list(range(len(vectors)))
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(order)
+            for i in order:
+                vector, label = vectors[i]
+                probs = model._probs(vector)
+                for k, prob in enumerate(probs):
+                    gradient = prob - (k == label)
+                    model.bias[k] -= learning_rate * gradient
+                    for feat, value in vector.items():
+                        weights = model.weights.setdefault(feat, [0.0] * len(labels))
+                        weights[k] -= learning_rate * (gradient * value + l2 * weights[k])
+        return model
+
+    def vectorize(self, feats: Iterable[str]) -> dict[str, float]:
+        counts: dict[str, int] = {}
+        for feat in feats:
+            if feat in self.idf:
+                counts[feat] = counts.get(feat, 0) + 1
+        vector = {feat: count * self.idf[feat] for feat, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {feat: value / norm for feat, value in vector.items()} if norm else {}
+
+    def _probs(self, vector: Mapping[str, float]) -> list[float]:
+        scores = list(self.bias)
+        for feat, value in vector.items():
+            weights = self.weights.get(feat)
+            if weights is not None:
+                for k, weight in enumerate(weights):
+                    scores[k] += weight * value
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return [value / total for value in exps]
+
+    def predict(self, user: str, assistant: str | None = None) -> Prediction:
+        probs = self._probs(self.vectorize(features(user, assistant)))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return Prediction(self.labels[best], probs[best], "model")
+
+@dataclass(frozen=True)
+class Rule:
+    label: str
+    pattern: re.Pattern | None = None
+    assistant: re.Pattern | None = None
+    first_turn: bool | None = None
+
+    def matches(self, user: str, assistant: str | None) -> bool:
+        if self.first_turn is not None and self.first_turn != (assistant is None):
+            return False
+        if self.assistant is not None and (assistant is None or not self.assistant.search(assistant)):
+            return False
+        return self.pattern is None or bool(self.pattern.search(user))
+
+class IntentClassifier:
+    """Local first stage for an ANALYZE node that picks one label.
+
+    Rules are tried in order and answer with full confidence; otherwise the
+    model's prediction is used when it reaches `threshold`. Anything less
+    confident goes to the LLM as usual, and the LLM's answer is compared with
+    the local guess. A `verify_rate` share of confident answers is also
+    re-checked with the LLM in the background.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        rules: Sequence[Rule] = (),
+        model: IntentModel | None = None,
+        threshold: float = 0.9,
+        verify_rate: float = 0.0,
+        stats: FastPathStats = fast_path_stats
+    ):
+        self.field = field
+        self.rules = tuple(rules)
+        self.model = model
+        self.threshold = threshold
+        self.verify_rate = verify_rate
+        self.stats = stats
+
+    def predict(self, user: str, assistant: str | None = None) -> Prediction | None:
+        for rule in self.rules:
+            if rule.matches(user, assistant):
+                return Prediction(rule.label, 1.0, "rule")
+        return self.model.predict(user, assistant) if self.model is not None else None
+
+    def classify(self, user: str, assistant: str | None = None) -> tuple[Prediction | None, bool]:
+        """The local prediction and whether it is confident enough to skip the LLM."""
+        self.stats.calls += 1
+        prediction = self.predict(user, assistant)
+        if prediction is None or prediction.confidence < self.threshold:
+            self.stats.fallbacks += 1
+            return prediction, False
+        if prediction.source == "rule":
+            self.stats.rule_hits += 1
+        else:
+            self.stats.model_hits += 1
+        return prediction, True
+
+    def compare(self, prediction: Prediction | None, data: Mapping[str, Any], confident: bool = False):
+        """Record whether the LLM's result agrees with the local prediction."""
+        if prediction is None:
+            return
+        agreed = data.get(self.field) == prediction.label
+        if confident:
+            self.stats.checked += 1
+            self.stats.checked_agreed += agreed
+        else:
+            self.stats.compared += 1
+            self.stats.agreed += agreed
+
+def load_examples(path: str) -> list[dict[str, str]]:
+    """Labelled turns, one JSON object per line: {"assistant", "user", "label"}."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def build_classifier(config: Mapping[str, Any], labels: Sequence[str] | None = None) -> IntentClassifier:
+    if "field" not in config:
+        raise ClassifierError("fast_path needs 'field'")
+
+    rules = []
+    for rule in config.get("rules", ()):
+        if "label" not in rule:
+            raise ClassifierError("fast_path rule needs 'label'")
+        try:
+            rules.append(Rule(
+                rule["label"],
+                re.compile(rule["pattern"], re.IGNORECASE) if rule.get("pattern") else None,
+                re.compile(rule["assistant"], re.IGNORECASE) if rule.get("assistant") else None,
+                rule.get("first_turn")
+            ))
+        except re.error as e:
+            raise ClassifierError(f"invalid pattern for '{rule['label']}': {e}") from None
+
+    model = None
+    if config.get("examples"):
+        try:
+            examples = load_examples(config["examples"])
+        except (OSError, ValueError) as e:
+            raise ClassifierError(f"can not read examples: {e}") from None
+        if examples:
+            model = IntentModel.train(examples)
+
+    if labels is not None:
+        unknown = {rule.label for rule in rules} | set(model.labels if model else ())
+        unknown -= set(labels)
+        if unknown:
+            raise ClassifierError(f"labels not in the schema: {', '.join(sorted(unknown))}")
+
+    return IntentClassifier(
+        config["field"],
+        rules,
+        model,
+        threshold=config.get("threshold", 0.9),
+        verify_rate=config.get("verify_rate", 0.0)
+    )
@@ -1,10 +1,37 @@
-import json
-from string import Template
-from collections import deque
-from openai import AsyncOpenAI
+import time
+import random
+import asyncio
+import logging
+from typing import Callable
 
 from .types import NodeType
-from .apis import API_FUNCTIONS
+from .classifier import IntentClassifier, Prediction
+from .apis import API_FUNCTIONS, sessions
+from .speculation import Prefetch, Speculator
+from .json_stream import JsonStream
+from .messages import build_messages
+from .history import ChatHistory
+from .response_cache import cache_key, get_response_cache
+from .llm_provider import LLMProvider
+from .tracing import get_tracer
+from .chunker import SentenceChunker
+
+logger = logging.getLogger("voice.fast_path")
+
+# Background fast-path checks; referenced here so they are not collected mid-flight.
+_checks: set[asyncio.Task] = set()
+
+def last_exchange(history: ChatHistory) -> tuple[str | None, str | None]:
+    """The latest user message and the assistant message it answers, if any."""
+    user = None
+    for i in range(len(history) - 1, -1, -1):
+        message = history[i]
+        if user is None:
+            if message["role"] == "user":
+                user = message["content"]
+        elif message["role"] == "assistant":
+            return user, message["content"]
+    return user, None
 
 class Client:
     def __init__(
@@ -12,72 +39,210 @@ class Client:
         type: NodeType,
         config: dict[str, ],
         args: dict[str, ],
-        chat_history: deque[dict[str, str]],
-        client: AsyncOpenAI
+        chat_history: ChatHistory,
+        client: LLMProvider,
+        node_id: str = "",
+        chunker: SentenceChunker | None = None
     ):
         self.type = type
+        self.node_id = node_id
+        self.chunker = chunker
+        self.topic = node_id.split("/")[0] or None
         self.config = config
         self.args = args
         self.history = chat_history
         self.client = client
         self.global_system_prompt = args["global_system_prompt"]
+        self.first_token_at: float | None = None
+        self.usage = None
+        self.prefetched = False
+        self.prompt_tokens_estimate = 0
+        self.response_cache_hit = False
+        self.fast_path = False
+
+    def messages(self) -> list[dict[str, str]]:
+        messages, self.prompt_tokens_estimate = build_messages(self.global_system_prompt, self.config, self.history, self.args)
+        return messages
+
+    async def request(self, messages: list[dict[str, str]]):
+        kwargs = {}
+        if self.type == NodeType.ANALYZE:
+            kwargs["response_format"] = self.config["compiled_schema"].response_format
+        return await self.client.create(
+            model="gpt-4o",
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+
+    async def stream(
+        self,
+        prefetch: Prefetch | None = None,
+        speculator: Speculator | None = None,
+        messages: list[dict[str, str]] | None = None
+    ):
+        messages = messages if messages is not None else self.messages()
+        self.prefetched = prefetched = prefetch is not None and prefetch.messages == messages
+        span = get_tracer().start_span(
+            "llm.request",
+            node_id=self.node_id,
+            type=self.type.value,
+            prefetched=prefetched,
+            prompt_tokens_estimate=self.prompt_tokens_estimate
+        )
+        if prefetched:
+            speculator.accept(prefetch)
+            response = prefetch.stream()
+        else:
+            if prefetch is not None:
+                speculator.reject(prefetch)
+            response = await self.request(messages)
+
+        first_token = True
+        cancelled = False
+        try:
+            async for chunk in response:
+                if first_token and chunk.choices and chunk.choices[0].delta.content:
+                    first_token = False
+                    self.first_token_at = time.perf_counter()
+                    span.add_event("first_token")
+                if chunk.usage is not None:
+                    self.usage = chunk.usage
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = True
+            raise
+        finally:
+            # On barge-in, drop the upstream HTTP stream right away so the
+            # provider stops generating tokens nobody will hear.
+            if prefetched:
+                prefetch.cancel()
+            else:
+                await response.close()
+            span.end(cancelled=cancelled)
+
+    def answer(
+        self,
+        data: dict[str, ],
+        prefetch: Prefetch | None,
+        speculator: Speculator | None,
+        on_fields: Callable[[dict[str, ]], bool] | None
+    ):
+        """Return an ANALYZE result that was found without asking the LLM."""
+        if prefetch is not None:
+            speculator.reject(prefetch)
+        if on_fields is not None:
+            on_fields(data)
+        self.args[self.config["return"]] = data
 
-    async def process(self):
+    async def check(self, classifier: IntentClassifier, prediction: Prediction, messages: list[dict[str, str]]):
+        """Ask the LLM anyway and record whether it agrees with a fast-path answer."""
+        try:
+            response = await self.request(messages)
+            parser = JsonStream()
+            try:
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parser.feed(chunk.choices[0].delta.content)
+            finally:
+                await response.close()
+            classifier.compare(prediction, self.config["compiled_schema"].validate(parser.close()), confident=True)
+        except Exception as e:
+            logger.warning("fast path check failed: %r", e)
+
+    async def process(
+        self,
+        prefetch: Prefetch | None = None,
+        speculator: Speculator | None = None,
+        on_fields: Callable[[dict[str, ]], bool] | None = None
+    ):
         match self.type:
             case NodeType.ANALYZE:
-                client_prompt = Template(self.config["prompt"]).safe_substitute(self.args)
-                messages = [his for his in self.history] + [
-                    {"role": "system", "content": self.global_system_prompt},
-                    {"role": "system", "content": client_prompt}
-                ]
-                response = await self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=messages,
-                    stream=True
-                )
-
-                data_str = ""
-                async for chunk in response:
-                    if chunk.choices[0].delta.content:
-                        data_str += chunk.choices[0].delta.content
+                classifier: IntentClassifier | None = self.config.get("compiled_fast_path")
+                prediction = None
+                if classifier is not None:
+                    user, assistant = last_exchange(self.history)
+                    if user is not None:
+                        prediction, confident = classifier.classify(user, assistant)
+                        if confident:
+                            self.fast_path = True
+                            if random.random() < classifier.verify_rate:
+                                task = asyncio.create_task(self.check(classifier, prediction, self.messages()))
+                                _checks.add(task)
+                                task.add_done_callback(_checks.discard)
+                            self.answer({classifier.field: prediction.label}, prefetch, speculator, on_fields)
+                            return
+
+                messages = None
+                key = None
+                cache_config = self.config.get("cache")
+                if cache_config:
+                    cache = get_response_cache()
+                    messages = self.messages()
+                    key = cache_key(self.node_id, messages, cache_config, (self.history.summary_message,))
+                    data = await cache.aget(key) if key is not None else None
+                    if key is None:
+                        cache.stats.skipped += 1
+                    if data is not None:
+                        self.response_cache_hit = True
+                        self.answer(data, prefetch, speculator, on_fields)
+                        return
 
-                data_str = data_str.replace("```json", "").replace("```", "")
-                data = json.loads(data_str)
+                parser = JsonStream()
+                routed = on_fields is None
+                async for chunk in self.stream(prefetch, speculator, messages):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if parser.feed(chunk.choices[0].delta.content) and not routed:
+                            routed = on_fields(parser.fields)
+
+                data = self.config["compiled_schema"].validate(parser.close())
 
                 print(data)
-                
+
+                if key is not None:
+                    await cache.aset(key, data, cache_config.get("ttl"))
+                if classifier is not None:
+                    classifier.compare(prediction, data)
                 self.args[self.config["return"]] = data
 
                 return
-            
+
             case NodeType.PROCESS:
-                client_prompt = Template(self.config["prompt"]).safe_substitute(self.args)
-                messages = [his for his in self.history] + [
-                    {"role": "system", "content": self.global_system_prompt},
-                    {"role": "system", "content": client_prompt}
-                ]
-                response = await self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=messages,
-                    stream=True
-                )
-
-                full_text = ""
-                async for chunk in response:
-                    if chunk.choices[0].delta.content:
-                        yield chunk
-                        full_text += chunk.choices[0].delta.content
+                parts: list[str] = []
+                # Chunked here rather than by the caller, so `parts` only holds
+                # text that was actually handed on, not text still buffered.
+                response = self.stream(prefetch, speculator)
+                if self.chunker is not None:
+                    response = self.chunker.stream(response)
+                try:
+                    async for chunk in response:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk
+                            parts.append(chunk.choices[0].delta.content)
+                        elif chunk.usage is not None:
+                            yield chunk
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Interrupted: keep only what was already handed to TTS.
+                    if parts:
+                        self.history.append({"role": "assistant", "content": "".join(parts)}, self.topic)
+                    raise
 
-                self.history.append({"role": "assistant", "content": full_text})
+                self.history.append({"role": "assistant", "content": "".join(parts)}, self.topic)
 
                 return
 
             case NodeType.CALLBACK:
                 args = {key: self.args[key] for key in self.config["args"]}
+                session = sessions.get(self.args["customer_id"])
                 if self.config["return"]:
                     self.args[self.config["return"]] = \
-                        API_FUNCTIONS[self.config["name"]](self.args["customer_id"], args)
+                        API_FUNCTIONS[self.config["name"]](session, args)
+                else:
+                    API_FUNCTIONS[self.config["name"]](session, args)
+                if sessions.blocking:
+                    await asyncio.to_thread(sessions.save, session)
                 else:
-                    API_FUNCTIONS[self.config["name"]](self.args["customer_id"], args)
+                    sessions.save(session)
 
-                return
\ No newline at end of file
+                return
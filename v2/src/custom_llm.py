@@ -16,11 +16,17 @@ from openai.types.chat.chat_completion_chunk import Choice
 from typing import Callable
 
 from .workflow import Workflow
+from .tracing import NULL_TRACER, Tracer, set_tracer
 
 class CustomLLM(llm.LLM):
-    def __init__(self, disconnect: Callable) -> None:
+    def __init__(self, disconnect: Callable, tracer: Tracer = NULL_TRACER, session_id: str | None = None) -> None:
         super().__init__()
-        self.workflow = Workflow(disconnect)
+        self.workflow = Workflow(disconnect, session_id=session_id)
+        self.tracer = tracer
+
+    async def aclose(self) -> None:
+        self.workflow.close()
+        await super().aclose()
 
     def chat(
         self,
@@ -37,7 +43,8 @@ class CustomLLM(llm.LLM):
             chat_ctx=chat_ctx,
             tools=tools,
             conn_options=conn_options,
-            workflow=self.workflow
+            workflow=self.workflow,
+            tracer=self.tracer
         )
 
 class LLMStream(llm.LLMStream):
@@ -48,10 +55,12 @@ class LLMStream(llm.LLMStream):
         chat_ctx: ChatContext,
         tools: list[FunctionTool | RawFunctionTool],
         conn_options: APIConnectOptions,
-        workflow: Workflow
+        workflow: Workflow,
+        tracer: Tracer = NULL_TRACER
     ) -> None:
         super().__init__(llm, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
         self._workflow = workflow
+        self._tracer = tracer
 
     async def _run(self) -> None:
         try:
@@ -62,6 +71,7 @@ class LLMStream(llm.LLMStream):
             self._tool_index: int | None = None
             retryable = True
 
+            set_tracer(self._tracer)
             stream = self._workflow.process(
                 message=chat_ctx[0][-1]["content"]
             )
@@ -73,6 +83,7 @@ class LLMStream(llm.LLMStream):
                     if chat_chunk is not None:
                         retryable = False
                         self._event_ch.send_nowait(chat_chunk)
+                        self._tracer.mark("first_tts_chunk")
 
                 if chunk.usage is not None:
                     retryable = False
@@ -91,6 +102,8 @@ class LLMStream(llm.LLMStream):
         
         except openai.APITimeoutError:
             raise APITimeoutError(retryable=retryable) from None
+        finally:
+            self._tracer.mark("workflow_end")
                     
     def _parse_choice(
         self, id: str, choice: Choice, thinking: asyncio.Event
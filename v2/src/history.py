@@ -0,0 +1,104 @@
+import re
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, Mapping
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Per-message framing the chat format adds on top of the content.
+MESSAGE_OVERHEAD = 4
+
+def count_tokens(text: str) -> int:
+    """Estimated token count: words and punctuation marks, close to BPE for English."""
+    return len(TOKEN.findall(text))
+
+def message_tokens(message: dict[str, str]) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+class ChatHistory:
+    """Chat messages with their token cost, counted once on append.
+
+    Holds at most `maxlen` messages and, with `max_tokens`, drops the oldest
+    ones while the total is over it. `window(budget)` picks the newest messages
+    that fit a node's `history_budget` without recounting anything.
+
+    Messages can be tagged with a topic; `fold` replaces older messages by
+    per-topic summaries, which `summary_message` renders for the prompt.
+    """
+
+    def __init__(self, maxlen: int | None = None, max_tokens: int | None = None):
+        self.maxlen = maxlen
+        self.max_tokens = max_tokens
+        self._messages: deque[tuple[dict[str, str], int, str | None]] = deque()
+        self.tokens = 0
+        self.summaries: dict[str, str] = {}
+        self.summary_message: dict[str, str] | None = None
+        self.summary_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        return (message for message, _, _ in self._messages)
+
+    def __getitem__(self, index: int) -> dict[str, str]:
+        return self._messages[index][0]
+
+    def append(self, message: dict[str, str], topic: str | None = None):
+        tokens = message_tokens(message)
+        self._messages.append((message, tokens, topic))
+        self.tokens += tokens
+        while len(self._messages) > 1 and (
+            (self.maxlen is not None and len(self._messages) > self.maxlen)
+            or (self.max_tokens is not None and self.tokens > self.max_tokens)
+        ):
+            self.tokens -= self._messages.popleft()[1]
+
+    def extend(self, messages: Iterable[dict[str, str]]):
+        for message in messages:
+            self.append(message)
+
+    def clear(self):
+        self._messages.clear()
+        self.tokens = 0
+        self.summaries.clear()
+        self.summary_message = None
+        self.summary_tokens = 0
+
+    def older(self, keep: int) -> list[tuple[dict[str, str], str | None]]:
+        """Messages (with their topic) before the newest `keep` ones."""
+        return [(message, topic) for message, _, topic in islice(self._messages, max(0, len(self._messages) - keep))]
+
+    def fold(self, messages: Iterable[dict[str, str]], summaries: Mapping[str, str]):
+        """Drop `messages` from the head of the history and keep `summaries` instead.
+
+        Messages appended (or trimmed) meanwhile are left alone, so this is safe
+        to apply when a background summary finishes.
+        """
+        folded = {id(message) for message in messages}
+        while self._messages and id(self._messages[0][0]) in folded:
+            self.tokens -= self._messages.popleft()[1]
+        if not summaries:
+            return
+        self.summaries.update(summaries)
+        content = "Summary of the earlier conversation:\n" + "\n".join(
+            f"- {topic}: {summary}" for topic, summary in self.summaries.items()
+        )
+        self.summary_message = {"role": "system", "content": content}
+        self.summary_tokens = message_tokens(self.summary_message)
+
+    def window(self, budget: int | None = None) -> tuple[list[dict[str, str]], int]:
+        """The newest messages within `budget` tokens, and their total.
+
+        The latest message is always included, even when it alone is over budget.
+        """
+        if budget is None:
+            return [message for message, _, _ in self._messages], self.tokens
+        start = len(self._messages)
+        total = 0
+        for _, tokens, _ in reversed(self._messages):
+            if total + tokens > budget and start < len(self._messages):
+                break
+            total += tokens
+            start -= 1
+        return [message for message, _, _ in islice(self._messages, start, None)], total
@@ -0,0 +1,173 @@
+import json
+from typing import Any
+
+FENCES = ("", "```", "```json")
+
+class JsonStreamError(ValueError):
+    """Raised when streamed model output is not a single JSON object."""
+    pass
+
+class JsonStream:
+    """Incremental parser for one JSON object streamed in arbitrary deltas.
+
+    `feed` returns the top-level keys whose values became complete with that
+    delta, so callers can act on a field before the rest of the object arrives.
+    A surrounding ```json fence is accepted; any other text is an error.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self._chars: list[str] = []
+        self._prefix: list[str] = []
+        self._suffix: list[str] = []
+        self._root_start: int | None = None
+        self._root_end: int | None = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"
+        self._key: str | None = None
+        self._token_start = 0
+        self._scalar = False
+        self._offset = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, delta: str) -> list[str]:
+        completed = []
+        for char in delta:
+            self._offset += 1
+            key = self._char(char)
+            if key is not None:
+                completed.append(key)
+        return completed
+
+    def close(self) -> dict[str, Any]:
+        if not self.complete:
+            raise JsonStreamError("stream ended before the JSON object was closed")
+        if "".join(self._suffix).strip() not in FENCES:
+            raise JsonStreamError("unexpected text after the JSON object")
+        try:
+            data = json.loads("".join(self._chars[self._root_start:self._root_end]))
+        except json.JSONDecodeError as e:
+            raise JsonStreamError(str(e)) from None
+        return data
+
+    def _fail(self, char: str):
+        raise JsonStreamError(f"unexpected {char!r} at offset {self._offset - 1}")
+
+    def _char(self, char: str) -> str | None:
+        if self._root_end is not None:
+            self._suffix.append(char)
+            return None
+
+        if self._root_start is None:
+            if char != "{":
+                self._prefix.append(char)
+                if not any(fence.startswith("".join(self._prefix).strip()) for fence in FENCES):
+                    self._fail(char)
+                return None
+            if "".join(self._prefix).strip() not in FENCES:
+                self._fail(char)
+            self._root_start = len(self._chars)
+            self._chars.append(char)
+            self._depth = 1
+            return None
+
+        index = len(self._chars)
+        self._chars.append(char)
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1:
+                    return self._end_string(index)
+            return None
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1:
+                if self._expect not in ("key", "value"):
+                    self._fail(char)
+                self._token_start = index
+            return None
+
+        if self._depth == 1:
+            return self._top_level(char, index)
+
+        if char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1:
+                self._expect = "next"
+                return self._complete(index + 1)
+        return None
+
+    def _end_string(self, index: int) -> str | None:
+        if self._expect == "key":
+            self._key = json.loads("".join(self._chars[self._token_start:index + 1]))
+            self._expect = "colon"
+            return None
+        self._expect = "next"
+        return self._complete(index + 1)
+
+    def _top_level(self, char: str, index: int) -> str | None:
+        if char.isspace():
+            return None
+        if char == ":":
+            if self._expect != "colon":
+                self._fail(char)
+            self._expect = "value"
+            return None
+        if char == ",":
+            key = self._finish_scalar(index)
+            if self._expect != "next":
+                self._fail(char)
+            self._expect = "key"
+            return key
+        if char == "}":
+            key = self._finish_scalar(index)
+            if self._expect not in ("next", "key") or (self._expect == "key" and self.fields):
+                self._fail(char)
+            self._root_end = index + 1
+            self._depth = 0
+            return key
+        if self._expect == "value":
+            self._token_start = index
+            if char in "{[":
+                self._depth += 1
+                self._expect = "nested"
+            else:
+                self._scalar = True
+                self._expect = "scalar"
+            return None
+        if self._expect == "scalar":
+            return None
+        self._fail(char)
+
+    def _finish_scalar(self, index: int) -> str | None:
+        if not self._scalar:
+            return None
+        self._scalar = False
+        self._expect = "next"
+        return self._complete(index)
+
+    def _complete(self, end: int) -> str:
+        text = "".join(self._chars[self._token_start:end])
+        try:
+            self.fields[self._key] = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JsonStreamError(f"invalid value for {self._key!r}: {e.msg}") from None
+        return self._key
+
+def loads(text: str) -> dict[str, Any]:
+    stream = JsonStream()
+    stream.feed(text)
+    return stream.close()
@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import httpx
+from dataclasses import dataclass, asdict
+from openai import AsyncOpenAI
+
+from .llm_provider import LLMProvider
+
+@dataclass
+class PoolStats:
+    max_connections: int
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    saturated_requests: int = 0
+    errors: int = 0
+    warmed_up_at: float | None = None
+
+    @property
+    def saturation(self) -> float:
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+    def to_dict(self) -> dict[str, ]:
+        return {**asdict(self), "saturation": self.saturation}
+
+class TrackedStream:
+    """Wraps a streamed completion so the pool knows when its connection is free again."""
+
+    def __init__(self, stream, pool: "LLMClientPool"):
+        self._stream = stream
+        self._pool = pool
+        self._released = False
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._pool.stats.in_flight -= 1
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._release()
+
+    async def close(self):
+        try:
+            await self._stream.close()
+        finally:
+            self._release()
+
+class LLMClientPool(LLMProvider):
+    """One AsyncOpenAI client and HTTP connection pool shared by every session in the process."""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False
+    ):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            http2=http2,
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        self.client = AsyncOpenAI(http_client=self.http_client)
+        self.stats = PoolStats(max_connections=max_connections)
+
+    async def create(self, **kwargs):
+        stats = self.stats
+        stats.requests += 1
+        if stats.in_flight >= stats.max_connections:
+            stats.saturated_requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            response = await self.client.chat.completions.create(**kwargs)
+        except BaseException:
+            stats.in_flight -= 1
+            stats.errors += 1
+            raise
+        if not kwargs.get("stream"):
+            stats.in_flight -= 1
+            return response
+        return TrackedStream(response, self)
+
+    async def warm_up(self, connections: int = 1):
+        """Open `connections` keep-alive connections so the first turn skips TLS setup."""
+        results = await asyncio.gather(
+            *(self.client.models.list() for _ in range(connections)),
+            return_exceptions=True
+        )
+        if not all(isinstance(result, Exception) for result in results):
+            self.stats.warmed_up_at = time.time()
+
+    async def aclose(self):
+        await self.client.close()
+
+_pool: LLMClientPool | None = None
+
+def get_pool() -> LLMClientPool:
+    global _pool
+    if _pool is None:
+        _pool = LLMClientPool(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),
+            http2=os.getenv("LLM_HTTP2", "").lower() in ("1", "true", "yes")
+        )
+    return _pool
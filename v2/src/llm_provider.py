@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import random
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Sequence
+
+class LLMProvider:
+    """What the workflow engine needs from an LLM backend.
+
+    `create` takes OpenAI chat completion arguments and, with `stream=True`,
+    returns an async iterable of chunks shaped like OpenAI's `ChatCompletionChunk`
+    that also has an async `close()`.
+    """
+
+    async def create(self, **kwargs) -> Any:
+        raise NotImplementedError
+
+    async def warm_up(self, connections: int = 1):
+        pass
+
+    async def aclose(self):
+        pass
+
+TOKEN = re.compile(r"\s*\S+\s*|\s+")
+
+def _example(schema: dict[str, Any]) -> Any:
+    """Build the smallest value that satisfies a declared output schema."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "properties" in schema:
+        return {key: _example(value) for key, value in schema["properties"].items()}
+    kind = schema.get("type", "object")
+    kind = kind if isinstance(kind, str) else kind[0]
+    return {"string": "", "integer": 0, "number": 0, "boolean": False, "array": [], "null": None}.get(kind, {})
+
+def _chunk(content: str | None, finish_reason: str | None = None) -> SimpleNamespace:
+    delta = SimpleNamespace(role="assistant", content=content, tool_calls=None)
+    return SimpleNamespace(
+        id="stub",
+        choices=[SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)],
+        usage=None
+    )
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id="stub",
+        choices=[],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+        )
+    )
+
+class StubStream:
+    def __init__(self, chunks: list[str], usage: SimpleNamespace | None, provider: "StubProvider"):
+        self._chunks = chunks
+        self._usage = usage
+        self._provider = provider
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[SimpleNamespace]:
+        return self._iterate()
+
+    async def _iterate(self):
+        await asyncio.sleep(self._provider.first_token_latency)
+        for index, text in enumerate(self._chunks):
+            if self.closed:
+                return
+            if index:
+                await asyncio.sleep(self._provider.delay())
+            yield _chunk(text)
+        yield _chunk(None, "stop")
+        if self._usage is not None:
+            yield self._usage
+
+    async def close(self):
+        self.closed = True
+
+class StubProvider(LLMProvider):
+    """Offline provider that streams scripted or recorded responses.
+
+    The script is a JSON file of the form
+    `{"responses": [{"match": "...", "user": "...", "response": "..." | "chunks": [...]}], "default": "..."}`.
+    The first entry whose `match` occurs in the request's messages and whose
+    `user` occurs in the latest user message wins (either may be omitted);
+    `chunks` replays a recorded stream as-is, `response` is split into
+    word-sized chunks.
+    Requests with no match get a minimal object satisfying their `response_format`
+    schema, or `default`. Every chunk after the first waits `token_latency`
+    seconds plus up to `jitter` either way.
+    """
+
+    def __init__(
+        self,
+        script: dict[str, Any] | None = None,
+        token_latency: float = 0.02,
+        jitter: float = 0.0,
+        first_token_latency: float = 0.3,
+        seed: int | None = None
+    ):
+        script = script or {}
+        self.responses: list[tuple[str, str, list[str]]] = [
+            (
+                entry.get("match", ""),
+                entry.get("user", ""),
+                list(entry["chunks"]) if "chunks" in entry else TOKEN.findall(entry["response"])
+            )
+            for entry in script.get("responses", [])
+        ]
+        self.default: str = script.get("default", "Okay.")
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.first_token_latency = first_token_latency
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    @classmethod
+    def from_file(cls, path: str | None, **kwargs) -> "StubProvider":
+        script = None
+        if path:
+            with open(path, "r", encoding="utf-8") as file:
+                script = json.load(file)
+        return cls(script, **kwargs)
+
+    def delay(self) -> float:
+        return max(0.0, self.token_latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def respond(self, messages: Sequence[dict[str, str]], response_format: dict[str, Any] | None = None) -> list[str]:
+        text = "\n".join(message["content"] for message in messages)
+        user = next((message["content"] for message in reversed(messages) if message["role"] == "user"), "")
+        for match, user_match, chunks in self.responses:
+            if match in text and user_match in user:
+                return chunks
+        if response_format is not None:
+            schema = response_format.get("json_schema", {}).get("schema", {"type": "object"})
+            return TOKEN.findall(json.dumps(_example(schema)))
+        return TOKEN.findall(self.default)
+
+    async def create(self, **kwargs) -> StubStream:
+        messages = kwargs["messages"]
+        self.requests += 1
+        chunks = self.respond(messages, kwargs.get("response_format"))
+        usage = None
+        if kwargs.get("stream_options", {}).get("include_usage"):
+            prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+            usage = _usage(prompt_tokens, len(chunks))
+        return StubStream(chunks, usage, self)
+
+_provider: LLMProvider | None = None
+
+def get_provider() -> LLMProvider:
+    global _provider
+    if _provider is None:
+        name = os.getenv("LLM_PROVIDER", "openai")
+        if name == "stub":
+            seed = os.getenv("LLM_STUB_SEED")
+            _provider = StubProvider.from_file(
+                os.getenv("LLM_STUB_SCRIPT"),
+                token_latency=float(os.getenv("LLM_STUB_TOKEN_LATENCY", "0.02")),
+                jitter=float(os.getenv("LLM_STUB_JITTER", "0")),
+                first_token_latency=float(os.getenv("LLM_STUB_FIRST_TOKEN_LATENCY", "0.3")),
+                seed=int(seed) if seed else None
+            )
+        elif name == "openai":
+            from .llm_pool import get_pool
+            _provider = get_pool()
+        else:
+            raise ValueError(f"Unknown LLM_PROVIDER '{name}'")
+    return _provider
@@ -0,0 +1,51 @@
+from string import Template
+from functools import lru_cache
+from typing import Any, Mapping
+
+from .template import CompiledTemplate
+from .history import MESSAGE_OVERHEAD, ChatHistory, count_tokens, message_tokens
+
+def split_prompt(prompt: str) -> tuple[str, CompiledTemplate | None]:
+    """Split a node prompt into the static lines before its first placeholder and the rest.
+
+    The static part can be sent ahead of the chat history so that the provider's
+    prefix cache covers it; only the compiled dynamic part follows the history.
+    """
+    for match in Template.pattern.finditer(prompt):
+        if match.group("named") or match.group("braced"):
+            start = prompt.rfind("\n", 0, match.start()) + 1
+            return CompiledTemplate(prompt[:start]).render({}), CompiledTemplate(prompt[start:])
+    return CompiledTemplate(prompt).render({}), None
+
+@lru_cache(maxsize=256)
+def static_tokens(text: str) -> int:
+    """Token estimate of a system prompt that is the same on every call."""
+    return count_tokens(text) + MESSAGE_OVERHEAD
+
+def build_messages(
+    global_system_prompt: str,
+    client_config: Mapping[str, Any],
+    history: ChatHistory,
+    args: Mapping[str, Any]
+) -> tuple[list[dict[str, str]], int]:
+    """The request messages and their estimated prompt tokens.
+
+    Only the newest history messages within the node's `history_budget` are sent,
+    after the summaries of the turns already folded out of the history.
+    """
+    messages = [{"role": "system", "content": global_system_prompt}]
+    tokens = static_tokens(global_system_prompt)
+    if client_config["prompt_static"]:
+        messages.append({"role": "system", "content": client_config["prompt_static"]})
+        tokens += static_tokens(client_config["prompt_static"])
+    if history.summary_message is not None:
+        messages.append(history.summary_message)
+        tokens += history.summary_tokens
+    window, window_tokens = history.window(client_config.get("history_budget"))
+    messages.extend(window)
+    tokens += window_tokens
+    if client_config["prompt_template"] is not None:
+        message = {"role": "system", "content": client_config["prompt_template"].render(args)}
+        messages.append(message)
+        tokens += message_tokens(message)
+    return messages, tokens
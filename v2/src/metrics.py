@@ -0,0 +1,168 @@
+import bisect
+from collections import Counter, deque
+from dataclasses import dataclass, asdict, field
+from typing import Any
+
+# Upper bounds in milliseconds; the last bucket is unbounded.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+@dataclass
+class NodeRecord:
+    node_id: str
+    type: str
+    wall_ms: float
+    ttft_ms: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    prompt_tokens_estimate: int = 0
+    prefetched: bool = False
+    response_cache_hit: bool = False
+    fast_path: bool = False
+    next: str | None = None
+    finished: bool = False
+    error: str | None = None
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {
+                (f"le_{bound:g}" if index < len(self.bounds) else "inf"): count
+                for index, (bound, count) in enumerate(zip((*self.bounds, float("inf")), self.counts))
+            }
+        }
+
+@dataclass
+class NodeStats:
+    type: str
+    calls: int = 0
+    errors: int = 0
+    prefetched: int = 0
+    # Calls answered from the ResponseCache without an LLM request.
+    response_cache_hits: int = 0
+    fast_path_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    wall_ms_total: float = 0.0
+    wall_ms: Histogram = field(default_factory=Histogram)
+    ttft_ms: Histogram = field(default_factory=Histogram)
+    routes: Counter = field(default_factory=Counter)
+
+    def add(self, record: NodeRecord):
+        self.calls += 1
+        self.errors += record.error is not None
+        self.prefetched += record.prefetched
+        self.response_cache_hits += record.response_cache_hit
+        self.fast_path_hits += record.fast_path
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cached_tokens += record.cached_tokens
+        self.wall_ms_total += record.wall_ms
+        self.wall_ms.observe(record.wall_ms)
+        if record.ttft_ms is not None:
+            self.ttft_ms.observe(record.ttft_ms)
+        if record.next is not None:
+            self.routes[record.next] += 1
+
+    @property
+    def prompt_cache_rate(self) -> float:
+        """Share of prompt tokens the provider served from its prompt cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": self.type,
+            "calls": self.calls,
+            "errors": self.errors,
+            "prefetched": self.prefetched,
+            "response_cache_hits": self.response_cache_hits,
+            "fast_path_hits": self.fast_path_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prompt_cache_rate": self.prompt_cache_rate,
+            "wall_ms_total": self.wall_ms_total,
+            "wall_ms": self.wall_ms.to_dict(),
+            "ttft_ms": self.ttft_ms.to_dict(),
+            "routes": dict(self.routes)
+        }
+
+class NodeMetrics:
+    """Per-node execution stats for one session, or for the whole process.
+
+    A session's metrics forward every record to `parent`, so the process-wide
+    instance from `get_node_metrics()` aggregates all sessions.
+    """
+
+    def __init__(self, parent: "NodeMetrics | None" = None, recent: int = 256):
+        self.parent = parent
+        self.nodes: dict[str, NodeStats] = {}
+        self.recent: deque[NodeRecord] = deque(maxlen=recent)
+
+    def record(self, record: NodeRecord):
+        stats = self.nodes.get(record.node_id)
+        if stats is None:
+            stats = self.nodes[record.node_id] = NodeStats(record.type)
+        stats.add(record)
+        self.recent.append(record)
+        if self.parent is not None:
+            self.parent.record(record)
+
+    def get(self, node_id: str) -> NodeStats | None:
+        return self.nodes.get(node_id)
+
+    def top(self, key: str = "wall_ms_total", limit: int = 10) -> list[tuple[str, Any]]:
+        """Nodes ranked by a `NodeStats` attribute, e.g. wall_ms_total or prompt_tokens."""
+        ranked = sorted(self.nodes.items(), key=lambda item: getattr(item[1], key), reverse=True)
+        return [(node_id, getattr(stats, key)) for node_id, stats in ranked[:limit]]
+
+    def reset(self):
+        self.nodes.clear()
+        self.recent.clear()
+
+    def to_dict(self, recent: bool = False) -> dict[str, Any]:
+        data: dict[str, Any] = {"nodes": {node_id: stats.to_dict() for node_id, stats in self.nodes.items()}}
+        if recent:
+            data["recent"] = [asdict(record) for record in self.recent]
+        return data
+
+_node_metrics = NodeMetrics()
+
+def get_node_metrics() -> NodeMetrics:
+    return _node_metrics
@@ -1,40 +1,98 @@
-from collections import deque
-from openai import AsyncOpenAI
+import time
+import asyncio
 
 from .client import Client
+from .speculation import Prefetch, Speculator
 from .types import NodeType
+from .llm_provider import LLMProvider
+from .history import ChatHistory
+from .metrics import NodeMetrics, NodeRecord
+from .chunker import SentenceChunker
 
 class Node:
     def __init__(
         self,
         config: dict[str, ],
         args: dict[str, ],
-        chat_history: deque[dict[str, str]],
-        client: AsyncOpenAI
+        chat_history: ChatHistory,
+        client: LLMProvider,
+        metrics: NodeMetrics | None = None,
+        chunker: SentenceChunker | None = None
     ):
+        self.id = config["id"]
+        self.type = NodeType(config["type"])
         self.go_to_config = config["go_to"]
+        self.speculate = config.get("speculate", True)
         self.args = args
+        self.metrics = metrics
         self.client = Client(
-            type=NodeType(config["type"]),
+            type=self.type,
             config=config["client"],
             args=args,
             chat_history=chat_history,
-            client=client
+            client=client,
+            node_id=self.id,
+            chunker=chunker
         )
 
-    async def process(self):
-        response = self.client.process()
-        async for chunk in response:
-            yield chunk
-
-        if self.go_to_config["data"]:
-            go_to_data = self.args[self.go_to_config["data"]]
+    def route(self, go_to_data: dict[str, ] | None) -> dict[str, ]:
+        if go_to_data is not None:
             for case in self.go_to_config["cases"]:
                 if go_to_data[case["name"]] == case["value"]:
-                    self.args["next"] = {"to": case["to"], "step": case["step"], "finished": case.get("finished", False)}
-                    return
-        self.args["next"] = {
+                    return {"to": case["to"], "step": case["step"], "finished": case.get("finished", False)}
+        return {
             "to": self.go_to_config["default"]["to"],
             "step": self.go_to_config["default"]["step"],
             "finished": self.go_to_config["default"].get("finished", False)
-        }
\ No newline at end of file
+        }
+
+    async def process(self, prefetch: Prefetch | None = None, speculator: Speculator | None = None):
+        on_fields = None
+        returned = self.client.config.get("return")
+        # Same opt-outs as Workflow._speculate: the workflow only passes a
+        # speculator with `speculative_execution` on, and nodes may set `speculate: false`.
+        if speculator is not None and self.speculate and self.go_to_config["data"] and self.go_to_config["data"] == returned:
+            names = {case["name"] for case in self.go_to_config["cases"]}
+
+            def on_fields(fields: dict[str, ]) -> bool:
+                if not names <= fields.keys():
+                    return False
+                speculator.start_target(self.route(fields), returned)
+                return True
+
+        started = time.perf_counter()
+        try:
+            response = self.client.process(prefetch, speculator, on_fields)
+            async for chunk in response:
+                yield chunk
+
+            go_to_data = self.args[self.go_to_config["data"]] if self.go_to_config["data"] else None
+            self.args["next"] = self.route(go_to_data)
+        except (asyncio.CancelledError, GeneratorExit):
+            self.record(started, error="cancelled")
+            raise
+        except Exception as e:
+            self.record(started, error=repr(e))
+            raise
+        self.record(started, next=f'{self.args["next"]["to"]}/{self.args["next"]["step"]}', finished=self.args["next"]["finished"])
+
+    def record(self, started: float, **outcome):
+        if self.metrics is None:
+            return
+        client = self.client
+        usage = client.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.metrics.record(NodeRecord(
+            node_id=self.id,
+            type=self.type.value,
+            wall_ms=(time.perf_counter() - started) * 1000,
+            ttft_ms=(client.first_token_at - started) * 1000 if client.first_token_at is not None else None,
+            prompt_tokens=(usage.prompt_tokens or 0) if usage else 0,
+            completion_tokens=(usage.completion_tokens or 0) if usage else 0,
+            cached_tokens=((details.cached_tokens if details else 0) or 0),
+            prompt_tokens_estimate=client.prompt_tokens_estimate,
+            prefetched=client.prefetched,
+            response_cache_hit=client.response_cache_hit,
+            fast_path=client.fast_path,
+            **outcome
+        ))
@@ -0,0 +1,187 @@
+import os
+import yaml
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from .types import NodeType
+from .schema import SchemaError, compile_schema
+from .messages import split_prompt
+from .classifier import ClassifierError, build_classifier
+
+CONFIG_NAME = "config"
+TERMINAL_AGENTS = ("completed", "canceled")
+
+class WorkflowError(Exception):
+    """Raised when a workflow file can not be compiled."""
+    pass
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def compile_node(agent: str, step: str, config: dict[str, ], workflow_dir: str = ".") -> dict[str, ]:
+    """Validate one node's config and attach its compiled schema, cache and fast path."""
+    node_id = f"{agent}/{step}"
+    for key in ("type", "client", "go_to"):
+        if key not in config:
+            raise WorkflowError(f"{node_id}: missing '{key}'")
+    try:
+        NodeType(config["type"])
+    except ValueError:
+        raise WorkflowError(f"{node_id}: unknown node type '{config['type']}'") from None
+
+    go_to = config["go_to"]
+    if not go_to.get("default") or "to" not in go_to["default"] or "step" not in go_to["default"]:
+        raise WorkflowError(f"{node_id}: go_to.default needs 'to' and 'step'")
+    if go_to.get("cases") and not go_to.get("data"):
+        raise WorkflowError(f"{node_id}: go_to.cases requires go_to.data")
+
+    if config["type"] != NodeType.CALLBACK:
+        budget = config["client"].get("history_budget")
+        if budget is not None and (not isinstance(budget, int) or budget <= 0):
+            raise WorkflowError(f"{node_id}: history_budget must be a positive number of tokens")
+        static, template = split_prompt(config["client"]["prompt"])
+        config = {**config, "client": {**config["client"], "prompt_static": static, "prompt_template": template}}
+
+    cache = config.get("client", {}).get("cache")
+    if cache is not None:
+        if config["type"] != NodeType.ANALYZE:
+            raise WorkflowError(f"{node_id}: only analyze nodes can be cached")
+        if isinstance(cache, bool):
+            cache = {"enabled": cache}
+        if not isinstance(cache, dict):
+            raise WorkflowError(f"{node_id}: cache must be a boolean or a mapping")
+        if not isinstance(cache.get("user_messages", 1), int) or cache.get("user_messages", 1) <= 0:
+            raise WorkflowError(f"{node_id}: cache.user_messages must be a positive number")
+        cache = {"user_messages": 1, "min_words": 0, "ttl": None, **cache} if cache.get("enabled", True) else None
+        config = {**config, "client": {**config["client"], "cache": cache}}
+
+    if config["type"] == NodeType.ANALYZE:
+        try:
+            compiled = compile_schema(node_id, config["client"].get("schema"))
+        except SchemaError as e:
+            raise WorkflowError(f"{node_id}: {e}") from None
+        config = {**config, "client": {**config["client"], "compiled_schema": compiled}}
+
+        fast_path = config["client"].get("fast_path")
+        if fast_path:
+            properties = (compiled.schema or {}).get("properties", {})
+            if set(properties) - {fast_path.get("field")}:
+                raise WorkflowError(f"{node_id}: fast_path needs a schema with only its 'field'")
+            labels = properties.get(fast_path.get("field"), {}).get("enum")
+            if fast_path.get("examples"):
+                # Relative to the workflow directory, like the YAML that names it.
+                fast_path = {**fast_path, "examples": os.path.join(workflow_dir, fast_path["examples"])}
+            try:
+                classifier = build_classifier(fast_path, labels)
+            except ClassifierError as e:
+                raise WorkflowError(f"{node_id}: {e}") from None
+            config = {**config, "client": {**config["client"], "compiled_fast_path": classifier}}
+    elif config["client"].get("fast_path"):
+        raise WorkflowError(f"{node_id}: only analyze nodes can have a fast_path")
+
+    return {**config, "id": node_id}
+
+def _compile_agent(name: str, config: dict[str, ], workflow_dir: str = ".") -> dict[str, ]:
+    if not isinstance(config, dict) or not isinstance(config.get("nodes"), dict):
+        raise WorkflowError(f"{name}: workflow file has no 'nodes' mapping")
+    return {
+        **config,
+        "name": name,
+        "nodes": {step: compile_node(name, step, node, workflow_dir) for step, node in config["nodes"].items()}
+    }
+
+class WorkflowRegistry:
+    """Process-wide compiled workflow graph.
+
+    Every `<workflow_dir>/*.yaml` file is parsed and validated once and kept as an
+    immutable mapping shared by all sessions. Per-session data (args, chat history)
+    lives in `Workflow`. With `hot_reload` the files' mtimes are checked on access
+    and the whole graph is recompiled when any of them changed.
+    """
+
+    def __init__(self, workflow_dir: str = "./workflow", hot_reload: bool = False):
+        self.workflow_dir = workflow_dir
+        self.hot_reload = hot_reload
+        self._lock = threading.Lock()
+        self._mtimes: dict[str, float] = {}
+        self._config: Mapping[str, Any] = MappingProxyType({})
+        self._agents: Mapping[str, Mapping[str, Any]] = MappingProxyType({})
+        self.load()
+
+    def _scan(self) -> dict[str, float]:
+        mtimes = {}
+        for entry in os.scandir(self.workflow_dir):
+            if entry.is_file() and entry.name.endswith(".yaml"):
+                mtimes[entry.path] = entry.stat().st_mtime
+        return mtimes
+
+    def load(self):
+        mtimes = self._scan()
+        config = None
+        agents = {}
+        for path in sorted(mtimes):
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path) as f:
+                data = yaml.safe_load(f)
+            if name == CONFIG_NAME:
+                config = data
+            else:
+                agents[name] = _compile_agent(name, data, self.workflow_dir)
+
+        if config is None:
+            raise WorkflowError(f"{self.workflow_dir}: missing {CONFIG_NAME}.yaml")
+        init = (config["init_node"], config["init_step"])
+        if init[0] not in agents or init[1] not in agents[init[0]]["nodes"]:
+            raise WorkflowError(f"init node '{init[0]}/{init[1]}' does not exist")
+        for agent in agents.values():
+            for node in agent["nodes"].values():
+                for target in [*(node["go_to"].get("cases") or ()), node["go_to"]["default"]]:
+                    if target.get("to") in TERMINAL_AGENTS:
+                        continue
+                    if target.get("to") not in agents or target.get("step") not in agents[target["to"]]["nodes"]:
+                        raise WorkflowError(f"{node['id']}: go_to target '{target.get('to')}/{target.get('step')}' does not exist")
+
+        with self._lock:
+            self._config = _freeze(config)
+            self._agents = _freeze(agents)
+            self._mtimes = mtimes
+
+    def reload_if_changed(self) -> bool:
+        if self._scan() == self._mtimes:
+            return False
+        self.load()
+        return True
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        if self.hot_reload:
+            self.reload_if_changed()
+        return self._config
+
+    @property
+    def agents(self) -> Mapping[str, Mapping[str, Any]]:
+        if self.hot_reload:
+            self.reload_if_changed()
+        return self._agents
+
+    def get(self, name: str) -> Mapping[str, Any]:
+        return self.agents[name]
+
+    def node(self, name: str, step: str) -> Mapping[str, Any]:
+        return self.agents[name]["nodes"][step]
+
+_registry: WorkflowRegistry | None = None
+
+def get_registry() -> WorkflowRegistry:
+    global _registry
+    if _registry is None:
+        _registry = WorkflowRegistry(
+            os.getenv("WORKFLOW_DIR", "./workflow"),
+            hot_reload=os.getenv("WORKFLOW_HOT_RELOAD", "").lower() in ("1", "true", "yes")
+        )
+    return _registry
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Mapping, Sequence
+
+WORD = re.compile(r"\w+")
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+def normalize(text: str) -> str:
+    """Lowercase words only, so casing, punctuation and spacing don't split entries."""
+    return " ".join(WORD.findall(text.lower()))
+
+def cache_key(
+    node_id: str,
+    messages: Sequence[Mapping[str, str]],
+    config: Mapping[str, Any],
+    exclude: Sequence[Mapping[str, str]] = ()
+) -> str | None:
+    """Key for an ANALYZE request, or None when it should not be cached.
+
+    Covers the node id, the system prompts (minus `exclude`, e.g. the rolling
+    summary) and the last `user_messages` user messages, normalized. Requests
+    whose latest user message is shorter than `min_words` are not cached, since
+    short replies like "yes" depend on what was asked.
+    """
+    prompts = [message["content"] for message in messages if message["role"] == "system" and not any(message is item for item in exclude)]
+    users = [normalize(message["content"]) for message in messages if message["role"] == "user"]
+    users = users[-config.get("user_messages", 1):]
+    if not users or len(users[-1].split()) < config.get("min_words", 0):
+        return None
+    payload = json.dumps([node_id, hashlib.sha256("\0".join(prompts).encode()).hexdigest(), users])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResponseCache:
+    """LRU cache of validated ANALYZE results with per-entry TTL.
+
+    Entries live in memory up to `max_entries`; with a `path` they are also
+    written to SQLite, so other workers and restarts share them. A memory miss
+    falls back to disk and promotes the entry. On the event loop use `aget` and
+    `aset`, which only touch SQLite from a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 86400, path: str | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        # key -> (expires_at, JSON text); every hit decodes a fresh copy
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db_lock, self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        text = self._get_memory(key)
+        if text is None and self._db is not None:
+            text = self._get_disk(key)
+        return self._result(text)
+
+    async def aget(self, key: str) -> Any | None:
+        text = self._get_memory(key)
+        if text is None and self._db is not None:
+            text = await asyncio.to_thread(self._get_disk, key)
+        return self._result(text)
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        expires_at, text = self._set_memory(key, value, ttl)
+        if self._db is not None:
+            self._set_disk(key, expires_at, text)
+
+    async def aset(self, key: str, value: Any, ttl: float | None = None):
+        expires_at, text = self._set_memory(key, value, ttl)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, expires_at, text)
+
+    def _result(self, text: str | None) -> Any | None:
+        if text is None:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        return json.loads(text)
+
+    def _get_memory(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                self.stats.expired += 1
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def _get_disk(self, key: str) -> str | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            self._put(key, row[1], row[0])
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+        return row[0]
+
+    def _set_memory(self, key: str, value: Any, ttl: float | None) -> tuple[float, str]:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        text = json.dumps(value)
+        with self._lock:
+            self._put(key, expires_at, text)
+            self.stats.stores += 1
+        return expires_at, text
+
+    def _set_disk(self, key: str, expires_at: float, text: str):
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, text, expires_at)
+            )
+
+    def _put(self, key: str, expires_at: float, text: str):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM responses")
+
+_response_cache: ResponseCache | None = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache; RESPONSE_CACHE is `memory` or `sqlite:<path>`."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            backend = os.getenv("RESPONSE_CACHE", "memory")
+            _response_cache = ResponseCache(
+                max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "4096")),
+                ttl=float(os.getenv("RESPONSE_CACHE_TTL", "86400")),
+                path=backend[len("sqlite:"):] if backend.startswith("sqlite:") else None
+            )
+    return _response_cache
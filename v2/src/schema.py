@@ -0,0 +1,112 @@
+import re
+import json
+from typing import Any, Callable
+
+TYPES: dict[str, tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+    "null": (type(None),)
+}
+
+Check = Callable[[Any, str], None]
+
+class SchemaError(ValueError):
+    """Raised when ANALYZE output does not match the node's declared schema."""
+    pass
+
+def _strict(schema: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy that satisfies structured-output strict mode."""
+    schema = dict(schema)
+    if "properties" in schema:
+        schema["properties"] = {key: _strict(value) for key, value in schema["properties"].items()}
+        schema["required"] = list(schema["properties"])
+        schema["additionalProperties"] = False
+    if "items" in schema:
+        schema["items"] = _strict(schema["items"])
+    return schema
+
+def _compile(schema: dict[str, Any]) -> Check:
+    checks: list[Check] = []
+
+    names = schema.get("type")
+    if names is not None:
+        names = (names,) if isinstance(names, str) else tuple(names)
+        for name in names:
+            if name not in TYPES:
+                raise SchemaError(f"unsupported schema type '{name}'")
+        allowed = tuple(t for name in names for t in TYPES[name])
+        allow_bool = "boolean" in names
+
+        def check_type(value: Any, path: str):
+            if not isinstance(value, allowed) or (isinstance(value, bool) and not allow_bool):
+                raise SchemaError(f"{path}: expected {' | '.join(names)}")
+        checks.append(check_type)
+
+    if "enum" in schema:
+        options = tuple(schema["enum"])
+
+        def check_enum(value: Any, path: str):
+            if value not in options:
+                raise SchemaError(f"{path}: {value!r} is not one of {list(options)}")
+        checks.append(check_enum)
+
+    if "properties" in schema:
+        properties = {key: _compile(value) for key, value in schema["properties"].items()}
+        required = tuple(schema.get("required", properties))
+
+        def check_properties(value: Any, path: str):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    raise SchemaError(f"{path}: missing '{key}'")
+            for key, check in properties.items():
+                if key in value:
+                    check(value[key], f"{path}.{key}")
+        checks.append(check_properties)
+
+    if "items" in schema:
+        item_check = _compile(schema["items"])
+
+        def check_items(value: Any, path: str):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    item_check(item, f"{path}[{index}]")
+        checks.append(check_items)
+
+    def check(value: Any, path: str):
+        for item in checks:
+            item(value, path)
+    return check
+
+class CompiledSchema:
+    """A node's output schema, compiled once into a request format and a validator."""
+
+    def __init__(self, name: str, schema: dict[str, Any] | None):
+        self.name = re.sub(r"[^a-zA-Z0-9_-]", "_", name)
+        self.schema = schema
+        if schema is None:
+            self.response_format = {"type": "json_object"}
+            self._check = _compile({"type": "object"})
+        else:
+            self.response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": self.name, "schema": _strict(schema), "strict": True}
+            }
+            self._check = _compile(schema)
+
+    def validate(self, data: Any) -> Any:
+        self._check(data, "$")
+        return data
+
+_cache: dict[str, CompiledSchema] = {}
+
+def compile_schema(name: str, schema: dict[str, Any] | None) -> CompiledSchema:
+    key = json.dumps([name, schema], sort_keys=True)
+    if key not in _cache:
+        _cache[key] = CompiledSchema(name, schema)
+    return _cache[key]
@@ -0,0 +1,152 @@
+import re
+import math
+import zlib
+import heapq
+from dataclasses import dataclass, asdict
+from typing import Any, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD = re.compile(r"[a-z0-9]+")
+
+# Caller wording -> catalog wording, applied to services and queries alike.
+ALIASES = {
+    "ac": "air conditioning",
+    "aircon": "air conditioning",
+    "cooling": "air conditioning",
+    "heating": "furnace boiler",
+    "heat": "furnace boiler",
+    "wh": "water heater",
+    "ev": "car chargers",
+    "charger": "car chargers",
+    "breaker": "panel",
+    "outage": "partial loss of power",
+    "clog": "drain",
+    "clogged": "drain",
+    "sewage": "sewer",
+    "shower": "tub",
+    "bathtub": "tub",
+    "sink": "faucet small drain",
+    "leak": "leaks",
+    "leaking": "leaks",
+    "broken": "repair",
+    "stopped": "repair",
+    "fix": "repair",
+    "install": "estimate",
+    "replace": "estimate",
+    "quote": "estimate",
+    "new": "estimate",
+    "maintenance": "tune up",
+    "checkup": "tune up",
+    "softener": "softner",
+    "windows": "window"
+}
+
+@dataclass
+class RetrievalStats:
+    queries: int = 0
+    fallbacks: int = 0
+    candidates: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+retrieval_stats = RetrievalStats()
+
+def terms(text: str) -> list[str]:
+    words = WORD.findall(text.lower().replace("_", " "))
+    for word in list(words):
+        if word in ALIASES:
+            words.extend(ALIASES[word].split())
+    return words
+
+def hashed_features(text: str, dim: int) -> dict[int, float]:
+    """Word and character-trigram counts hashed into `dim` buckets.
+
+    Trigrams match inflections and spelling variants ("chargers", "softner");
+    crc32 keeps bucket ids stable across processes.
+    """
+    counts: dict[int, float] = {}
+    for word in terms(text):
+        bucket = zlib.crc32(word.encode()) % dim
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+        padded = f"^{word}$"
+        for i in range(len(padded) - 2):
+            bucket = zlib.crc32(padded[i:i + 3].encode()) % dim
+            counts[bucket] = counts.get(bucket, 0.0) + 0.5
+    return counts
+
+class ServiceIndex:
+    """Hashed n-gram vectors of catalog entries for top-k retrieval.
+
+    Entries are embedded once, weighted by IDF and L2-normalized into an
+    (entries x dim) matrix; a query is one matrix-vector product. The matrix
+    needs NumPy (an optional requirement); without it the same scores are
+    computed from sparse dicts, which is slower on large catalogs.
+    """
+
+    def __init__(self, texts: Sequence[str], dim: int = 4096, stats: RetrievalStats = retrieval_stats):
+        self.dim = dim
+        self.stats = stats
+        docs = [hashed_features(text, dim) for text in texts]
+        df: dict[int, int] = {}
+        for doc in docs:
+            for bucket in doc:
+                df[bucket] = df.get(bucket, 0) + 1
+        self.idf = {bucket: math.log((1 + len(docs)) / (1 + count)) + 1 for bucket, count in df.items()}
+        self.vectors = [self._weigh(doc) for doc in docs]
+        self.matrix = None
+        if np is not None and docs:
+            self.matrix = np.zeros((len(docs), dim), dtype=np.float32)
+            for row, vector in enumerate(self.vectors):
+                for bucket, value in vector.items():
+                    self.matrix[row, bucket] = value
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _weigh(self, counts: dict[int, float]) -> dict[int, float]:
+        vector = {bucket: value * self.idf[bucket] for bucket, value in counts.items() if bucket in self.idf}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {bucket: value / norm for bucket, value in vector.items()} if norm else {}
+
+    def query_vector(self, texts: Sequence[str], decay: float = 0.6) -> dict[int, float]:
+        """Newest text first in weight; earlier ones fade by `decay` per step."""
+        counts: dict[int, float] = {}
+        weight = 1.0
+        for text in reversed(texts):
+            for bucket, value in hashed_features(text, self.dim).items():
+                counts[bucket] = counts.get(bucket, 0.0) + weight * value
+            weight *= decay
+        return self._weigh(counts)
+
+    def scores(self, query: dict[int, float]) -> list[float]:
+        if self.matrix is not None:
+            dense = np.zeros(self.dim, dtype=np.float32)
+            for bucket, value in query.items():
+                dense[bucket] = value
+            return (self.matrix @ dense).tolist()
+        return [sum(value * vector.get(bucket, 0.0) for bucket, value in query.items()) for vector in self.vectors]
+
+    def search(self, texts: Sequence[str], top_k: int, min_score: float = 0.45, min_margin: float = 0.25) -> list[int] | None:
+        """Indices of the `top_k` best entries, best first; None when the match is weak.
+
+        Hashed n-grams give unrelated text scores around 0.3, so a best score
+        under `min_score`, or one that stands less than `min_margin` above the
+        best entry left out, is treated as no match: a paraphrase with no shared
+        words must not hide the right service from the LLM.
+        """
+        self.stats.queries += 1
+        query = self.query_vector(texts)
+        scores = self.scores(query) if query else []
+        ranked = heapq.nlargest(top_k + 1, range(len(scores)), key=scores.__getitem__)
+        excluded = scores[ranked[top_k]] if len(ranked) > top_k else 0.0
+        ranked = ranked[:top_k]
+        if not ranked or scores[ranked[0]] < min_score or scores[ranked[0]] - excluded < min_margin:
+            self.stats.fallbacks += 1
+            return None
+        self.stats.candidates += len(ranked)
+        return ranked
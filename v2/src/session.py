@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import heapq
+import sqlite3
+from itertools import count
+import threading
+from typing import Any, Callable
+
+class SessionState:
+    """Data owned by one call. Values must be JSON serializable."""
+
+    def __init__(self, customer_id: str, data: dict[str, Any]):
+        self.customer_id = customer_id
+        self.data = data
+        self.last_active = time.monotonic()
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self.data[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+class SessionStore:
+    """In-memory session store with TTL eviction of idle sessions."""
+
+    # Whether save() does I/O; callers on the event loop offload it if so.
+    blocking = False
+
+    def __init__(self, factory: Callable[[], dict[str, Any]], ttl: float = 3600):
+        self.factory = factory
+        self.ttl = ttl
+        self._sessions: dict[str, SessionState] = {}
+        # (last_active when queued, seq, state); touching a session does not
+        # reorder it, eviction re-queues sessions that were active since.
+        self._expiry: list[tuple[float, int, SessionState]] = []
+        self._seq = count()
+        self._stale = 0
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, customer_id: str) -> bool:
+        return customer_id in self._sessions
+
+    def get(self, customer_id: str) -> SessionState:
+        with self._lock:
+            state = self._sessions.get(customer_id)
+            if state is None:
+                data = self._load(customer_id)
+                state = SessionState(customer_id, data if data is not None else self.factory())
+                self._sessions[customer_id] = state
+                heapq.heappush(self._expiry, (state.last_active, next(self._seq), state))
+        state.touch()
+        return state
+
+    def save(self, state: SessionState):
+        state.touch()
+        self._persist(state)
+
+    def delete(self, customer_id: str):
+        with self._lock:
+            if self._sessions.pop(customer_id, None) is not None:
+                self._discard()
+        self._remove(customer_id)
+
+    def evict_expired(self) -> int:
+        """Drop sessions idle for longer than `ttl`, in O(log n) per session checked."""
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            expired = self._pop_expired(deadline)
+        return len(expired)
+
+    def _pop_expired(self, deadline: float) -> list[SessionState]:
+        expired = []
+        while self._expiry and self._expiry[0][0] < deadline:
+            _, _, state = heapq.heappop(self._expiry)
+            if self._sessions.get(state.customer_id) is not state:
+                self._stale -= 1
+                continue
+            if state.last_active >= deadline:
+                heapq.heappush(self._expiry, (state.last_active, next(self._seq), state))
+                continue
+            del self._sessions[state.customer_id]
+            expired.append(state)
+        self.evicted += len(expired)
+        return expired
+
+    def _discard(self):
+        # Deleted sessions stay queued until popped; rebuild once they dominate
+        # so finished calls are not kept alive for a whole ttl.
+        self._stale += 1
+        if self._stale > max(64, len(self._sessions)):
+            self._expiry = [entry for entry in self._expiry if self._sessions.get(entry[2].customer_id) is entry[2]]
+            heapq.heapify(self._expiry)
+            self._stale = 0
+
+    def next_expiry(self) -> float | None:
+        """Seconds until the earliest queued session may expire, if any."""
+        with self._lock:
+            if not self._expiry:
+                return None
+            return max(0.0, self._expiry[0][0] + self.ttl - time.monotonic())
+
+    def _load(self, customer_id: str) -> dict[str, Any] | None:
+        return None
+
+    def _persist(self, state: SessionState):
+        pass
+
+    def _remove(self, customer_id: str):
+        pass
+
+class SQLiteSessionStore(SessionStore):
+    """Session store that writes every saved session through to SQLite.
+
+    Live sessions are still served from memory; the database lets a restarted
+    worker pick a call back up, provided the workflow is created with the same
+    session id (the room name). Evicting an idle session only drops it from memory.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, factory: Callable[[], dict[str, Any]], ttl: float = 3600):
+        super().__init__(factory, ttl)
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db_lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "customer_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _load(self, customer_id: str) -> dict[str, Any] | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE customer_id = ?", (str(customer_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _persist(self, state: SessionState):
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (customer_id, data, updated_at) VALUES (?, ?, ?)",
+                (str(state.customer_id), json.dumps(state.data), time.time())
+            )
+
+    def _remove(self, customer_id: str):
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE customer_id = ?", (str(customer_id),))
+
+def create_session_store(factory: Callable[[], dict[str, Any]]) -> SessionStore:
+    """Build the store selected by SESSION_STORE (`memory` or `sqlite:<path>`)."""
+    backend = os.getenv("SESSION_STORE", "memory")
+    ttl = float(os.getenv("SESSION_TTL", "3600"))
+    if backend.startswith("sqlite:"):
+        return SQLiteSessionStore(backend[len("sqlite:"):], factory, ttl)
+    return SessionStore(factory, ttl)
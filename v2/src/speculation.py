@@ -0,0 +1,123 @@
+import time
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Mapping
+
+Request = Callable[[list[dict[str, str]]], Awaitable[Any]]
+Prepare = Callable[[Mapping[str, Any], str | None], tuple[str, list[dict[str, str]], Request] | None]
+
+@dataclass
+class SpeculationStats:
+    started: int = 0
+    hits: int = 0
+    cancelled: int = 0
+    stale: int = 0
+    latency_saved: float = 0.0
+    wasted_completion_tokens: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+speculation_stats = SpeculationStats()
+
+class Prefetch:
+    """A node request started ahead of time whose chunks are buffered until claimed."""
+
+    def __init__(self, node_id: str, messages: list[dict[str, str]], request: Request):
+        self.node_id = node_id
+        self.messages = messages
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+        self.chunks: list[Any] = []
+        self.error: BaseException | None = None
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(request))
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(1 for chunk in self.chunks if chunk.choices and chunk.choices[0].delta.content)
+
+    async def _run(self, request: Request):
+        response = None
+        try:
+            response = await request(self.messages)
+            async for chunk in response:
+                self.chunks.append(chunk)
+                self._changed.set()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.perf_counter()
+            self._changed.set()
+            if response is not None:
+                await response.close()
+
+    def cancel(self):
+        self._task.cancel()
+
+    async def stream(self):
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+class Speculator:
+    """Per-session set of in-flight speculative node requests.
+
+    While an ANALYZE node is deciding where to go, the likely next nodes are
+    requested in parallel. The branch that is actually taken is claimed and
+    replayed; every other one is cancelled and counted as waste.
+    """
+
+    def __init__(self, prepare: Prepare | None = None, stats: SpeculationStats = speculation_stats):
+        self.prepare = prepare
+        self.stats = stats
+        self._pending: dict[str, Prefetch] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self, node_id: str, messages: list[dict[str, str]], request: Request):
+        if node_id in self._pending:
+            return
+        self._pending[node_id] = Prefetch(node_id, messages, request)
+        self.stats.started += 1
+
+    def start_target(self, target: Mapping[str, Any], depends_on: str | None = None):
+        """Start the node a go_to target points at, if `prepare` says it can run early."""
+        prepared = self.prepare(target, depends_on) if self.prepare else None
+        if prepared is not None:
+            self.start(*prepared)
+
+    def claim(self, node_id: str) -> Prefetch | None:
+        prefetch = self._pending.pop(node_id, None)
+        self.cancel_all()
+        return prefetch
+
+    def accept(self, prefetch: Prefetch):
+        now = time.perf_counter()
+        self.stats.hits += 1
+        self.stats.latency_saved += min(now, prefetch.finished_at or now) - prefetch.started_at
+
+    def reject(self, prefetch: Prefetch):
+        prefetch.cancel()
+        self.stats.stale += 1
+        self.stats.wasted_completion_tokens += prefetch.completion_tokens
+
+    def cancel_all(self):
+        for prefetch in self._pending.values():
+            prefetch.cancel()
+            self.stats.cancelled += 1
+            self.stats.wasted_completion_tokens += prefetch.completion_tokens
+        self._pending.clear()
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Mapping
+
+from .history import ChatHistory
+from .llm_provider import LLMProvider
+
+logger = logging.getLogger("voice.summary")
+
+SUMMARY_PROMPT = (
+    "Summarize the part of a customer service call about '{topic}' below. "
+    "Keep every fact the assistant may still need: names, contact details, addresses, "
+    "services, answers to questions, times and decisions. "
+    "Use at most {max_words} words of plain text."
+)
+
+@dataclass
+class SummaryStats:
+    runs: int = 0
+    errors: int = 0
+    folded_messages: int = 0
+    folded_tokens: int = 0
+    summary_tokens: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+summary_stats = SummaryStats()
+
+class Summarizer:
+    """Folds older chat turns into per-topic summaries in the background.
+
+    After a completed turn, the messages before the newest `keep_recent` are
+    summarized per topic (the agent that handled them), together with that
+    topic's previous summary, and replaced in the history by the summaries.
+    The request runs as its own task, off the conversation's critical path;
+    nothing is folded if it fails.
+    """
+
+    def __init__(
+        self,
+        client: LLMProvider,
+        keep_recent: int = 8,
+        min_batch: int = 6,
+        model: str = "gpt-4o-mini",
+        max_words: int = 80,
+        stats: SummaryStats = summary_stats
+    ):
+        self.client = client
+        self.keep_recent = keep_recent
+        self.min_batch = min_batch
+        self.model = model
+        self.max_words = max_words
+        self.stats = stats
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any] | None, client: LLMProvider) -> "Summarizer | None":
+        if not config or not config.get("enabled", True):
+            return None
+        return cls(
+            client,
+            keep_recent=config.get("keep_recent", 8),
+            min_batch=config.get("min_batch", 6),
+            model=config.get("model", "gpt-4o-mini"),
+            max_words=config.get("max_words", 80)
+        )
+
+    def schedule(self, history: ChatHistory) -> asyncio.Task | None:
+        """Start folding `history` if enough older messages piled up and no run is active."""
+        if self._task is not None and not self._task.done():
+            return None
+        older = history.older(self.keep_recent)
+        if len(older) < self.min_batch:
+            return None
+        self._task = asyncio.create_task(self._run(history, older))
+        return self._task
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self, history: ChatHistory, older: list[tuple[dict[str, str], str | None]]):
+        topics: dict[str, list[dict[str, str]]] = {}
+        for message, topic in older:
+            topics.setdefault(topic or "conversation", []).append(message)
+        self.stats.runs += 1
+        try:
+            summaries = await asyncio.gather(*(
+                self.summarize(topic, history.summaries.get(topic), messages)
+                for topic, messages in topics.items()
+            ))
+        except Exception:
+            self.stats.errors += 1
+            logger.warning("summarization failed", exc_info=True)
+            return
+        if not all(summaries):
+            self.stats.errors += 1
+            return
+
+        before = history.tokens
+        history.fold([message for message, _ in older], dict(zip(topics, summaries)))
+        self.stats.folded_messages += len(older)
+        self.stats.folded_tokens += before - history.tokens
+        self.stats.summary_tokens += history.summary_tokens
+
+    async def summarize(self, topic: str, previous: str | None, messages: list[dict[str, str]]) -> str:
+        transcript = "\n".join(f'{message["role"]}: {message["content"]}' for message in messages)
+        request = [{"role": "system", "content": SUMMARY_PROMPT.format(topic=topic, max_words=self.max_words)}]
+        if previous:
+            request.append({"role": "user", "content": f"Earlier summary:\n{previous}"})
+        request.append({"role": "user", "content": f"Conversation:\n{transcript}"})
+
+        response = await self.client.create(model=self.model, messages=request, stream=True)
+        parts: list[str] = []
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+        finally:
+            await response.close()
+        return "".join(parts).strip()
@@ -0,0 +1,88 @@
+from string import Template
+from itertools import count
+from typing import Any, Mapping
+
+class Args(dict):
+    """Session args that remember when each key was last assigned.
+
+    `serialize` caches `str(value)` per key and only recomputes it after the key
+    is assigned again, so large values such as the service list are converted
+    once per change instead of once per prompt. Mutating a value in place does
+    not invalidate the cache; assign it again instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clock = count(1)
+        self.versions: dict[str, int] = {key: next(self._clock) for key in self}
+        self._strings: dict[str, tuple[int, str]] = {}
+
+    def __setitem__(self, key: str, value: Any):
+        super().__setitem__(key, value)
+        self.versions[key] = next(self._clock)
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self.versions.pop(key, None)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self.versions.pop(key, None)
+        return super().pop(key, *default)
+
+    def serialize(self, key: str) -> str:
+        version = self.versions[key]
+        cached = self._strings.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, str(self[key]))
+            self._strings[key] = cached
+        return cached[1]
+
+class CompiledTemplate:
+    """A `string.Template` pre-split into literal segments and placeholder slots.
+
+    Rendering follows `safe_substitute`: unknown placeholders are left as written.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        parts: list[tuple[str, str | None, str]] = []
+        literal: list[str] = []
+        position = 0
+        for match in Template.pattern.finditer(text):
+            literal.append(text[position:match.start()])
+            position = match.end()
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                parts.append(("".join(literal), name, match.group()))
+                literal = []
+            elif match.group("escaped") is not None:
+                literal.append("$")
+            else:
+                literal.append(match.group())
+        literal.append(text[position:])
+        self._parts = tuple(parts)
+        self._tail = "".join(literal)
+        self.names = tuple(dict.fromkeys(name for _, name, _ in parts))
+
+    def render(self, args: Mapping[str, Any]) -> str:
+        serialize = args.serialize if isinstance(args, Args) else None
+        pieces = []
+        for literal, name, placeholder in self._parts:
+            pieces.append(literal)
+            if name not in args:
+                pieces.append(placeholder)
+            elif serialize is not None:
+                pieces.append(serialize(name))
+            else:
+                pieces.append(str(args[name]))
+        pieces.append(self._tail)
+        return "".join(pieces)
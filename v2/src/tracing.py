@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import logging
+import secrets
+from contextvars import ContextVar
+from typing import Any
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger("voice.trace")
+
+class Span:
+    def __init__(self, trace: "TurnTrace", name: str, parent_id: str | None, attributes: dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.events: list[tuple[str, int]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def add_event(self, name: str):
+        self.events.append((name, time.time_ns()))
+
+    def end(self, **attributes: Any):
+        if self.end_ns is None:
+            self.attributes.update(attributes)
+            self.end_ns = time.time_ns()
+        if self.trace.scope is self:
+            self.trace.scope = None
+
+    def event_ns(self, name: str) -> int | None:
+        return next((at for event, at in self.events if event == name), None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "events": [{"name": name, "time_unix_nano": at} for name, at in self.events]
+        }
+
+class _NullSpan:
+    def add_event(self, name: str):
+        pass
+
+    def end(self, **attributes: Any):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class TurnTrace:
+    """Spans for one user turn, rooted at the end of the user's speech.
+
+    Point-in-time milestones (end of speech, first chunk to TTS, first audio) are
+    stored as marks; work with a duration (the workflow, each LLM request) is a
+    span whose events record milestones such as the first token.
+    """
+
+    def __init__(self, **attributes: Any):
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span(self, "turn", None, attributes)
+        self.spans: list[Span] = [self.root]
+        self.scope: Span | None = None
+        self.marks: dict[str, int] = {}
+
+    def start_span(self, name: str, scope: bool = False, **attributes: Any) -> Span:
+        """Start a child of the open scope span, or of the root; `scope` makes it the new parent."""
+        span = Span(self, name, (self.scope or self.root).span_id, attributes)
+        self.spans.append(span)
+        if scope:
+            self.scope = span
+        return span
+
+    def mark(self, name: str, once: bool = True):
+        if not once or name not in self.marks:
+            self.marks[name] = time.time_ns()
+
+    def summary(self) -> dict[str, Any]:
+        """Milliseconds from the end of user speech to each milestone."""
+        origin = self.marks.get("end_of_speech", self.root.start_ns)
+        milestones = dict(self.marks)
+        requests = [span for span in self.spans if span.name == "llm.request"]
+        workflow = next((span for span in self.spans if span.name == "workflow"), None)
+        if workflow is not None:
+            milestones["workflow_start"] = workflow.start_ns
+        if requests:
+            milestones["first_llm_request"] = requests[0].start_ns
+            first_tokens = [at for at in (span.event_ns("first_token") for span in requests) if at is not None]
+            if first_tokens:
+                milestones["first_token"] = min(first_tokens)
+        return {
+            "trace_id": self.trace_id,
+            **self.root.attributes,
+            "llm_requests": len(requests),
+            "milestones_ms": {
+                name: round((at - origin) / 1e6, 1)
+                for name, at in sorted(milestones.items(), key=lambda item: item[1])
+            },
+            "ttfa_ms": round((self.marks["first_audio"] - origin) / 1e6, 1) if "first_audio" in self.marks else None
+        }
+
+class LogExporter:
+    """Writes one JSON summary line per turn, plus every span when `spans` is set."""
+
+    def __init__(self, spans: bool = False):
+        self.spans = spans
+
+    def export(self, trace: TurnTrace):
+        record = trace.summary()
+        if self.spans:
+            record["spans"] = [span.to_dict() for span in trace.spans]
+        logger.info(json.dumps(record, default=str))
+
+class OTelExporter:
+    """Replays a finished turn into the configured OpenTelemetry tracer provider."""
+
+    def __init__(self, name: str = "voice-agent"):
+        if otel_trace is None:
+            raise RuntimeError("TRACE_EXPORTER=otel requires the opentelemetry-api package")
+        self.tracer = otel_trace.get_tracer(name)
+
+    def export(self, trace: TurnTrace):
+        children: dict[str | None, list[Span]] = {}
+        for span in trace.spans:
+            children.setdefault(span.parent_id, []).append(span)
+
+        def emit(span: Span, context=None):
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=context,
+                start_time=span.start_ns,
+                attributes={key: value for key, value in span.attributes.items() if value is not None}
+            )
+            for name, at in span.events:
+                otel_span.add_event(name, timestamp=at)
+            if span is trace.root:
+                for name, at in trace.marks.items():
+                    otel_span.add_event(name, timestamp=at)
+            child_context = otel_trace.set_span_in_context(otel_span)
+            for child in children.get(span.span_id, []):
+                emit(child, child_context)
+            otel_span.end(end_time=span.end_ns or time.time_ns())
+
+        emit(trace.root)
+
+class Tracer:
+    """Per-conversation tracer; holds the trace of the turn in progress.
+
+    A turn is exported once both `FINISH_MARKS` are recorded (audio is playing and
+    the workflow is done streaming), or when the next turn starts.
+    """
+
+    FINISH_MARKS = ("first_audio", "workflow_end")
+
+    def __init__(self, exporter: Any = None, **attributes: Any):
+        self.exporter = exporter
+        self.attributes = attributes
+        self.current: TurnTrace | None = None
+        self.turns = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_turn(self, **attributes: Any) -> TurnTrace | None:
+        if not self.enabled:
+            return None
+        self.finish_turn()
+        self.turns += 1
+        self.current = TurnTrace(**self.attributes, turn=self.turns, **attributes)
+        return self.current
+
+    def mark(self, name: str, once: bool = True):
+        """Record a milestone on the open turn, if any."""
+        trace = self.current
+        if trace is None:
+            return
+        trace.mark(name, once)
+        if all(mark in trace.marks for mark in self.FINISH_MARKS):
+            self.finish_turn()
+
+    def start_span(self, name: str, scope: bool = False, **attributes: Any) -> Span | _NullSpan:
+        if not self.enabled:
+            return NULL_SPAN
+        trace = self.current or self.start_turn()
+        return trace.start_span(name, scope, **attributes)
+
+    def finish_turn(self):
+        trace, self.current = self.current, None
+        if trace is None:
+            return
+        trace.root.end()
+        try:
+            self.exporter.export(trace)
+        except Exception as e:
+            logger.warning(f"trace export failed: {e}")
+
+NULL_TRACER = Tracer()
+
+_current_tracer: ContextVar[Tracer] = ContextVar("tracer", default=NULL_TRACER)
+
+def get_tracer() -> Tracer:
+    return _current_tracer.get()
+
+def set_tracer(tracer: Tracer):
+    """Make `tracer` current for this task or thread and everything it starts."""
+    _current_tracer.set(tracer)
+
+def create_tracer(**attributes: Any) -> Tracer:
+    """Build a tracer from `TRACE_EXPORTER`: `log` (default), `log+spans`, `otel` or `none`."""
+    name = os.getenv("TRACE_EXPORTER", "log")
+    if name == "none":
+        return Tracer(None, **attributes)
+    if name == "otel":
+        return Tracer(OTelExporter(), **attributes)
+    if name in ("log", "log+spans"):
+        return Tracer(LogExporter(spans=name == "log+spans"), **attributes)
+    raise ValueError(f"Unknown TRACE_EXPORTER '{name}'")
@@ -0,0 +1,453 @@
+"""Static checks for workflow graphs.
+
+Loads the v2 node graphs (`<workflow_dir>/*.yaml`) and v1 workflow files
+(`workflows/test.yaml` and the node files it lists) without running them, and
+reports:
+
+- go_to targets that do not exist, which would otherwise surface as a
+  `KeyError` and an `extra/handle_error` detour at runtime;
+- callback names missing from the tree's `API_FUNCTIONS`, args and prompt
+  placeholders no node provides, and routing fields the schema lacks;
+- nodes the init node can not reach;
+- cycles that can run within one turn without a PROCESS node replying;
+- the worst-case number of LLM calls per turn, with the path that needs them.
+
+Run from `v2/`:
+
+    python -m src.validator                              # ./workflow and ../workflows/test.yaml
+    python -m src.validator --v2 ./workflow --v1 ../workflows/test.yaml --json
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import yaml
+import argparse
+from dataclasses import dataclass, field, asdict
+from string import Template
+from typing import Any, Iterable
+
+from .types import NodeType
+from .registry import CONFIG_NAME, TERMINAL_AGENTS, WorkflowError, compile_node
+
+# Keys `Workflow` puts into args before any node runs.
+WORKFLOW_ARGS = ("next", "global_system_prompt", "customer_id", "message", "user_messages")
+# Where `Workflow` routes a turn after a node raised.
+ERROR_NODE = "extra/handle_error"
+V1_PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+V1_LLM_ACTIONS = ("analyze", "process")
+
+@dataclass
+class Issue:
+    level: str
+    node: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.level}: {self.node}: {self.message}"
+
+@dataclass
+class Vertex:
+    """One step of a turn: its LLM calls, whether it replies, and where it goes next.
+
+    Each edge is (target, ends_turn); a None target ends the call.
+    """
+    node: str
+    llm_calls: int = 0
+    replies: bool = False
+    edges: list[tuple[str | None, bool]] = field(default_factory=list)
+
+@dataclass
+class Report:
+    source: str
+    nodes: int = 0
+    issues: list[Issue] = field(default_factory=list)
+    unreachable: list[str] = field(default_factory=list)
+    # turn start -> (worst-case LLM calls, None if unbounded; the path that needs them)
+    worst_case: dict[str, tuple[int | None, list[str]]] = field(default_factory=dict)
+
+    @property
+    def errors(self) -> list[Issue]:
+        return [issue for issue in self.issues if issue.level == "error"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def error(self, node: str, message: str):
+        self.issues.append(Issue("error", node, message))
+
+    def warning(self, node: str, message: str):
+        self.issues.append(Issue("warning", node, message))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "source": self.source,
+            "nodes": self.nodes,
+            "ok": self.ok,
+            "issues": [asdict(issue) for issue in self.issues],
+            "unreachable": self.unreachable,
+            "worst_case": {start: {"llm_calls": calls, "path": path} for start, (calls, path) in self.worst_case.items()}
+        }
+
+def api_functions(path: str) -> set[str]:
+    """Keys of the `API_FUNCTIONS` dict in an apis module, read without importing it."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for statement in tree.body:
+        if isinstance(statement, ast.Assign):
+            targets, value = statement.targets, statement.value
+        elif isinstance(statement, ast.AnnAssign):
+            targets, value = [statement.target], statement.value
+        else:
+            continue
+        if any(isinstance(target, ast.Name) and target.id == "API_FUNCTIONS" for target in targets) and isinstance(value, ast.Dict):
+            return {key.value for key in value.keys if isinstance(key, ast.Constant) and isinstance(key.value, str)}
+    raise ValueError(f"{path}: no API_FUNCTIONS dict")
+
+def _strongly_connected(graph: dict[str, Vertex], edges: dict[str, list[str]]) -> list[list[str]]:
+    """Tarjan's algorithm, iterative so deep graphs do not hit the recursion limit."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components: list[list[str]] = []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(edges[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            vertex, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(edges[successor])))
+                    break
+                if successor in on_stack:
+                    low[vertex] = min(low[vertex], index[successor])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[vertex])
+                if low[vertex] == index[vertex]:
+                    component = []
+                    while True:
+                        item = stack.pop()
+                        on_stack.discard(item)
+                        component.append(item)
+                        if item == vertex:
+                            break
+                    components.append(component)
+    return components
+
+def analyze(graph: dict[str, Vertex], start: str, report: Report, entries: Iterable[str] = ()):
+    """Reachability, loops without a reply and worst-case LLM calls per turn.
+
+    `entries` are vertices the runtime can jump to besides `start`.
+    """
+    entries = [name for name in entries if name in graph and name != start]
+    reachable = {start, *entries}
+    pending = list(reachable)
+    while pending:
+        for target, _ in graph[pending.pop()].edges:
+            if target is not None and target not in reachable:
+                reachable.add(target)
+                pending.append(target)
+    report.unreachable = sorted(
+        {vertex.node for vertex in graph.values()} - {graph[name].node for name in reachable},
+        key=str
+    )
+    for node in report.unreachable:
+        report.warning(node, "not reachable from the init node")
+
+    # Edges taken without waiting for the customer.
+    within = {
+        name: [target for target, ends_turn in graph[name].edges if target is not None and not ends_turn]
+        for name in reachable
+    }
+    cyclic: set[str] = set()
+    for component in _strongly_connected({name: graph[name] for name in reachable}, within):
+        if len(component) == 1 and component[0] not in within[component[0]]:
+            continue
+        cyclic.update(component)
+        if any(graph[name].replies for name in component):
+            continue
+        members = set(component)
+        exits = any(
+            target is None or ends_turn or target not in members
+            for name in component
+            for target, ends_turn in graph[name].edges
+        )
+        cycle = ", ".join(sorted({graph[name].node for name in component}, key=str))
+        if exits:
+            report.warning(graph[component[0]].node, f"can loop within a turn without replying: {cycle}")
+        else:
+            report.error(graph[component[0]].node, f"loops forever without replying: {cycle}")
+
+    best: dict[str, tuple[int | None, list[str]]] = {}
+
+    def worst(name: str) -> tuple[int | None, list[str]]:
+        # `within` is acyclic outside `cyclic`, so the memoized recursion ends.
+        if name in cyclic:
+            return None, [name]
+        if name not in best:
+            calls, path = 0, []
+            for target in within[name]:
+                target_calls, target_path = worst(target)
+                if target_calls is None:
+                    calls, path = None, target_path
+                    break
+                if target_calls > calls or not path:
+                    calls, path = target_calls, target_path
+            best[name] = (None if calls is None else calls + graph[name].llm_calls, [name, *path])
+        return best[name]
+
+    starts = {start, *entries} | {
+        target
+        for name in reachable
+        for target, ends_turn in graph[name].edges
+        if target is not None and ends_turn
+    }
+    for name in [start, *sorted(starts - {start})]:
+        report.worst_case[name] = worst(name)
+
+def _prompt_names(prompt: str) -> list[str]:
+    return [match.group("named") or match.group("braced") for match in Template.pattern.finditer(prompt) if match.group("named") or match.group("braced")]
+
+def validate_v2(workflow_dir: str, apis_path: str | None = None) -> Report:
+    """Check a v2 workflow directory of `config.yaml` plus one YAML file per agent."""
+    report = Report(workflow_dir)
+    callbacks = api_functions(apis_path or os.path.join(os.path.dirname(__file__), "apis.py"))
+
+    config: dict[str, Any] = {}
+    agents: dict[str, dict[str, Any]] = {}
+    for entry in sorted(os.scandir(workflow_dir), key=lambda entry: entry.name):
+        if not (entry.is_file() and entry.name.endswith(".yaml")):
+            continue
+        name = os.path.splitext(entry.name)[0]
+        with open(entry.path) as f:
+            data = yaml.safe_load(f)
+        if name == CONFIG_NAME:
+            config = data or {}
+        elif not isinstance(data, dict) or not isinstance(data.get("nodes"), dict):
+            report.error(name, "workflow file has no 'nodes' mapping")
+        else:
+            agents[name] = data["nodes"]
+
+    def exists(target: dict[str, Any]) -> bool:
+        return target.get("to") in TERMINAL_AGENTS or (target.get("to") in agents and target.get("step") in agents[target["to"]])
+
+    init = {"to": config.get("init_node"), "step": config.get("init_step")}
+    if not exists(init):
+        report.error(CONFIG_NAME, f"init node '{init['to']}/{init['step']}' does not exist")
+
+    available = set(WORKFLOW_ARGS) | {
+        node["client"]["return"]
+        for nodes in agents.values()
+        for node in nodes.values()
+        if isinstance(node, dict) and isinstance(node.get("client"), dict) and node["client"].get("return")
+    }
+
+    graph: dict[str, Vertex] = {}
+    for agent, nodes in agents.items():
+        for step, node in nodes.items():
+            node_id = f"{agent}/{step}"
+            try:
+                compiled = compile_node(agent, step, node, workflow_dir)
+            except WorkflowError as e:
+                report.error(node_id, str(e).removeprefix(f"{node_id}: "))
+                graph[node_id] = Vertex(node_id)
+                continue
+            except (KeyError, TypeError, AttributeError) as e:
+                report.error(node_id, f"malformed node: {e!r}")
+                graph[node_id] = Vertex(node_id)
+                continue
+            client = compiled["client"]
+            node_type = NodeType(compiled["type"])
+
+            if node_type == NodeType.CALLBACK:
+                if client.get("name") not in callbacks:
+                    report.error(node_id, f"callback '{client.get('name')}' is not in API_FUNCTIONS")
+                for arg in client.get("args") or ():
+                    if arg not in available:
+                        report.error(node_id, f"arg '{arg}' is never set")
+            else:
+                for name in _prompt_names(client.get("prompt", "")):
+                    if name not in available:
+                        report.warning(node_id, f"prompt placeholder '${name}' is never set")
+
+            go_to = compiled["go_to"]
+            data = go_to.get("data")
+            if data and data not in available:
+                report.error(node_id, f"go_to.data '{data}' is never set")
+            schema = client.get("schema")
+            if node_type == NodeType.ANALYZE and schema and data == client.get("return"):
+                properties = schema.get("properties", {})
+                for case in go_to.get("cases") or ():
+                    if case.get("name") not in properties:
+                        report.error(node_id, f"case field '{case.get('name')}' is not in the schema")
+                    elif "enum" in properties[case["name"]] and case.get("value") not in properties[case["name"]]["enum"]:
+                        report.warning(node_id, f"case value '{case.get('value')}' is not in the '{case['name']}' enum")
+
+            vertex = graph[node_id] = Vertex(
+                node_id,
+                llm_calls=int(node_type != NodeType.CALLBACK),
+                replies=node_type == NodeType.PROCESS
+            )
+            for target in [*(go_to.get("cases") or ()), go_to["default"]]:
+                if not exists(target):
+                    report.error(node_id, f"go_to target '{target.get('to')}/{target.get('step')}' does not exist")
+                    continue
+                if target["to"] in TERMINAL_AGENTS:
+                    vertex.edges.append((None, True))
+                else:
+                    vertex.edges.append((f"{target['to']}/{target['step']}", bool(target.get("finished", False))))
+
+    report.nodes = len(graph)
+    if exists(init) and init["to"] not in TERMINAL_AGENTS:
+        analyze(graph, f"{init['to']}/{init['step']}", report, [ERROR_NODE])
+    return report
+
+def validate_v1(workflow_file: str, root: str | None = None, apis_path: str | None = None) -> Report:
+    """Check a v1 workflow file and its node files.
+
+    Node paths are resolved against `root`, the directory the v1 worker runs
+    from; by default the parent of the workflow file's directory. Nodes with
+    PROCESS actions are reported per segment: `14:1` is node 14 after its
+    first reply.
+    """
+    report = Report(workflow_file)
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(workflow_file)))
+    callbacks = api_functions(apis_path or os.path.join(root, "src", "apis.py"))
+    with open(workflow_file) as f:
+        config = yaml.safe_load(f)
+
+    files: dict[int, dict[str, Any]] = {}
+    for entry in config.get("nodes", ()):
+        path = os.path.join(root, entry["path"])
+        try:
+            with open(path) as f:
+                data = yaml.safe_load(f)
+        except OSError:
+            report.error(str(entry["id"]), f"node file '{entry['path']}' not found")
+            continue
+        if not isinstance(data, dict) or not isinstance(data.get("actions"), list):
+            # Placeholder files are fine until something routes to them.
+            report.warning(str(entry["id"]), f"node file '{entry['path']}' has no 'actions' list")
+            continue
+        files[entry["id"]] = data
+    if config.get("init_node") not in files:
+        report.error("config", f"init node {config.get('init_node')} does not exist")
+
+    available = set(config.get("init_config") or ()) | {
+        action["return"]
+        for node in files.values()
+        for action in node.get("actions", ())
+        if action.get("return")
+    }
+
+    # A node is split into segments at its PROCESS actions, since each one
+    # replies and then waits for the customer's answer.
+    graph: dict[str, Vertex] = {}
+    missing: list[tuple[str, str]] = []
+    for node_id, node in files.items():
+        label = str(node_id)
+        segments = [Vertex(label)]
+        targets: list[int] = []
+        for action in node.get("actions", ()):
+            kind = action.get("type")
+            if kind not in ("callback", "process", "analyze", "go_next"):
+                report.error(label, f"unknown action type '{kind}'")
+                continue
+            if kind == "callback" and action.get("name") not in callbacks:
+                missing.append((label, action.get("name")))
+            for arg in action.get("args") or ():
+                if arg not in available:
+                    report.error(label, f"arg '{arg}' is never set")
+            if kind in V1_LLM_ACTIONS:
+                names = set(action.get("args") or ())
+                for name in dict.fromkeys(V1_PLACEHOLDER.findall(action.get("prompt", ""))):
+                    if name not in names:
+                        report.warning(label, f"prompt placeholder '{{{name}}}' is not in the action's args")
+                segments[-1].llm_calls += 1
+            if kind == "process":
+                segments[-1].replies = True
+                segments.append(Vertex(label))
+            if kind == "go_next":
+                if action.get("arg") and action["arg"] not in available:
+                    report.error(label, f"go_next arg '{action['arg']}' is never set")
+                if "id" not in (action.get("default") or {}):
+                    report.error(label, "go_next needs a default id")
+                    continue
+                targets = [
+                    target["id"]
+                    for cases in (action.get("go_to") or {}).values()
+                    for target in cases.values()
+                ] + [action["default"]["id"]]
+
+        names = [label] + [f"{label}:{i}" for i in range(1, len(segments))]
+        for i, (name, segment) in enumerate(zip(names, segments)):
+            if i + 1 < len(segments):
+                segment.edges.append((names[i + 1], True))
+            graph[name] = segment
+        last = segments[-1]
+        if not targets:
+            last.edges.append((None, False))
+        for target in dict.fromkeys(targets):
+            if target == -1:
+                last.edges.append((None, False))
+            elif target not in files:
+                report.error(label, f"go_next target {target} does not exist or has no actions")
+            else:
+                last.edges.append((str(target), False))
+
+    report.nodes = len(files)
+    if config.get("init_node") in files:
+        analyze(graph, str(config["init_node"]), report)
+    # A missing callback only fails a call that can get to it.
+    for label, name in missing:
+        level = report.warning if label in report.unreachable else report.error
+        level(label, f"callback '{name}' is not in API_FUNCTIONS")
+    return report
+
+def format_report(report: Report) -> str:
+    lines = [f"{report.source}: {report.nodes} nodes, {len(report.errors)} errors, {len(report.issues) - len(report.errors)} warnings"]
+    lines.extend(f"  {issue}" for issue in report.issues)
+    lines.append("  worst-case LLM calls per turn:")
+    for start, (calls, path) in report.worst_case.items():
+        lines.append(f"    {start}: {'unbounded' if calls is None else calls}  ({' -> '.join(path)})")
+    return "\n".join(lines)
+
+def validate(v2_dirs: Iterable[str] = (), v1_files: Iterable[str] = ()) -> list[Report]:
+    return [validate_v2(path) for path in v2_dirs] + [validate_v1(path) for path in v1_files]
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--v2", action="append", help="v2 workflow directory (default ./workflow)")
+    parser.add_argument("--v1", action="append", help="v1 workflow file (default ../workflows/test.yaml)")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    parser.add_argument("--strict", action="store_true", help="fail on warnings too")
+    options = parser.parse_args(argv)
+
+    v2_dirs = options.v2 if options.v2 is not None else ["./workflow"]
+    v1_files = options.v1
+    if v1_files is None:
+        v1_files = [path for path in ["../workflows/test.yaml"] if os.path.exists(path)]
+    reports = validate(v2_dirs, v1_files)
+
+    if options.json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        print("\n\n".join(format_report(report) for report in reports))
+    failed = any(not report.ok or (options.strict and report.issues) for report in reports)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,58 +1,143 @@
-import yaml
+import asyncio
+import re
 import uuid
-from typing import Callable
-from collections import deque
-from openai import AsyncOpenAI
+from typing import Any, Callable, Mapping
 
 from .agent import Agent
+from .client import Client
+from .apis import sessions
+from .registry import TERMINAL_AGENTS, WorkflowRegistry, get_registry
+from .speculation import Speculator
+from .template import Args
+from .types import NodeType
+from .llm_provider import LLMProvider, get_provider
+from .history import ChatHistory
+from .summary import Summarizer
+from .chunker import SentenceChunker
+from .tracing import get_tracer
+from .metrics import NodeMetrics, get_node_metrics
 
 class Workflow:
     def __init__(
         self,
         disconnect: Callable,
-        config_path: str = "./workflow/config.yaml"
+        registry: WorkflowRegistry | None = None,
+        client: LLMProvider | None = None,
+        session_id: str | None = None
     ):
         self.disconnect = disconnect
-        with open(config_path) as f:
-            config: dict[str, ] = yaml.safe_load(f)
-        
+        self.registry = registry or get_registry()
+        config = self.registry.config
+
         self.config = config
-        self.args = {
+        self.args = Args({
             "next": {
                 "finished": False,
                 "to": self.config["init_node"],
                 "step": self.config["init_step"]
             },
             "global_system_prompt": config["global_system_prompt"],
-            "customer_id": f"{uuid.uuid4()}"
-        }
-        self.chat_history: deque[dict[str, str]] = deque(maxlen=config["chat_history_maxlen"])
-        self.client = AsyncOpenAI()
+            # A stable id (the room name) lets a persistent store resume the call.
+            "customer_id": session_id or f"{uuid.uuid4()}"
+        })
+        self.chat_history = ChatHistory(config["chat_history_maxlen"], config.get("chat_history_max_tokens"))
+        self.client = client or get_provider()
+        self.speculative = config.get("speculative_execution", False)
+        self.speculator = Speculator(self._prepare)
+        self.summarizer = Summarizer.from_config(config.get("summarization"), self.client)
+        self.chunker = SentenceChunker.from_config(config.get("tts_chunking"))
+        self.hops = 0
+        self.metrics = NodeMetrics(parent=get_node_metrics())
+
+    def _prepare(self, target: Mapping[str, Any], depends_on: str | None):
+        if target.get("finished", False) or target["to"] in TERMINAL_AGENTS:
+            return None
+        try:
+            spec = self.registry.node(target["to"], target["step"])
+        except KeyError:
+            return None
+        if spec["type"] == NodeType.CALLBACK:
+            return None
+        if depends_on and re.search(rf"\$\{{?{re.escape(depends_on)}\b", spec["client"]["prompt"]):
+            return None
+        client = Client(
+            type=NodeType(spec["type"]),
+            config=spec["client"],
+            args=self.args,
+            chat_history=self.chat_history,
+            client=self.client,
+            node_id=spec["id"]
+        )
+        return spec["id"], client.messages(), client.request
+
+    def _speculate(self, node_config: Mapping[str, Any]):
+        if node_config["type"] != NodeType.ANALYZE or not node_config.get("speculate", True):
+            return
+        go_to = node_config["go_to"]
+        for target in [*go_to["cases"], go_to["default"]]:
+            self.speculator.start_target(target, node_config["client"]["return"])
 
     async def process(self, message: str):
         self.args["next"]["finished"] = False
         self.args["message"] = message
-        self.chat_history.append({"role": "user", "content": message})
-        while True:
-            try:
-                if self.args["next"]["finished"] \
-                    or self.args["next"]["to"] == "completed" \
-                    or self.args["next"]["to"] == "canceled":
-                    break
-                agent = Agent(
-                    f"./workflow/{self.args["next"]["to"]}.yaml",
-                    self.args,
-                    self.chat_history,
-                    self.client
-                )
-                response = agent.process(self.args["next"]["step"])
-                async for chunk in response:
-                    yield chunk
-            except:
-                self.args["next"]["to"] = "extra"
-                self.args["next"]["step"] = "handle_error"
+        self.chat_history.append({"role": "user", "content": message}, self.args["next"]["to"])
+        self.args["user_messages"] = [item["content"] for item in self.chat_history if item["role"] == "user"]
+        # Where this turn started; an interrupted turn rolls back to it so the
+        # next message is handled from a consistent node.
+        turn_start = dict(self.args["next"])
+        span = get_tracer().start_span("workflow", scope=True, node=f'{self.args["next"]["to"]}/{self.args["next"]["step"]}')
+        hops = self.hops
+        try:
+            while True:
+                try:
+                    if self.args["next"]["finished"] \
+                        or self.args["next"]["to"] == "completed" \
+                        or self.args["next"]["to"] == "canceled":
+                        break
+                    node_config = self.registry.node(self.args["next"]["to"], self.args["next"]["step"])
+                    self.hops += 1
+                    prefetch = self.speculator.claim(node_config["id"])
+                    if self.speculative:
+                        self._speculate(node_config)
+                    agent = Agent(
+                        self.registry.get(self.args["next"]["to"]),
+                        self.args,
+                        self.chat_history,
+                        self.client,
+                        self.metrics,
+                        self.chunker
+                    )
+                    response = agent.process(
+                        self.args["next"]["step"],
+                        prefetch,
+                        self.speculator if self.speculative else None
+                    )
+                    async for chunk in response:
+                        yield chunk
+                except Exception:
+                    self.speculator.cancel_all()
+                    self.args["next"]["to"] = "extra"
+                    self.args["next"]["step"] = "handle_error"
+        except (asyncio.CancelledError, GeneratorExit):
+            self.speculator.cancel_all()
+            self.args["next"] = turn_start
+            span.end(hops=self.hops - hops, cancelled=True)
+            raise
+
+        self.speculator.cancel_all()
+        span.end(hops=self.hops - hops)
+        if self.summarizer is not None:
+            self.summarizer.schedule(self.chat_history)
 
         if self.args["next"]["to"] == "completed":
             await self.disconnect()
         if self.args["next"]["to"] == "canceled":
-            await self.disconnect()
\ No newline at end of file
+            await self.disconnect()
+
+    def close(self):
+        """Release this call's state once the session is torn down."""
+        self.speculator.cancel_all()
+        if self.summarizer is not None:
+            self.summarizer.cancel()
+        self.chat_history.clear()
+        sessions.delete(self.args["customer_id"])
\ No newline at end of file
@@ -31,7 +31,7 @@ async def chat():
         try:
             stream = workflow.process(user_input)
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
+                if chunk.choices and chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     print(content, end="", flush=True)
             print()
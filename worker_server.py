@@ -3,6 +3,7 @@ from livekit.agents import (
     Agent,
     RoomInputOptions,
     JobContext,
+    JobProcess,
     cli,
     WorkerOptions
 )
@@ -13,32 +14,82 @@ from livekit.plugins import (
 )
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from dotenv import load_dotenv
+import os
 import uuid
 import asyncio
+import contextlib
 
 from src.agent_llm import AgentLLM
 from src.apis import CloseConversation
+from src.llm_provider import get_provider
+from src.tracing import create_tracer
 
 load_dotenv()
 
+DISCONNECT_TIMEOUT = float(os.getenv("DISCONNECT_TIMEOUT", "10"))
+
 
 class Assistant(Agent):
     def __init__(self) -> None:
         super().__init__(instructions="")
 
 
+def prewarm(proc: JobProcess):
+    proc.userdata["llm_provider"] = get_provider()
+
+
+def warm_up(proc: JobProcess):
+    # The async client's connections belong to the job's event loop, which
+    # does not exist yet in prewarm, so the first job opens them for the process.
+    if "warm_up" not in proc.userdata:
+        proc.userdata["warm_up"] = asyncio.create_task(proc.userdata["llm_provider"].warm_up())
+
+
 async def entrypoint(ctx: JobContext):
-    async def disconnect():
+    warm_up(ctx.proc)
+
+    closing: asyncio.Task | None = None
+
+    async def close_session():
+        # The goodbye is still being generated when the workflow asks to
+        # disconnect; let it play out before leaving the room.
+        speech = session.current_speech
+        if speech is not None:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(speech.wait_for_playout(), DISCONNECT_TIMEOUT)
+        tracer.finish_turn()
+        await session.aclose()
+        await agent_llm.aclose()
         await ctx.room.disconnect()
 
+    async def disconnect():
+        # Only schedules the teardown so the event loop keeps serving other rooms.
+        nonlocal closing
+        if closing is None:
+            closing = asyncio.create_task(close_session())
+
+    tracer = create_tracer(room=ctx.room.name)
+    agent_llm = AgentLLM(uuid.uuid4(), "./workflows/test.yaml", disconnect, tracer)
+
     session = AgentSession(
         stt=deepgram.STT(),
-        llm=AgentLLM(uuid.uuid4(), "./workflows/test.yaml", disconnect),
+        llm=agent_llm,
         tts=deepgram.TTS(),
         vad=silero.VAD.load(),
         turn_detection=MultilingualModel(),
     )
 
+    @session.on("user_state_changed")
+    def on_user_state_changed(ev):
+        if ev.old_state == "speaking" and ev.new_state != "speaking":
+            tracer.start_turn()
+            tracer.mark("end_of_speech")
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(ev):
+        if ev.new_state == "speaking":
+            tracer.mark("first_audio")
+
     assistant = Assistant()
 
     await session.start(
@@ -54,4 +105,4 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))